@@ -0,0 +1,252 @@
+"""Benchmarks dos caminhos críticos com dados sintéticos reprodutíveis.
+
+Uso:
+    python -m benchmarks.run --output benchmarks/results/atual.json
+    python -m benchmarks.run --baseline benchmarks/results/base.json --threshold 0.2
+
+Com ``--baseline`` o processo termina com código 1 se algum benchmark ficar
+mais lento que a referência além do limite informado.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import matplotlib
+matplotlib.use('Agg') # Sem janela: os gráficos são apenas salvos em arquivo
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from benchmarks.synthetic import synthetic_ohlcv, synthetic_trade_messages
+from config.settings import Settings, SettingsManager
+from core.api_connector import BitgetAPIConnector
+from core.backtester import Backtester
+from core.candle_builder import CandleBuilder
+from core.strategy import TradingStrategy
+from utils.notifier import Notifier
+
+BACKTEST_SIZES = (10_000, 100_000, 1_000_000)
+LOOP_BACKTEST_SIZE = 1_000 # O loop candle a candle é quadrático: medido só em uma série curta
+STRATEGY_WINDOW = 100 # Mesma janela usada pelo bot a cada ciclo
+INDICATOR_SIZE = 100_000
+TRADE_MESSAGES = 50_000
+BURST_TRADES_PER_MESSAGE = 50 # Trades por mensagem nas rajadas de volatilidade
+
+
+def measure(func: Callable[[], Any], repeat: int = 3, warmup: int = 1) -> List[float]:
+    """Tempos (s) de ``repeat`` execuções de ``func``, após ``warmup`` execuções descartadas."""
+    for _ in range(warmup):
+        func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def _result(name: str, size: int, unit: str, times: List[float]) -> Dict[str, Any]:
+    median = statistics.median(times)
+    return {
+        'name': name,
+        'size': size,
+        'unit': unit,
+        'times': times,
+        'min': min(times),
+        'median': median,
+        'mean': statistics.fmean(times),
+        'per_second': size / median if median > 0 else float('inf'),
+    }
+
+
+def _settings() -> Settings:
+    return Settings(rsi_buy=45, rsi_sell=55, take_profit_percent=0.5, stop_loss_percent=0.5)
+
+
+def bench_strategy(seed: int, repeat: int) -> List[Dict[str, Any]]:
+    settings = _settings()
+    window = synthetic_ohlcv(STRATEGY_WINDOW, seed=seed).tolist()
+    close = pd.Series(synthetic_ohlcv(INDICATOR_SIZE, seed=seed)[:, 4])
+    strategy = TradingStrategy(window, settings)
+    strategy.data = pd.DataFrame({'close': close}) # Indicadores medidos sobre uma série longa
+    return [
+        _result('strategy.init', STRATEGY_WINDOW, 'candles',
+                measure(lambda: TradingStrategy(window, settings), repeat)),
+        _result('strategy.calculate_rsi', INDICATOR_SIZE, 'candles',
+                measure(strategy.calculate_rsi, repeat)),
+        _result('strategy.calculate_macd', INDICATOR_SIZE, 'candles',
+                measure(lambda: strategy.calculate_macd(settings.macd_fast, settings.macd_slow, settings.macd_signal), repeat)),
+    ]
+
+
+def bench_backtester(seed: int, repeat: int, sizes: Sequence[int] = BACKTEST_SIZES) -> List[Dict[str, Any]]:
+    settings_manager = SimpleNamespace(settings=_settings()) # Backtester só lê ``settings``
+    results = []
+    for size in sizes:
+        data = synthetic_ohlcv(size, seed=seed)
+        run = lambda: Backtester(data, settings_manager).run(vectorized=True)
+        results.append(_result('backtester.run_vectorized', size, 'candles', measure(run, repeat)))
+
+    data = synthetic_ohlcv(LOOP_BACKTEST_SIZE, seed=seed)
+    run = lambda: Backtester(data, settings_manager).run()
+    results.append(_result('backtester.run_loop', LOOP_BACKTEST_SIZE, 'candles', measure(run, repeat, warmup=0)))
+    return results
+
+
+def bench_chart(seed: int, repeat: int) -> List[Dict[str, Any]]:
+    settings_manager = asyncio.run(SettingsManager())
+    original_path = settings_manager.file_path
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        settings_manager.file_path = Path(tmp_dir) / 'settings.json'
+        settings_manager.file_path.write_text(_settings().model_dump_json())
+        try:
+            notifier = Notifier(settings_manager, dry_run=True)
+        finally:
+            settings_manager.file_path = original_path
+        window = synthetic_ohlcv(STRATEGY_WINDOW, seed=seed).tolist()
+        notifier.latest_ohlcv = window
+        notifier.latest_strategy = TradingStrategy(window, notifier.settings)
+
+        def generate():
+            os.unlink(asyncio.run(notifier.generate_chart()))
+
+        return [_result('notifier.generate_chart', STRATEGY_WINDOW, 'candles', measure(generate, repeat))]
+
+
+def _consume_messages(messages: List[str]) -> Callable[[], None]:
+    connector = BitgetAPIConnector(SimpleNamespace(settings=_settings()))
+
+    def consume():
+        connector.candle_builder = CandleBuilder(connector.candle_builder.timeframes) # Cada execução recomeça os candles
+        for message in messages:
+            connector.on_message(message)
+
+    return consume
+
+
+def bench_on_message(seed: int, repeat: int) -> List[Dict[str, Any]]:
+    messages = synthetic_trade_messages(TRADE_MESSAGES, seed=seed)
+    return [_result('api_connector.on_message', TRADE_MESSAGES, 'messages', measure(_consume_messages(messages), repeat))]
+
+
+def bench_on_message_burst(seed: int, repeat: int) -> List[Dict[str, Any]]:
+    messages = synthetic_trade_messages(TRADE_MESSAGES * BURST_TRADES_PER_MESSAGE, seed=seed, trades_per_message=BURST_TRADES_PER_MESSAGE)
+    return [_result('api_connector.on_message[burst]', TRADE_MESSAGES * BURST_TRADES_PER_MESSAGE, 'trades', measure(_consume_messages(messages), repeat))]
+
+
+BENCHMARKS: Dict[str, Callable[[int, int], List[Dict[str, Any]]]] = {
+    'strategy': bench_strategy,
+    'backtester': bench_backtester,
+    'chart': bench_chart,
+    'on_message': bench_on_message,
+    'on_message_burst': bench_on_message_burst,
+}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(seed: int = 42, repeat: int = 3, only: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """Executa os benchmarks selecionados e retorna o relatório (serializável em JSON)."""
+    results = []
+    for name in only or BENCHMARKS:
+        logger.info(f"Executando benchmark: {name}")
+        results.extend(BENCHMARKS[name](seed, repeat))
+    return {
+        'metadata': {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'commit': _git_commit(),
+            'seed': seed,
+            'repeat': repeat,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'results': results,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.2) -> List[Dict[str, Any]]:
+    """Benchmarks cuja mediana piorou mais que ``threshold`` (fração) em relação à referência."""
+    reference = {(r['name'], r['size']): r['median'] for r in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        base = reference.get((result['name'], result['size']))
+        if base is None or base <= 0:
+            continue
+        ratio = result['median'] / base
+        if ratio > 1 + threshold:
+            regressions.append({'name': result['name'], 'size': result['size'], 'baseline': base,
+                                'current': result['median'], 'ratio': ratio})
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks do bot com dados sintéticos")
+    parser.add_argument('--output', default='benchmarks/results/latest.json', help="Arquivo JSON de saída")
+    parser.add_argument('--baseline', help="Relatório JSON de referência para detectar regressões")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Piora máxima tolerada (0.2 = 20%%)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), help="Executa apenas estes grupos")
+    parser.add_argument('--log-level', default='WARNING', help="Nível de log durante as medições")
+    args = parser.parse_args(argv)
+
+    try:
+        logger.remove(0) # Sink padrão do loguru no terminal: evita medir a escrita de logs
+        default_removed = True
+    except ValueError: # Já removido por quem chamou main
+        default_removed = False
+    handler = logger.add(sys.stderr, level=args.log_level)
+    try:
+        return _run_and_report(args)
+    finally: # Desfaz só o que foi alterado aqui; os sinks de quem chamou main ficam intactos
+        logger.remove(handler)
+        if default_removed:
+            logger.add(sys.stderr)
+
+
+def _run_and_report(args: argparse.Namespace) -> int:
+    report = run_benchmarks(seed=args.seed, repeat=args.repeat, only=args.only)
+    report['metadata']['log_level'] = args.log_level
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+
+    for result in report['results']:
+        print(f"{result['name']:<30} {result['size']:>9} {result['unit']:<8} "
+              f"mediana {result['median'] * 1000:10.2f} ms  {result['per_second']:>14,.0f}/s")
+    print(f"Relatório salvo em {output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        for r in regressions:
+            print(f"REGRESSÃO {r['name']} ({r['size']}): {r['baseline'] * 1000:.2f} ms -> "
+                  f"{r['current'] * 1000:.2f} ms ({r['ratio']:.2f}x)")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,60 @@
+import json
+from typing import List
+
+import numpy as np
+
+START_TIMESTAMP = 1700000000000 # 2023-11-14 22:13:20 UTC, alinhado ao minuto
+
+
+def synthetic_ohlcv(
+    n: int,
+    seed: int = 42,
+    start: int = START_TIMESTAMP,
+    timeframe_ms: int = 60000,
+    start_price: float = 30000.0,
+    volatility: float = 0.0015
+) -> np.ndarray:
+    """Candles OHLCV sintéticos e reprodutíveis (passeio aleatório geométrico).
+
+    Retorna uma matriz ``(n, 6)`` no formato do ccxt
+    (timestamp, open, high, low, close, volume) com high/low coerentes com
+    open/close. A mesma ``seed`` sempre gera os mesmos candles.
+    """
+    rng = np.random.default_rng(seed)
+    close = start_price * np.exp(np.cumsum(rng.normal(0, volatility, n)))
+    open_ = np.r_[start_price, close[:-1]]
+    wick = start_price * volatility * rng.random((2, n))
+    data = np.empty((n, 6), dtype=np.float64)
+    data[:, 0] = start + np.arange(n, dtype=np.int64) * timeframe_ms
+    data[:, 1] = open_
+    data[:, 2] = np.maximum(open_, close) + wick[0]
+    data[:, 3] = np.minimum(open_, close) - wick[1]
+    data[:, 4] = close
+    data[:, 5] = rng.lognormal(mean=1.0, sigma=0.5, size=n)
+    return data
+
+
+def synthetic_trade_messages(
+    n: int,
+    seed: int = 42,
+    inst_id: str = 'BTCUSDT',
+    start: int = START_TIMESTAMP,
+    start_price: float = 30000.0,
+    trades_per_message: int = 1
+) -> List[str]:
+    """Mensagens do canal ``trade`` do WebSocket da Bitget, já serializadas em JSON.
+
+    Com ``trades_per_message`` > 1, cada mensagem agrupa trades consecutivos
+    (como nas rajadas de volatilidade), do mais novo ao mais antigo.
+    """
+    rng = np.random.default_rng(seed)
+    prices = start_price + np.cumsum(rng.normal(0, 1.5, n))
+    sizes = rng.lognormal(mean=-4.0, sigma=1.0, size=n)
+    timestamps = start + np.cumsum(rng.integers(1, 250, n))
+    sides = np.where(rng.random(n) < 0.5, 'buy', 'sell')
+    arg = {'instType': 'mc', 'channel': 'trade', 'instId': inst_id}
+    trades = [[str(int(ts)), f'{price:.1f}', f'{size:.4f}', side] for ts, price, size, side in zip(timestamps, prices, sizes, sides)]
+    return [
+        json.dumps({'action': 'update', 'arg': arg, 'data': trades[i:i + trades_per_message][::-1]})
+        for i in range(0, n, trades_per_message)
+    ]
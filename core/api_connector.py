@@ -1,13 +1,24 @@
 import asyncio
 import ccxt.async_support as ccxt_async
-import json
 import pandas as pd
 import time
-import websocket
-from threading import Thread
+from typing import Dict, List, Optional, Tuple
 from config.settings import SettingsManager
+from core import fast_json
+from core.candle_builder import CandleBuilder
+from core.market_feed import MarketDataFeed
+from core.ohlcv_buffer import OHLCVRingBuffer
+from core.order_book import OrderBook
+from core.price_cache import PriceCache
+from core.rate_limiter import PRIORITY_ACCOUNT, PRIORITY_MARKET_DATA, PRIORITY_ORDER, RateLimitScheduler
+from core.resilience import DeadlineExceeded, ResilientExecutor, remaining_time
+from core.single_flight import DEFAULT_READ_TTLS, SingleFlightCache
 from loguru import logger
-from tenacity import retry, wait_exponential, stop_after_attempt
+
+CANDLE_CLOSE_GRACE_MS = 1000 # Espera por trades atrasados antes de fechar um candle pelo relógio
+PRICE_MAX_AGE = 5.0 # Idade máxima (s) de um preço do WebSocket antes de recorrer à API REST
+MESSAGE_ERROR_LOG_EVERY = 1000 # Registra uma a cada N mensagens com erro
+CONNECT_TIMEOUT = 30.0 # Espera máxima (s) pela primeira conexão WebSocket em connect()
 
 class BitgetAPIConnector:
     def __init__(self, settings_manager: SettingsManager):
@@ -18,72 +29,212 @@ class BitgetAPIConnector:
             'apiKey': self.settings.bitget_api_key,
             'secret': self.settings.bitget_api_secret,
             'password': self.settings.bitget_passphrase,
-            'options': {'defaultType': 'swap'}
+            'options': {'defaultType': 'swap'},
+            'enableRateLimit': False # Controle feito por rate_limiter
         })
+        self.rate_limiter = RateLimitScheduler(headers=lambda: self.exchange.last_response_headers) # Orçamento de todas as chamadas REST
+        self.request_cache = SingleFlightCache(DEFAULT_READ_TTLS) # Leituras simultâneas idênticas viram uma requisição
+        self.resilience = ResilientExecutor() # Prazos, circuito por endpoint e hedging de leituras
+
+        self.trade_arg = self.trade_subscription(self.settings.symbol)
+        self.feed = MarketDataFeed(subscriptions=[
+            self.trade_arg, self.ticker_subscription(self.settings.symbol), self.books_subscription(self.settings.symbol)
+        ])
+        self.price_cache = PriceCache(max_age=PRICE_MAX_AGE) # Último preço/bid/ask por símbolo, via WebSocket
+        self.ticker_symbols: Dict[str, str] = {self.trade_arg['instId']: self.settings.symbol} # instId -> símbolo ccxt
+        self.order_books: Dict[str, OrderBook] = {self.settings.symbol: OrderBook(self.settings.symbol)} # Livro L2 por símbolo
+        self.book_symbols: Dict[str, str] = {self.trade_arg['instId']: self.settings.symbol} # instId -> símbolo ccxt
+        self.channel_handlers = {'trade': self._on_trades, 'ticker': self._on_ticker, 'books': self._on_books} # Canal -> tratador
+        self.message_errors = 0
+        self.connected_event = self.feed.connected # Definido pelo feed a cada (re)conexão
+        self.feed_tasks: List[asyncio.Task] = []
+        self.candle_cache: Dict[Tuple[str, str], OHLCVRingBuffer] = {} # Janela OHLCV por (símbolo, timeframe)
+        self.candle_builder = CandleBuilder([self.settings.timeframe]) # Candles do símbolo montados pelo stream
+        self.candle_events: asyncio.Queue = asyncio.Queue(maxsize=100) # (timeframe, candle) a cada fechamento
+        self._seeded_reconnects: Dict[str, int] = {} # Reconexões do feed quando o builder recebeu o histórico
+        self._book_resyncs: Dict[str, asyncio.Task] = {} # Reinscrições em andamento por símbolo
+
+    async def connect(self, timeout: float = CONNECT_TIMEOUT):
+        await self.request('load_markets', PRIORITY_MARKET_DATA)
+        self.feed_tasks = [
+            asyncio.create_task(self.feed.run()), # WebSocket no próprio event loop, sem threads
+            asyncio.create_task(self.consume_feed()),
+        ]
+        try:
+            await asyncio.wait_for(self.connected_event.wait(), timeout) # Aguarda a conexão WebSocket
+        except asyncio.TimeoutError:
+            await self.close()
+            raise ConnectionError(f"WebSocket não conectou em {timeout}s") from None
+
+    async def close(self):
+        await self.feed.close()
+        for task in self.feed_tasks:
+            task.cancel()
+        await asyncio.gather(*self.feed_tasks, return_exceptions=True)
+        self.feed_tasks = []
+        await self.exchange.close()
+
+    async def consume_feed(self):
+        """Processa as mensagens da fila do feed no event loop do bot, em lotes."""
+        while True:
+            for message in await self.feed.get_batch():
+                try:
+                    self.on_message(message)
+                except Exception:
+                    self.message_errors += 1
+                    if self.message_errors % MESSAGE_ERROR_LOG_EVERY == 1: # Amostrado: rajadas não inundam o log
+                        logger.exception(f"Erro ao processar mensagem WebSocket ({self.message_errors} no total):")
+
+    def trade_subscription(self, symbol: str) -> Dict[str, str]:
+        """Canal de trades públicos do contrato perpétuo (API mix v1)."""
+        return {"instType": "mc", "channel": "trade", "instId": self.format_symbol(symbol.split(':')[0])}
+
+    def ticker_subscription(self, symbol: str) -> Dict[str, str]:
+        """Canal de ticker (último preço, melhor bid e ask) do contrato perpétuo."""
+        return {"instType": "mc", "channel": "ticker", "instId": self.format_symbol(symbol.split(':')[0])}
 
-        self.ws = None
-        self.ws_thread = None
-        self.reconnect_attempts = 0
-        self.max_reconnect_attempts = 5
-        self.connected_event = asyncio.Event()
+    async def stream_prices(self, symbol: str):
+        """Passa a receber o ticker de ``symbol`` pelo WebSocket (alimenta ``price_cache``)."""
+        arg = self.ticker_subscription(symbol)
+        self.ticker_symbols[arg['instId']] = symbol
+        await self.feed.subscribe([arg])
 
-    async def connect(self):
-        await self.exchange.load_markets()
-        self.start_websocket()
-        await self.connected_event.wait() # Aguarda a conexão WebSocket
+    def books_subscription(self, symbol: str) -> Dict[str, str]:
+        """Canal de profundidade completa (snapshot seguido de atualizações incrementais com checksum)."""
+        return {"instType": "mc", "channel": "books", "instId": self.format_symbol(symbol.split(':')[0])}
 
-    def start_websocket(self):
-        self.ws_thread = Thread(target=self.run_websocket, daemon=True)
-        self.ws_thread.start()
+    async def stream_order_book(self, symbol: str):
+        """Passa a manter o livro de ofertas de ``symbol`` pelo WebSocket (ver ``get_order_book``)."""
+        arg = self.books_subscription(symbol)
+        self.order_books.setdefault(symbol, OrderBook(symbol))
+        self.book_symbols[arg['instId']] = symbol
+        await self.feed.subscribe([arg])
 
-    @retry(wait=wait_exponential(multiplier=1, min=4, max=30), stop=stop_after_attempt(5)) # Repetição com backoff exponencial
-    def run_websocket(self):
+    def get_order_book(self, symbol: str, max_age: float = PRICE_MAX_AGE) -> Optional[OrderBook]:
+        """Livro de ofertas sincronizado de ``symbol``, ou None se ausente, fora de sincronia ou mais antigo que ``max_age``."""
+        book = self.order_books.get(symbol)
+        if book is None or not book.synced or book.age() > max_age:
+            return None
+        return book
+
+    def on_message(self, message):
+        """Decodifica uma mensagem do WebSocket e a encaminha ao tratador do canal."""
+        data = fast_json.loads(message)
+        arg = data.get('arg')
+        rows = data.get('data')
+        if not arg or not rows: # Confirmações de inscrição, pong e erros não têm dados
+            return
+        handler = self.channel_handlers.get(arg.get('channel'))
+        if handler is not None:
+            handler(arg, rows, data.get('action'))
+
+    def _on_trades(self, arg: Dict[str, str], trades: List[List[str]], action: str = None):
+        if arg.get('instId') != self.trade_arg['instId']:
+            return
+        closed = self.candle_builder.add_trades(trades) # Todos os trades da mensagem
+        if closed:
+            self.publish_candles(closed)
+        self.price_cache.update(self.settings.symbol, last=self.candle_builder.last_trade[1])
+
+    def _on_ticker(self, arg: Dict[str, str], tickers: List[Dict[str, str]], action: str = None):
+        symbol = self.ticker_symbols.get(arg.get('instId'))
+        if symbol is not None:
+            ticker = tickers[-1]
+            self.price_cache.update(symbol, last=ticker.get('last'), bid=ticker.get('bestBid'), ask=ticker.get('bestAsk'))
+
+    def _on_books(self, arg: Dict[str, str], books: List[Dict], action: str = None):
+        symbol = self.book_symbols.get(arg.get('instId'))
+        if symbol is None:
+            return
+        book = self.order_books[symbol]
+        for data in books:
+            if action == 'snapshot':
+                ok = book.apply_snapshot(data)
+            elif book.synced:
+                ok = book.apply_update(data)
+            else:
+                return # Atualizações antes do snapshot (ou após uma falha) são descartadas
+            if not ok:
+                logger.warning(f"Checksum do livro de ofertas de {symbol} divergiu; solicitando novo snapshot")
+                self.resync_order_book(symbol)
+                return
+
+    def resync_order_book(self, symbol: str):
+        """Descarta o livro de ``symbol`` e refaz a inscrição para receber um novo snapshot."""
+        self.order_books[symbol].reset()
+        if symbol in self._book_resyncs:
+            return
         try:
-            self.ws = websocket.WebSocketApp(
-                "wss://ws.bitget.com/mix/v1/stream",
-                on_message=self.on_message,
-                on_error=self.on_error,
-                on_close=self.on_close
+            loop = asyncio.get_running_loop()
+        except RuntimeError: # Sem event loop (ex.: benchmarks): o livro fica aguardando snapshot
+            return
+        arg = self.books_subscription(symbol)
+        task = loop.create_task(self._resubscribe(arg))
+        self._book_resyncs[symbol] = task
+        task.add_done_callback(lambda _: self._book_resyncs.pop(symbol, None))
+
+    async def _resubscribe(self, arg: Dict[str, str]):
+        await self.feed.unsubscribe([arg])
+        await self.feed.subscribe([arg])
+
+    def publish_candles(self, closed: List[Tuple[str, List]]):
+        for timeframe, candle in closed:
+            logger.debug("Candle {} fechado: {}", timeframe, candle) # Formatado só com DEBUG ativo
+            if self.candle_events.full():
+                self.candle_events.get_nowait() # Sem consumidor: mantém só os fechamentos recentes
+            self.candle_events.put_nowait((timeframe, candle))
+
+    async def wait_candle_close(self, timeframe: str, timeout: float) -> Optional[List]:
+        """Aguarda o fechamento de um candle de ``timeframe`` montado pelo stream.
+
+        Sem trades após o fim do período, o candle é fechado pelo relógio
+        ``CANDLE_CLOSE_GRACE_MS`` depois. Retorna o candle, ou None após
+        ``timeout`` segundos.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            self.publish_candles(self.candle_builder.close_elapsed(self.exchange.milliseconds() - CANDLE_CLOSE_GRACE_MS))
+            remaining = deadline - loop.time()
+            next_close = self.candle_builder.next_close(timeframe)
+            if next_close is not None:
+                remaining = min(remaining, max(0.0, (next_close + CANDLE_CLOSE_GRACE_MS - self.exchange.milliseconds()) / 1000))
+            try:
+                event_timeframe, candle = await asyncio.wait_for(self.candle_events.get(), timeout=remaining)
+                if event_timeframe == timeframe:
+                    return candle
+            except asyncio.TimeoutError:
+                if loop.time() >= deadline:
+                    return None
+
+    async def request(self, method: str, priority: int, *args, **kwargs):
+        """Chama ``exchange.<method>`` passando pelo agendador de limites de requisição.
+
+        Leituras listadas em ``request_cache.ttls`` são agrupadas com chamadas
+        idênticas em andamento e podem ser servidas pelo cache de TTL curto.
+        ``resilience`` aplica o prazo do ciclo (``deadline``), o circuito do
+        endpoint e a requisição duplicada de leituras lentas.
+        """
+        def send():
+            return self.resilience.call(
+                method, lambda: self.rate_limiter.call(method, lambda: getattr(self.exchange, method)(*args, **kwargs), priority)
             )
-            self.ws.on_open = self.on_open
-            self.ws.run_forever()
-        except Exception as e:
-            logger.error(f"Erro na conexão WebSocket: {e}")
-            raise  # Re-raise the exception to trigger tenacity retry
-
-    def on_open(self, ws):
-        symbol_formatted = self.format_symbol(self.settings.symbol)
-        channel = f"trade.{symbol_formatted}"
-        subscribe_message = {
-            "op": "subscribe",
-            "args": [channel]
-        }
-        ws.send(json.dumps(subscribe_message))
-        logger.info(f"Inscrito no canal WebSocket: {channel}")
-        
-        asyncio.run_coroutine_threadsafe(self.set_connected_event(), asyncio.get_running_loop()) # Executa no loop principal
-
-    async def set_connected_event(self):
-        self.connected_event.set()
-
-    def on_message(self, ws, message):
-        data = json.loads(message)
-        if 'data' in data and data['data']:
-            trade = data['data'][0]
-            logger.debug(f"Trade recebido: {trade}")
-
-    def on_error(self, ws, error):
-        logger.exception(f"Erro no WebSocket:") # Captura o traceback
-
-    def on_close(self, ws, close_status_code, close_reason):
-        logger.warning(f"Conexão WebSocket fechada: {close_reason}")
-        self.connected_event.clear() # Limpa o evento de conexão
-
-    @retry(wait=wait_exponential(multiplier=1, min=2, max=10), stop=stop_after_attempt(3)) # Repetição com backoff exponencial
+
+        if not self.request_cache.handles(method):
+            return await send()
+        try: # Quem aguarda uma requisição compartilhada respeita o próprio prazo
+            return await asyncio.wait_for(self.request_cache.get(method, args, kwargs, send), timeout=remaining_time())
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(f"Prazo esgotado aguardando {method}") from None
+
+    async def fetch_balance(self):
+        """Saldo da conta (prioridade acima de dados de mercado)."""
+        return await self.request('fetch_balance', PRIORITY_ACCOUNT)
+
     async def fetch_ticker(self, symbol):
         """Obtém o ticker do símbolo especificado."""
         try:
-            ticker = await self.exchange.fetch_ticker(symbol)
+            ticker = await self.request('fetch_ticker', PRIORITY_MARKET_DATA, symbol)
             return ticker
         except ccxt_async.NetworkError as e: # Corrected exception type
             logger.error(f"Erro de rede ao buscar ticker: {e}")
@@ -92,10 +243,10 @@ class BitgetAPIConnector:
             logger.exception("Erro ao buscar ticker:")
             return None
 
-    @retry(wait=wait_exponential(multiplier=1, min=1, max=5), stop=stop_after_attempt(2))
     async def create_order(self, symbol, side, amount, order_type='market', params={}):
         try:
-            order = await self.exchange.create_order(symbol, order_type, side, amount, params) # type, side, amount, price, params={}
+            order = await self.request('create_order', PRIORITY_ORDER, symbol, order_type, side, amount, params) # type, side, amount, price, params={}
+            self.request_cache.invalidate('fetch_balance') # Saldo mudou com a ordem
             logger.info(f"Ordem criada: {order}")
             return order
         except ccxt_async.InsufficientFunds as e:
@@ -111,7 +262,6 @@ class BitgetAPIConnector:
             logger.exception("Erro ao criar ordem:")
             return None
 
-    @retry(wait=wait_exponential(multiplier=1, min=1, max=5), stop=stop_after_attempt(2)) # Repetição com backoff exponencial
     async def close_position(self, symbol, position):
         """Fecha uma posição."""
         try:
@@ -126,7 +276,57 @@ class BitgetAPIConnector:
             logger.exception("Erro ao fechar posição:")
             return None # Return None after logging the exception
 
-    async def get_current_price(self, symbol):
+    async def fetch_ohlcv_cached(self, symbol: str, timeframe: str, limit: int = 100) -> OHLCVRingBuffer:
+        """Retorna a janela OHLCV em cache, buscando apenas os candles novos.
+
+        O pedido começa no último timestamp conhecido, o que também revisa o
+        candle em aberto. Sem cache, com lacuna maior que a janela ou com
+        resposta descontínua, faz uma busca completa de ``limit`` candles.
+        """
+        if self._streams(symbol, timeframe) and self._seeded_reconnects.get(timeframe) == self.feed.reconnects:
+            if limit <= self.candle_builder.capacity:
+                return self.candle_builder.buffers[timeframe] # Janela montada pelo stream, sem chamada REST
+
+        key = (symbol, timeframe)
+        buffer = self.candle_cache.get(key)
+        timeframe_ms = self.exchange.parse_timeframe(timeframe) * 1000
+
+        if buffer is not None and buffer.last_timestamp is not None:
+            last = buffer.last_timestamp
+            missing = max(0, (self.exchange.milliseconds() - last) // timeframe_ms)
+            if missing < limit:
+                ohlcv = await self.request('fetch_ohlcv', PRIORITY_MARKET_DATA, symbol, timeframe, since=last, limit=missing + 1)
+                if not ohlcv or ohlcv[0][0] <= last + timeframe_ms: # Resposta contígua ao cache
+                    buffer.extend(ohlcv)
+                    return self._seed_stream(symbol, timeframe, buffer)
+                logger.warning(f"Lacuna nos candles de {symbol} {timeframe}. Recarregando janela completa.")
+
+        ohlcv = await self.request('fetch_ohlcv', PRIORITY_MARKET_DATA, symbol, timeframe, limit=limit)
+        buffer = OHLCVRingBuffer(capacity=limit)
+        buffer.extend(ohlcv)
+        self.candle_cache[key] = buffer
+        return self._seed_stream(symbol, timeframe, buffer)
+
+    def _streams(self, symbol: str, timeframe: str) -> bool:
+        """True se os candles de ``symbol``/``timeframe`` são montados pelo stream conectado."""
+        return (
+            symbol == self.settings.symbol
+            and timeframe in self.candle_builder.timeframes
+            and self.connected_event.is_set()
+        )
+
+    def _seed_stream(self, symbol: str, timeframe: str, buffer: OHLCVRingBuffer) -> OHLCVRingBuffer:
+        """Passa a janela REST ao builder; após uma reconexão o histórico é buscado de novo."""
+        if not self._streams(symbol, timeframe) or len(buffer) > self.candle_builder.capacity:
+            return buffer
+        self._seeded_reconnects[timeframe] = self.feed.reconnects
+        return self.candle_builder.seed(timeframe, buffer.to_list())
+
+    async def get_current_price(self, symbol, max_age: float = None):
+        """Último preço do cache alimentado pelo WebSocket; usa a API REST se ausente ou mais antigo que ``max_age``."""
+        price = self.price_cache.get(symbol, max_age=max_age)
+        if price is not None:
+            return price
         ticker = await self.fetch_ticker(symbol)
         if ticker:
             return ticker['last']
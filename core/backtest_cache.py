@@ -0,0 +1,135 @@
+import contextlib
+import functools
+import hashlib
+import inspect
+import pickle
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+from loguru import logger
+
+# Campos de Settings que alteram o resultado de um backtest
+CACHE_SETTINGS_FIELDS = (
+    'rsi_buy', 'rsi_sell', 'macd_fast', 'macd_slow', 'macd_signal',
+    'take_profit_percent', 'stop_loss_percent', 'order_size'
+)
+
+# Módulos cujo código faz parte da versão da estratégia
+FINGERPRINT_MODULES = ('core.indicators', 'core.backtester', 'core.backtest_metrics') # backtest_metrics: métricas do modo streaming
+
+
+@functools.lru_cache(maxsize=None)
+def strategy_fingerprint(strategy_class: type) -> str:
+    """Hash do código da estratégia e do motor de backtest.
+
+    Qualquer alteração no código-fonte gera uma nova versão e invalida os
+    resultados armazenados para a versão anterior.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{strategy_class.__module__}.{strategy_class.__qualname__}".encode())
+    for name in (strategy_class.__module__, *FINGERPRINT_MODULES):
+        module = sys.modules.get(name)
+        if module is None:
+            continue
+        try:
+            digest.update(inspect.getsource(module).encode())
+        except (OSError, TypeError): # Sem código-fonte disponível (ex.: classe criada dinamicamente)
+            digest.update(name.encode())
+    return digest.hexdigest()
+
+
+class BacktestCache:
+    """Cache persistente (SQLite) de resultados de backtest com despejo LRU.
+
+    A chave combina o hash dos candles, os campos relevantes de Settings,
+    slippage, comissão, saldo inicial e a versão do código da estratégia.
+    O tamanho total armazenado é limitado a ``max_bytes``.
+    """
+
+    def __init__(self, path: Union[str, Path] = 'data/backtest_cache.sqlite', max_bytes: int = 256 * 1024 * 1024):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, payload BLOB NOT NULL, size INTEGER NOT NULL, last_used INTEGER NOT NULL)"
+            )
+
+    def __len__(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def make_key(self, backtester: Any, strategy_class: type) -> str:
+        """Chave do backtest configurado em ``backtester`` com ``strategy_class``."""
+        digest = hashlib.blake2b(digest_size=20)
+        for column in ('timestamp', 'open', 'high', 'low', 'close', 'volume'):
+            dtype = np.int64 if column == 'timestamp' else np.float64
+            values = np.ascontiguousarray(backtester.data[column].to_numpy(), dtype=dtype)
+            digest.update(memoryview(values).cast('B'))
+        params = {field: getattr(backtester.settings, field) for field in CACHE_SETTINGS_FIELDS}
+        params.update(
+            slippage=(backtester.buy_slippage, backtester.sell_slippage), # Fixo ou estimado pelo livro de ofertas
+            commission=backtester.commission,
+            initial_balance=backtester.initial_balance,
+            strategy=strategy_fingerprint(strategy_class)
+        )
+        digest.update(repr(sorted(params.items())).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], Optional[List[Dict[str, Any]]]]]:
+        """Retorna ``(métricas, trades)`` ou None; trades é None se não foram armazenados."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT payload FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time_ns(), key))
+        self.hits += 1
+        return pickle.loads(row[0])
+
+    def put(self, key: str, metrics: Dict[str, Any], trades: Optional[List[Dict[str, Any]]] = None) -> None:
+        payload = pickle.dumps((metrics, trades), protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.max_bytes:
+            logger.warning(f"Resultado com {len(payload)} bytes excede o limite do cache e não será armazenado")
+            return
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, payload, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, payload, len(payload), time.time_ns())
+            )
+            self._evict(conn)
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM results")
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Remove os resultados usados há mais tempo até respeitar ``max_bytes``."""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in conn.execute("SELECT key, size FROM results ORDER BY last_used ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        logger.debug(f"{evicted} resultados removidos do cache de backtest")
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Conexão curta por operação (segura entre processos do ParameterSweep)."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn: # Commit ou rollback da transação
+                yield conn
+        finally:
+            conn.close()
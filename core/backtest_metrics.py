@@ -0,0 +1,175 @@
+import math
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Union
+
+import numpy as np
+import pandas as pd
+
+
+def empty_metrics() -> Dict[str, Any]:
+    """Métricas de um backtest sem trades."""
+    return {
+        'total_trades': 0,
+        'win_rate': 0.0,
+        'net_profit': 0.0,
+        'max_drawdown': 0.0,
+        'profit_factor': 0.0
+    }
+
+
+class MetricsAccumulator:
+    """Métricas do backtest atualizadas a cada trade, com memória constante.
+
+    Produz o mesmo dicionário de ``Backtester.analyze_results`` sem manter
+    a lista de trades: contagens, somas (com compensação de Kahan), pico do
+    saldo e drawdown máximo são atualizados incrementalmente.
+    """
+
+    def __init__(self):
+        self.total_trades = 0
+        self.winning_trades = 0
+        self.losing_trades = 0
+        self._sums = {'net': [0.0, 0.0], 'profit': [0.0, 0.0], 'loss': [0.0, 0.0]} # [soma, compensação]
+        self.peak_balance = -math.inf
+        self.max_drawdown = 0.0
+        self.balance = math.nan
+
+    @property
+    def net_profit(self) -> float:
+        return self._sums['net'][0]
+
+    @property
+    def gross_profit(self) -> float:
+        return self._sums['profit'][0]
+
+    @property
+    def gross_loss(self) -> float:
+        return self._sums['loss'][0]
+
+    def add(self, pnl: float, balance: float) -> None:
+        """Registra um trade."""
+        self.total_trades += 1
+        self._add('net', pnl)
+        if pnl > 0:
+            self.winning_trades += 1
+            self._add('profit', pnl)
+        elif pnl < 0:
+            self.losing_trades += 1
+            self._add('loss', pnl)
+
+        self.balance = balance
+        self.peak_balance = max(self.peak_balance, balance)
+        self.max_drawdown = max(self.max_drawdown, self.peak_balance - balance)
+
+    def add_many(self, pnl: np.ndarray, balance: np.ndarray) -> None:
+        """Registra um lote de trades (ex.: saída do backtest vetorizado)."""
+        pnl = np.asarray(pnl, dtype=np.float64)
+        balance = np.asarray(balance, dtype=np.float64)
+        if not len(pnl):
+            return
+        wins, losses = pnl > 0, pnl < 0
+        self.total_trades += len(pnl)
+        self.winning_trades += int(np.count_nonzero(wins))
+        self.losing_trades += int(np.count_nonzero(losses))
+        self._add('net', math.fsum(pnl))
+        self._add('profit', math.fsum(pnl[wins]))
+        self._add('loss', math.fsum(pnl[losses]))
+
+        peaks = np.maximum.accumulate(np.maximum(balance, self.peak_balance))
+        self.max_drawdown = max(self.max_drawdown, float((peaks - balance).max()))
+        self.peak_balance = float(peaks[-1])
+        self.balance = float(balance[-1])
+
+    def metrics(self) -> Dict[str, Any]:
+        if not self.total_trades:
+            return empty_metrics()
+        return {
+            'total_trades': self.total_trades,
+            'win_rate': (self.winning_trades / self.total_trades) * 100,
+            'net_profit': self.net_profit,
+            'max_drawdown': self.max_drawdown,
+            'profit_factor': (self.gross_profit / abs(self.gross_loss)) if self.losing_trades > 0 else float('inf')
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Estado serializável (ex.: sidecar de ``ResultStore``) para continuar a acumulação."""
+        return {
+            'total_trades': self.total_trades,
+            'winning_trades': self.winning_trades,
+            'losing_trades': self.losing_trades,
+            'sums': self._sums,
+            'peak_balance': self.peak_balance,
+            'max_drawdown': self.max_drawdown,
+            'balance': self.balance,
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> 'MetricsAccumulator':
+        accumulator = cls()
+        accumulator.total_trades = state['total_trades']
+        accumulator.winning_trades = state['winning_trades']
+        accumulator.losing_trades = state['losing_trades']
+        accumulator._sums = {name: list(values) for name, values in state['sums'].items()}
+        accumulator.peak_balance = state['peak_balance']
+        accumulator.max_drawdown = state['max_drawdown']
+        accumulator.balance = state['balance']
+        return accumulator
+
+    def _add(self, name: str, value: float) -> None:
+        total, compensation = self._sums[name]
+        y = value - compensation
+        t = total + y
+        self._sums[name] = [t, (t - total) - y]
+
+
+class TradeSpill:
+    """Grava os trades em disco (CSV) em blocos de ``chunk_size`` linhas.
+
+    Mantém em memória apenas o bloco atual; ``read()`` carrega o arquivo
+    completo quando os trades individuais forem necessários.
+    """
+
+    def __init__(self, path: Union[str, Path], chunk_size: int = 10000):
+        self.path = Path(path)
+        self.chunk_size = chunk_size
+        self.rows_written = 0
+        self._buffer: List[Dict[str, Any]] = []
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.unlink(missing_ok=True) # Cada backtest começa um arquivo novo
+
+    def append(self, trade: Dict[str, Any]) -> None:
+        self._buffer.append(trade)
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def append_frame(self, trades: pd.DataFrame) -> None:
+        """Grava um lote de trades já em formato de DataFrame."""
+        self.flush()
+        for start in range(0, len(trades), self.chunk_size):
+            self._write(trades.iloc[start:start + self.chunk_size])
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._write(pd.DataFrame(self._buffer))
+            self._buffer = []
+
+    def read(self) -> pd.DataFrame:
+        self.flush()
+        if not self.path.exists():
+            return pd.DataFrame()
+        return pd.read_csv(self.path, parse_dates=['datetime'])
+
+    def read_chunks(self) -> Iterator[pd.DataFrame]:
+        """Lê o arquivo em blocos de ``chunk_size`` linhas, sem carregá-lo inteiro."""
+        self.flush()
+        if not self.path.exists():
+            return
+        yield from pd.read_csv(self.path, parse_dates=['datetime'], chunksize=self.chunk_size)
+
+    def _write(self, chunk: pd.DataFrame) -> None:
+        chunk = chunk.copy()
+        if 'signal' in chunk:
+            chunk['signal'] = [s.value if isinstance(s, Enum) else s for s in chunk['signal']]
+        chunk.to_csv(self.path, mode='a', header=self.rows_written == 0, index=False)
+        self.rows_written += len(chunk)
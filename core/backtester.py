@@ -1,57 +1,132 @@
+import asyncio
 import pandas as pd
 import numpy as np
 from loguru import logger
 from config.settings import SettingsManager
-from core.strategy import TradingStrategy, TradingSignal
+from core.backtest_metrics import MetricsAccumulator, TradeSpill, empty_metrics
+from core.result_store import ResultStore
+from core.strategy import SIGNAL_CODES, TradingStrategy, TradingSignal
 import mplfinance as mpf
 import matplotlib.pyplot as plt
-from typing import Dict, List, Any, Union, Tuple
+from typing import TYPE_CHECKING, Dict, List, Any, Optional, Union, Tuple
+
+if TYPE_CHECKING:
+    from core.backtest_cache import BacktestCache
+    from core.order_book import OrderBook
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+WARMUP_CANDLES = 30 # Candles iniciais reservados para os indicadores
+
 class Backtester:
     def __init__(
         self,
-        historical_data: List[List[Union[int, float]]],
+        historical_data: Union[List[List[Union[int, float]]], np.ndarray, Dict[str, np.ndarray]],
         settings_manager: 'SettingsManager',
         initial_balance: float = 10000,
         slippage: float = 0.001,
-        commission: float = 0.0005
+        commission: float = 0.0005,
+        keep_trades: bool = True,
+        spill_path: Optional[str] = None,
+        spill_chunk_size: int = 10000,
+        cache: Optional['BacktestCache'] = None,
+        order_book: Optional['OrderBook'] = None
     ):
-        self.data = pd.DataFrame(
-            historical_data,
-            columns=['timestamp', 'open', 'high', 'low', 'close', 'volume']
-        )
-        self.data['datetime'] = pd.to_datetime(self.data['timestamp'], unit='ms')
-        self.data.set_index('datetime', inplace=True) # Define datetime como índice
-        
+        """
+        Args:
+            keep_trades (bool): Mantém cada trade em ``self.results``. Com False
+                as métricas são acumuladas durante o backtest, em memória constante.
+            spill_path (str): Arquivo CSV onde os trades são gravados em blocos.
+            cache (BacktestCache): Cache de resultados consultado por ``run``.
+            order_book (OrderBook): Livro de ofertas registrado; o slippage de
+                compra e de venda passa a ser o impacto de ``order_size`` no
+                livro, no lugar do ``slippage`` fixo.
+        """
         # Valida dados históricos
-        required_columns = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
-        if not all(col in historical_data[0] for col in required_columns):
+        required_columns = OHLCV_COLUMNS
+        if isinstance(historical_data, dict): # Colunas (ex.: arrays mapeados do CandleStore), usadas sem cópia
+            if any(col not in historical_data for col in required_columns):
+                raise ValueError("Dados históricos incompletos")
+            self.data = pd.DataFrame({col: historical_data[col] for col in required_columns}, copy=False)
+        else:
+            if len(historical_data) == 0 or len(historical_data[0]) != len(required_columns):
+                raise ValueError("Dados históricos incompletos")
+            self.data = pd.DataFrame(historical_data, columns=required_columns)
+        if self.data.empty:
             raise ValueError("Dados históricos incompletos")
-        
-        self.data = pd.DataFrame(
-            historical_data,
-            columns=required_columns
-        )
+
         self.data['datetime'] = pd.to_datetime(self.data['timestamp'], unit='ms')
+        self.data.set_index('datetime', drop=False, inplace=True) # Define datetime como índice
         self.settings_manager = settings_manager
-        asyncio.run(self.settings_manager.load())
+        if self.settings_manager.settings is None: # Carrega do arquivo apenas se ainda não houver configurações
+            asyncio.run(self.settings_manager.load())
         self.settings = self.settings_manager.settings
         self.initial_balance = initial_balance
         self.slippage = slippage
+        self.order_book = order_book
+        self.buy_slippage = self._depth_slippage('buy')
+        self.sell_slippage = self._depth_slippage('sell')
         self.commission = commission
         self.results: List[Dict[str, Any]] = [] # Type hint
         self.metrics: Dict[str, Any] = {} # Type hint
-
-    def run(self, strategy_class=TradingStrategy): # Aceita a classe da estratégia como parâmetro
-        """Executa backtest completo com logs detalhados."""
+        self.keep_trades = keep_trades
+        self.accumulator = MetricsAccumulator()
+        self.spill = TradeSpill(spill_path, spill_chunk_size) if spill_path else None
+        self.cache = cache
+
+    @classmethod
+    def from_store(
+        cls,
+        store: 'CandleStore',
+        symbol: str,
+        timeframe: str,
+        settings_manager: 'SettingsManager',
+        start: int = None,
+        end: int = None,
+        **kwargs
+    ) -> 'Backtester':
+        """Cria o backtester sobre as colunas mapeadas de um ``CandleStore``."""
+        return cls(store.load(symbol, timeframe, start, end), settings_manager, **kwargs)
+
+    def run(self, strategy_class=TradingStrategy, vectorized: bool = False, signals: np.ndarray = None): # Aceita a classe da estratégia como parâmetro
+        """Executa backtest completo com logs detalhados.
+
+        Com ``vectorized=True`` os sinais de todos os candles são gerados em
+        uma única passada (``strategy_class.vectorized_signals``), com os
+        mesmos trades do loop candle a candle. ``signals`` permite informar
+        sinais já calculados (ex.: uma linha de ``core.kernels.signal_matrix``).
+        """
         logger.info(" Iniciando backtest ".center(60, '-'))
 
         # Mostra amostra dos dados
         logger.debug(f"Dados carregados: {len(self.data)} candles")
         logger.debug(f"Primeiro candle: {self.data.iloc[0].to_dict()}")
 
+        # Sinais externos não fazem parte da chave e o arquivo de spill precisa ser gerado: sem cache
+        cache_key = None
+        if self.cache is not None and signals is None and self.spill is None:
+            cache_key = self.cache.make_key(self, strategy_class)
+            cached = self.cache.get(cache_key)
+            if cached is not None and (cached[1] is not None or not self.keep_trades):
+                metrics, trades = cached
+                if self.keep_trades:
+                    self.results = trades
+                logger.info("Resultado do backtest obtido do cache")
+                return self._log_metrics(metrics)
+
+        if vectorized or signals is not None:
+            metrics = self._run_vectorized(strategy_class, signals)
+        else:
+            metrics = self._run_loop(strategy_class)
+
+        if cache_key is not None:
+            self.cache.put(cache_key, metrics, self.results if self.keep_trades else None)
+        return metrics
+
+    def _run_loop(self, strategy_class) -> Dict[str, Any]:
+        """Executa a estratégia candle a candle."""
         balance = self.initial_balance
-        for i in range(30, len(self.data)): # Inicia após os primeiros 30 candles para indicadores
-            current_data = self.data.iloc[:i+1].values.tolist() # Converte para lista para compatibilidade com TradingStrategy
+        for i in range(WARMUP_CANDLES, len(self.data)): # Inicia após os primeiros 30 candles para indicadores
+            current_data = self.data[OHLCV_COLUMNS].iloc[:i+1].values.tolist() # Converte para lista para compatibilidade com TradingStrategy
             strategy = strategy_class(current_data, self.settings) # Usa a classe de estratégia fornecida
 
             if strategy.signal != TradingSignal.HOLD: # Usa TradingSignal.HOLD
@@ -80,7 +155,7 @@ class Backtester:
 
                 balance += pnl # Atualiza o saldo
 
-                self.results.append({
+                self._record_trade({
                     'datetime': self.data.index[i], # Usa o índice datetime
                     'signal': strategy.signal,
                     'entry_price': entry_price,
@@ -92,17 +167,102 @@ class Backtester:
 
         return self.analyze_results()
 
+    def _record_trade(self, trade: Dict[str, Any]) -> None:
+        """Registra um trade nas métricas acumuladas, na lista e/ou no arquivo."""
+        self.accumulator.add(trade['pnl'], trade['balance'])
+        if self.keep_trades:
+            self.results.append(trade)
+        if self.spill is not None:
+            self.spill.append(trade)
+
+    def _run_vectorized(self, strategy_class, signals: np.ndarray = None) -> Dict[str, Any]:
+        """Gera sinais e trades de toda a série com operações em lote."""
+        if signals is None:
+            signals = strategy_class.vectorized_signals(self.data['close'].to_numpy(dtype=np.float64), self.settings)
+        else:
+            signals = np.array(signals, dtype=np.int8) # Cópia: o aquecimento abaixo zera o início
+        signals[:WARMUP_CANDLES] = 0
+        return self._record_vectorized(self._vectorized_trades(signals))
+
+    def _vectorized_trades(self, signals: np.ndarray, last_close: float = None) -> Dict[str, np.ndarray]:
+        """Trades dos candles com sinal, sem saldo: o PnL de cada trade não depende dos anteriores.
+
+        ``last_close`` é o preço de saída quando nem take profit nem stop loss
+        são atingidos (por padrão, o último fechamento de ``self.data``).
+        """
+        idx = np.flatnonzero(signals)
+        is_buy = signals[idx] > 0
+        opens = self.data['open'].to_numpy(dtype=np.float64)[idx]
+        highs = self.data['high'].to_numpy(dtype=np.float64)[idx]
+        lows = self.data['low'].to_numpy(dtype=np.float64)[idx]
+        closes = self.data['close'].to_numpy(dtype=np.float64)[idx]
+        if last_close is None:
+            last_close = float(self.data['close'].iloc[-1])
+        quantity = self.settings.order_size
+        stop_loss = self.settings.stop_loss_percent / 100
+        take_profit = self.settings.take_profit_percent / 100
+
+        entry = np.where(is_buy, opens * (1 + self.buy_slippage), opens * (1 - self.sell_slippage))
+        stop_loss_price = np.where(is_buy, closes * (1 - stop_loss), closes * (1 + stop_loss))
+        take_profit_price = np.where(is_buy, closes * (1 + take_profit), closes * (1 - take_profit))
+
+        # Mesma prioridade de _calculate_exit_price_and_pnl: take profit, stop loss, último fechamento
+        buy_exit = np.where(highs >= take_profit_price, take_profit_price,
+                            np.where(lows <= stop_loss_price, stop_loss_price, last_close))
+        sell_exit = np.where(lows <= take_profit_price, take_profit_price,
+                             np.where(highs >= stop_loss_price, stop_loss_price, last_close))
+        exit_price = np.where(is_buy, buy_exit, sell_exit)
+        gross = np.where(is_buy, (exit_price - entry) * quantity, (entry - exit_price) * quantity)
+        pnl = gross - (exit_price + entry) * quantity * self.commission
+        return {'idx': idx, 'signal': signals[idx], 'entry_price': entry, 'exit_price': exit_price, 'pnl': pnl}
+
+    def _record_vectorized(self, trades: Dict[str, np.ndarray]) -> Dict[str, Any]:
+        """Calcula o saldo, registra os trades de ``_vectorized_trades`` e retorna as métricas."""
+        idx, codes = trades['idx'], trades['signal']
+        if len(idx) == 0:
+            return self.analyze_results()
+        entry, exit_price, pnl = trades['entry_price'], trades['exit_price'], trades['pnl']
+        quantity = self.settings.order_size
+
+        # cumsum sequencial reproduz exatamente o "balance += pnl" do loop
+        balance = np.cumsum(np.concatenate(([self.initial_balance], pnl)))[1:]
+
+        self.accumulator.add_many(pnl, balance)
+        if self.spill is not None:
+            self.spill.append_frame(pd.DataFrame({
+                'datetime': self.data.index[idx],
+                'signal': [SIGNAL_CODES[int(code)] for code in codes],
+                'entry_price': entry,
+                'exit_price': exit_price,
+                'quantity': quantity,
+                'pnl': pnl,
+                'balance': balance
+            }))
+        if self.keep_trades:
+            index = self.data.index[idx]
+            for j in range(len(idx)):
+                self.results.append({
+                    'datetime': index[j],
+                    'signal': SIGNAL_CODES[int(codes[j])],
+                    'entry_price': entry[j],
+                    'exit_price': exit_price[j],
+                    'quantity': quantity,
+                    'pnl': pnl[j],
+                    'balance': balance[j]
+                })
+
+        return self.analyze_results()
+
     def analyze_results(self):
         """Calcula métricas de desempenho realistas."""
+        if self.spill is not None:
+            self.spill.flush()
+
+        if not self.keep_trades: # Métricas já acumuladas durante o backtest
+            return self._log_metrics(self.accumulator.metrics())
+
         if not self.results:
-            logger.warning("Nenhum trade válido encontrado")
-            return {
-                'total_trades': 0,
-                'win_rate': 0.0,
-                'net_profit': 0.0,
-                'max_drawdown': 0.0,
-                'profit_factor': 0.0 # Inicializa profit_factor como 0.0
-            }
+            return self._log_metrics(empty_metrics())
 
         df = pd.DataFrame(self.results)
         winning_trades = len(df[df['pnl'] > 0])
@@ -114,13 +274,19 @@ class Backtester:
         win_rate = (winning_trades / total_trades) * 100 if total_trades > 0 else 0.0 # Evita divisão por zero
         profit_factor = (df[df['pnl'] > 0]['pnl'].sum() / abs(df[df['pnl'] < 0]['pnl'].sum())) if losing_trades > 0 else float('inf') # Calcula profit factor
 
-        self.metrics = {
+        return self._log_metrics({
             'total_trades': total_trades,
             'win_rate': win_rate,
             'net_profit': net_profit,
             'max_drawdown': max_drawdown,
             'profit_factor': profit_factor
-        }
+        })
+
+    def _log_metrics(self, metrics: Dict[str, Any]) -> Dict[str, Any]:
+        self.metrics = metrics
+        if not metrics['total_trades']:
+            logger.warning("Nenhum trade válido encontrado")
+            return self.metrics
 
         logger.info(f"Resultados do Backtest:")
         for metric, value in self.metrics.items():
@@ -129,6 +295,21 @@ class Backtester:
         return self.metrics
 
 
+    def export_results(self, path: str = 'data/backtest_results', append: bool = False) -> 'ResultStore':
+        """Grava os trades e a curva de equity em Parquet, com o sidecar de métricas.
+
+        Com ``append=False`` os resultados anteriores em ``path`` são substituídos.
+        """
+        store = ResultStore(path)
+        if not append:
+            store.clear()
+        if self.results:
+            store.append(self.results)
+        elif self.spill is not None: # Backtest em streaming: trades lidos do arquivo de spill em blocos
+            for chunk in self.spill.read_chunks():
+                store.append(chunk)
+        return store
+
     def plot_results(self):
         """Plota os resultados do backtest."""
 
@@ -162,14 +343,22 @@ class Backtester:
         plt.show()
 
 
+    def _depth_slippage(self, side: str) -> float:
+        """Impacto de ``order_size`` em ``order_book`` para ``side``, ou o slippage fixo."""
+        if self.order_book is None:
+            return self.slippage
+        impact = self.order_book.impact(side, self.settings.order_size)
+        if impact is None:
+            logger.warning(f"Livro de ofertas sem profundidade para {self.settings.order_size} ({side}); usando slippage fixo")
+            return self.slippage
+        return impact
+
     def _apply_slippage(self, price: float, signal: TradingSignal) -> float:
         """Aplica slippage ao preço de entrada."""
-        slippage_percentage = self.settings.slippage
-
         if signal == TradingSignal.STRONG_BUY:
-            return price * (1 + slippage_percentage)
+            return price * (1 + self.buy_slippage)
         elif signal == TradingSignal.STRONG_SELL:
-            return price * (1 - slippage_percentage)
+            return price * (1 - self.sell_slippage)
         else:
             return price
 
@@ -0,0 +1,188 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import ccxt.async_support as ccxt_async
+import numpy as np
+
+from core.ohlcv_buffer import OHLCVRingBuffer
+
+Candle = List[Union[int, float]]
+VECTOR_BATCH_MIN = 128 # Trades por mensagem a partir dos quais a agregação vetorizada compensa (medido)
+BATCH_CAPACITY = 512 # Tamanho inicial dos arrays reutilizados; dobra quando um lote não cabe
+
+
+def _timestamp(row: tuple) -> int:
+    return row[0]
+
+
+class CandleBuilder:
+    """Monta candles OHLCV incrementalmente a partir do stream de trades.
+
+    Cada trade ``[timestamp, preço, tamanho, ...]`` (formato do canal
+    ``trade`` da Bitget, valores em texto) atualiza o candle em aberto de
+    cada timeframe. Quando chega um trade de um período posterior, o candle
+    anterior é fechado e retornado por ``add_trades`` como ``(timeframe,
+    candle)``; ``close_elapsed`` fecha pelo relógio quando não há trades
+    após o fim do período. Trades de candles já fechados são ignorados
+    (``late_trades``). Os candles ficam em um ``OHLCVRingBuffer`` por
+    timeframe, com o candle em aberto na última posição, como em
+    ``fetch_ohlcv``.
+    """
+
+    def __init__(self, timeframes: Iterable[str], capacity: int = 100):
+        self.timeframes: Dict[str, int] = {
+            timeframe: ccxt_async.Exchange.parse_timeframe(timeframe) * 1000 for timeframe in timeframes
+        }
+        self.capacity = capacity
+        self.buffers: Dict[str, OHLCVRingBuffer] = {tf: OHLCVRingBuffer(capacity) for tf in self.timeframes}
+        self.late_trades = 0
+        self._open: Dict[str, Optional[Candle]] = {tf: None for tf in self.timeframes}
+        self._emitted: Dict[str, bool] = {tf: False for tf in self.timeframes} # Candle em aberto já fechado pelo relógio
+        self.last_trade: Optional[Tuple[int, float]] = None # (timestamp, preço) do trade mais recente
+        self._batch_ts = np.empty(BATCH_CAPACITY, dtype=np.int64) # Arrays reutilizados entre lotes
+        self._batch_price = np.empty(BATCH_CAPACITY, dtype=np.float64)
+        self._batch_size = np.empty(BATCH_CAPACITY, dtype=np.float64)
+
+    def add_trades(self, trades: Sequence[Sequence[Union[str, int, float]]]) -> List[Tuple[str, Candle]]:
+        """Processa um lote de trades e retorna os candles fechados, em ordem.
+
+        Lotes a partir de ``VECTOR_BATCH_MIN`` trades (snapshots e rajadas)
+        são convertidos de uma vez para arrays pré-alocados e agregados com
+        NumPy; lotes pequenos seguem pelo laço Python, mais barato para eles.
+        """
+        if len(trades) >= VECTOR_BATCH_MIN:
+            count = len(trades)
+            if count > len(self._batch_ts):
+                self._allocate_batch(count)
+            columns = list(zip(*trades)) # int()/float() convertem texto mais rápido que np.array sobre strings
+            self._batch_ts[:count] = list(map(int, columns[0]))
+            self._batch_price[:count] = list(map(float, columns[1]))
+            self._batch_size[:count] = list(map(float, columns[2]))
+            return self.add_trade_arrays(self._batch_ts[:count], self._batch_price[:count], self._batch_size[:count])
+
+        rows = sorted(((int(t[0]), float(t[1]), float(t[2])) for t in trades), key=_timestamp) # Snapshots chegam do mais novo ao mais antigo
+        if not rows:
+            return []
+        closed = []
+        late = 0
+        for timeframe, timeframe_ms in self.timeframes.items():
+            candle = self._open[timeframe]
+            timeframe_late = 0
+            for timestamp, price, size in rows:
+                start = timestamp - timestamp % timeframe_ms
+                if candle is None or start > candle[0]:
+                    if candle is not None:
+                        self.buffers[timeframe].append(candle)
+                        if not self._emitted[timeframe]:
+                            closed.append((timeframe, candle))
+                    candle = [start, price, price, price, price, size]
+                    self._emitted[timeframe] = False
+                elif start < candle[0]:
+                    timeframe_late += 1
+                else:
+                    if price > candle[2]:
+                        candle[2] = price
+                    elif price < candle[3]:
+                        candle[3] = price
+                    candle[4] = price
+                    candle[5] += size
+            late = max(late, timeframe_late)
+            self._open[timeframe] = candle
+            self.buffers[timeframe].append(candle) # Uma escrita por lote no candle em aberto
+        self.late_trades += late
+        self.last_trade = rows[-1][:2]
+        return closed
+
+    def add_trade_arrays(self, timestamps: np.ndarray, prices: np.ndarray, sizes: np.ndarray) -> List[Tuple[str, Candle]]:
+        """Versão vetorizada de ``add_trades`` para arrays de timestamp (ms), preço e tamanho."""
+        if not len(timestamps):
+            return []
+        if np.any(timestamps[1:] < timestamps[:-1]):
+            order = np.argsort(timestamps, kind='stable')
+            timestamps, prices, sizes = timestamps[order], prices[order], sizes[order]
+        closed = []
+        late = 0
+        for timeframe, timeframe_ms in self.timeframes.items():
+            starts = timestamps - timestamps % timeframe_ms
+            candle = self._open[timeframe]
+            price, size = prices, sizes
+            if candle is not None and starts[0] < candle[0]:
+                valid = starts >= candle[0]
+                late = max(late, len(starts) - int(np.count_nonzero(valid)))
+                starts, price, size = starts[valid], price[valid], size[valid]
+                if not len(starts):
+                    continue
+
+            if starts[0] == starts[-1]: # Lote inteiro no mesmo candle: caso comum nas rajadas
+                groups = [[int(starts[0]), float(price[0]), float(price.max()), float(price.min()), float(price[-1]), float(size.sum())]]
+            else:
+                first = np.concatenate(([0], np.flatnonzero(np.diff(starts)) + 1))
+                last = np.append(first[1:] - 1, len(starts) - 1)
+                groups = np.column_stack((
+                    starts[first], price[first], np.maximum.reduceat(price, first),
+                    np.minimum.reduceat(price, first), price[last], np.add.reduceat(size, first)
+                )).tolist()
+            for group in groups:
+                group[0] = int(group[0])
+                if candle is not None and group[0] == candle[0]: # Continua o candle em aberto
+                    candle[2] = max(candle[2], group[2])
+                    candle[3] = min(candle[3], group[3])
+                    candle[4] = group[4]
+                    candle[5] += group[5]
+                    continue
+                if candle is not None:
+                    self.buffers[timeframe].append(candle)
+                    if not self._emitted[timeframe]:
+                        closed.append((timeframe, candle))
+                candle = group
+                self._emitted[timeframe] = False
+            self._open[timeframe] = candle
+            self.buffers[timeframe].append(candle)
+        self.late_trades += late
+        self.last_trade = (int(timestamps[-1]), float(prices[-1]))
+        return closed
+
+    def _allocate_batch(self, count: int) -> None:
+        capacity = max(count, 2 * len(self._batch_ts))
+        self._batch_ts = np.empty(capacity, dtype=np.int64)
+        self._batch_price = np.empty(capacity, dtype=np.float64)
+        self._batch_size = np.empty(capacity, dtype=np.float64)
+
+    def close_elapsed(self, now_ms: int) -> List[Tuple[str, Candle]]:
+        """Fecha os candles em aberto cujo período terminou antes de ``now_ms`` sem novos trades."""
+        closed = []
+        for timeframe, timeframe_ms in self.timeframes.items():
+            candle = self._open[timeframe]
+            if candle is not None and not self._emitted[timeframe] and now_ms >= candle[0] + timeframe_ms:
+                self._emitted[timeframe] = True
+                closed.append((timeframe, list(candle)))
+        return closed
+
+    def next_close(self, timeframe: str) -> Optional[int]:
+        """Timestamp (ms) de fechamento do candle em aberto, ou None sem candle pendente."""
+        candle = self._open[timeframe]
+        if candle is None or self._emitted[timeframe]:
+            return None
+        return candle[0] + self.timeframes[timeframe]
+
+    def seed(self, timeframe: str, ohlcv: Sequence[Sequence[Union[int, float]]]) -> OHLCVRingBuffer:
+        """Preenche o histórico com candles da API REST, preservando os já montados pelo stream.
+
+        O candle comum às duas fontes (o em aberto quando o stream começou)
+        mantém abertura e volume da API e amplia máxima e mínima com os
+        trades recebidos, terminando no último preço do stream.
+        """
+        history = [list(candle[:6]) for candle in ohlcv]
+        if not history:
+            return self.buffers[timeframe]
+        buffer = OHLCVRingBuffer(self.capacity)
+        buffer.extend(history)
+        last = history[-1]
+        for candle in self.buffers[timeframe].to_list():
+            if candle[0] == last[0]:
+                buffer.append([last[0], last[1], max(last[2], candle[2]), min(last[3], candle[3]), candle[4], max(last[5], candle[5])])
+            elif candle[0] > last[0]:
+                buffer.append(candle)
+        self.buffers[timeframe] = buffer
+        self._open[timeframe] = buffer.to_list()[-1]
+        self._emitted[timeframe] = False
+        return buffer
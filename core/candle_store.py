@@ -0,0 +1,120 @@
+import json
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence, Union
+
+import numpy as np
+from loguru import logger
+
+# Um arquivo binário por coluna, sem cabeçalho: o número de candles é o tamanho / itemsize
+COLUMN_DTYPES: Dict[str, np.dtype] = {
+    'timestamp': np.dtype('<i8'),
+    'open': np.dtype('<f8'),
+    'high': np.dtype('<f8'),
+    'low': np.dtype('<f8'),
+    'close': np.dtype('<f8'),
+    'volume': np.dtype('<f8'),
+}
+
+
+class CandleStore:
+    """Armazenamento colunar de candles OHLCV em disco, por símbolo e timeframe.
+
+    Cada coluna fica em um arquivo ``<coluna>.bin`` mapeável em memória
+    (``np.memmap``): leituras não carregam o arquivo inteiro e processos
+    diferentes compartilham o page cache do sistema operacional.
+    """
+
+    def __init__(self, root: Union[str, Path] = 'data/candles'):
+        self.root = Path(root)
+
+    def path(self, symbol: str, timeframe: str) -> Path:
+        symbol_dir = symbol.replace('/', '').replace(':', '').upper()
+        return self.root / symbol_dir / timeframe
+
+    def count(self, symbol: str, timeframe: str) -> int:
+        """Quantidade de candles armazenados."""
+        ts_file = self.path(symbol, timeframe) / 'timestamp.bin'
+        if not ts_file.exists():
+            return 0
+        return ts_file.stat().st_size // COLUMN_DTYPES['timestamp'].itemsize
+
+    def last_timestamp(self, symbol: str, timeframe: str) -> Optional[int]:
+        count = self.count(symbol, timeframe)
+        if not count:
+            return None
+        timestamps = self._memmap(symbol, timeframe, 'timestamp', count)
+        return int(timestamps[-1])
+
+    def append(self, symbol: str, timeframe: str, ohlcv: Union[Sequence[Sequence[float]], np.ndarray]) -> int:
+        """Acrescenta candles ao final, ignorando os que não são posteriores ao último.
+
+        Retorna a quantidade de candles gravados.
+        """
+        rows = np.asarray(ohlcv, dtype=np.float64)
+        if rows.size == 0:
+            return 0
+        if rows.ndim != 2 or rows.shape[1] != len(COLUMN_DTYPES):
+            raise ValueError("Dados históricos incompletos")
+
+        timestamps = rows[:, 0].astype(np.int64)
+        order = np.argsort(timestamps, kind='stable')
+        timestamps, rows = timestamps[order], rows[order]
+        keep = np.r_[True, np.diff(timestamps) > 0] # Remove duplicados dentro do lote
+        last = self.last_timestamp(symbol, timeframe)
+        if last is not None:
+            keep &= timestamps > last
+        timestamps, rows = timestamps[keep], rows[keep]
+        if not len(rows):
+            return 0
+
+        directory = self.path(symbol, timeframe)
+        directory.mkdir(parents=True, exist_ok=True)
+        count = self.count(symbol, timeframe)
+        # timestamp é gravado por último: só conta como armazenado o que foi gravado em todas as colunas
+        for i, name in reversed(list(enumerate(COLUMN_DTYPES))):
+            dtype = COLUMN_DTYPES[name]
+            values = timestamps if name == 'timestamp' else rows[:, i]
+            with open(directory / f'{name}.bin', 'ab') as f:
+                f.truncate(count * dtype.itemsize) # Descarta sobras de uma gravação interrompida
+                f.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+        self._write_meta(directory, symbol, timeframe)
+        logger.debug(f"{len(rows)} candles gravados em {directory}")
+        return len(rows)
+
+    def load(
+        self,
+        symbol: str,
+        timeframe: str,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        columns: Iterable[str] = tuple(COLUMN_DTYPES)
+    ) -> Dict[str, np.ndarray]:
+        """Colunas dos candles com ``start <= timestamp < end`` (ms), sem cópia.
+
+        O intervalo é localizado por busca binária nos timestamps mapeados,
+        então apenas as páginas acessadas são lidas do disco.
+        """
+        count = self.count(symbol, timeframe)
+        if not count:
+            return {name: np.empty(0, dtype=COLUMN_DTYPES[name]) for name in columns}
+
+        timestamps = self._memmap(symbol, timeframe, 'timestamp', count)
+        first = 0 if start is None else int(np.searchsorted(timestamps, start, side='left'))
+        last = count if end is None else int(np.searchsorted(timestamps, end, side='left'))
+        return {
+            name: self._memmap(symbol, timeframe, name, count)[first:last]
+            for name in columns
+        }
+
+    def _memmap(self, symbol: str, timeframe: str, name: str, count: int) -> np.ndarray:
+        path = self.path(symbol, timeframe) / f'{name}.bin'
+        return np.memmap(path, dtype=COLUMN_DTYPES[name], mode='r', shape=(count,))
+
+    def _write_meta(self, directory: Path, symbol: str, timeframe: str) -> None:
+        meta = {
+            'symbol': symbol,
+            'timeframe': timeframe,
+            'columns': {name: dtype.str for name, dtype in COLUMN_DTYPES.items()},
+        }
+        with open(directory / 'meta.json', 'w') as f:
+            json.dump(meta, f, indent=2)
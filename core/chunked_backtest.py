@@ -0,0 +1,85 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from config.settings import Settings
+from core.backtester import Backtester, OHLCV_COLUMNS, WARMUP_CANDLES
+from core.strategy import TradingStrategy
+from core.worker_pool import init_worker, shared_arrays, worker_state
+
+# Aquecimento por período: o resíduo de uma EMA após 50 spans é ~e^-100, abaixo da precisão de float64
+WARMUP_SPANS = 50
+RSI_PERIOD = 14
+
+
+def default_warmup(settings: Settings) -> int:
+    """Candles de sobreposição para RSI e MACD convergirem no início de cada bloco."""
+    return WARMUP_SPANS * max(RSI_PERIOD, settings.macd_slow, settings.macd_signal)
+
+
+def _run_chunk(task: Tuple[type, int, int, int]) -> Dict[str, np.ndarray]:
+    """Trades de ``[start, end)``, com sinais calculados a partir de ``warmup_start``."""
+    strategy_class, warmup_start, start, end = task
+    data = worker_state['data']
+    backtester = Backtester(data[warmup_start:end], worker_state['settings_manager'], **worker_state['backtest_kwargs'])
+    signals = strategy_class.vectorized_signals(data[warmup_start:end, 4], backtester.settings)
+    signals[:max(start, WARMUP_CANDLES) - warmup_start] = 0 # Sobreposição e aquecimento global não geram trades
+    trades = backtester._vectorized_trades(signals, last_close=float(data[-1, 4]))
+    trades['idx'] = trades['idx'] + warmup_start # Índices relativos à série completa
+    return trades
+
+
+class ChunkedBacktest:
+    """Backtest vetorizado de uma única série longa dividido em blocos de tempo.
+
+    Cada bloco roda em um processo, com ``warmup`` candles anteriores para o
+    RSI e o MACD convergirem. Como o PnL de cada trade não depende do saldo,
+    os trades são concatenados em ordem e o saldo, o drawdown e as métricas
+    são recalculados sobre a série completa pelo ``backtester`` original.
+
+    Tolerância: com o aquecimento padrão os trades coincidem com
+    ``Backtester.run(vectorized=True)`` e as métricas diferem no máximo por
+    arredondamento (erro relativo < 1e-9); um cruzamento MACD exatamente no
+    limite da precisão de float64 pode, em tese, mudar de lado.
+    """
+
+    def __init__(
+        self,
+        backtester: Backtester,
+        chunks: Optional[int] = None,
+        warmup: Optional[int] = None,
+        max_workers: Optional[int] = None
+    ):
+        self.backtester = backtester
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunks = chunks or self.max_workers
+        self.warmup = warmup if warmup is not None else default_warmup(backtester.settings)
+
+    def boundaries(self) -> List[Tuple[int, int, int]]:
+        """``(início do aquecimento, início, fim)`` de cada bloco."""
+        edges = np.linspace(0, len(self.backtester.data), self.chunks + 1).astype(int)
+        return [
+            (max(0, start - self.warmup), int(start), int(end))
+            for start, end in zip(edges[:-1], edges[1:]) if end > start
+        ]
+
+    def run(self, strategy_class=TradingStrategy) -> Dict[str, Any]:
+        """Executa os blocos em paralelo e retorna as métricas da série completa."""
+        backtester = self.backtester
+        data = backtester.data[OHLCV_COLUMNS].to_numpy(dtype=np.float64)
+        tasks = [(strategy_class, *bounds) for bounds in self.boundaries()]
+        logger.info(f"Backtest em {len(tasks)} blocos ({self.warmup} candles de aquecimento) em {self.max_workers} processos")
+
+        backtest_kwargs = {'slippage': backtester.slippage, 'commission': backtester.commission, 'order_book': backtester.order_book}
+        with shared_arrays(data=data) as arrays, ProcessPoolExecutor(
+            max_workers=min(self.max_workers, len(tasks)),
+            initializer=init_worker,
+            initargs=(arrays, backtester.settings.model_dump(), {'backtest_kwargs': backtest_kwargs})
+        ) as executor:
+            parts = list(executor.map(_run_chunk, tasks))
+
+        trades = {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+        return backtester._record_vectorized(trades)
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import ccxt.async_support as ccxt_async
+import numpy as np
+from loguru import logger
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+
+from core.candle_store import CandleStore
+from core.rate_limiter import PRIORITY_BACKFILL, RateLimitScheduler
+
+
+class HistoricalDownloader:
+    """Baixa históricos OHLCV para vários símbolos e timeframes.
+
+    Cada série é paginada com ``since`` de forma sequencial e as séries
+    rodam em paralelo, limitadas por ``max_concurrency`` e por um intervalo
+    mínimo entre requisições. O cursor de cada série é salvo em
+    ``checkpoint_path`` após cada página, permitindo retomar o download.
+    Ao fim de cada série, ``verify`` confere a série armazenada; o resultado
+    fica em ``reports`` e lacunas ou duplicados são registrados no log.
+    Aceita qualquer objeto com ``fetch_ohlcv`` assíncrono (ex.:
+    ``BitgetAPIConnector.exchange`` ou uma exchange falsa nos testes).
+    """
+
+    def __init__(
+        self,
+        exchange: Any,
+        store: CandleStore,
+        checkpoint_path: Union[str, Path] = 'data/download_checkpoint.json',
+        max_concurrency: int = 4,
+        requests_per_second: float = 10.0,
+        page_limit: int = 200,
+        rate_limiter: Optional[RateLimitScheduler] = None
+    ):
+        self.exchange = exchange
+        self.rate_limiter = rate_limiter # Se informado, substitui o intervalo mínimo próprio
+        self.store = store
+        self.checkpoint_path = Path(checkpoint_path)
+        self.page_limit = page_limit
+        self.min_interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._throttle_lock = asyncio.Lock()
+        self._next_request_at = 0.0
+        self._checkpoint: Dict[str, int] = self._load_checkpoint()
+        self.reports: Dict[Tuple[str, str], Dict[str, Any]] = {} # Resultado de verify por série baixada
+
+    async def download(
+        self,
+        symbols: Iterable[str],
+        timeframes: Iterable[str],
+        since: int,
+        until: Optional[int] = None
+    ) -> Dict[Tuple[str, str], int]:
+        """Baixa ``[since, until)`` (ms) de todas as combinações símbolo/timeframe.
+
+        Retorna a quantidade de candles gravados por série.
+        """
+        until = until if until is not None else int(time.time() * 1000)
+        jobs = [(symbol, timeframe) for symbol in symbols for timeframe in timeframes]
+        written = await asyncio.gather(*(self._download_series(s, tf, since, until) for s, tf in jobs))
+        return dict(zip(jobs, written))
+
+    def verify(self, symbol: str, timeframe: str) -> Dict[str, Any]:
+        """Verifica a série armazenada: lacunas, duplicados e ordem dos timestamps."""
+        timeframe_ms = ccxt_async.Exchange.parse_timeframe(timeframe) * 1000
+        timestamps = self.store.load(symbol, timeframe, columns=['timestamp'])['timestamp']
+        steps = np.diff(timestamps)
+        gap_idx = np.flatnonzero(steps > timeframe_ms)
+        return {
+            'candles': len(timestamps),
+            'duplicates': int(np.count_nonzero(steps == 0)),
+            'out_of_order': int(np.count_nonzero(steps < 0)),
+            'gaps': [(int(timestamps[i]), int(timestamps[i + 1])) for i in gap_idx],
+        }
+
+    async def _download_series(self, symbol: str, timeframe: str, since: int, until: int) -> int:
+        timeframe_ms = ccxt_async.Exchange.parse_timeframe(timeframe) * 1000
+        key = self._key(symbol, timeframe)
+        cursor = max(since, self._checkpoint.get(key, since))
+        last_stored = self.store.last_timestamp(symbol, timeframe)
+        if last_stored is not None:
+            cursor = max(cursor, last_stored + timeframe_ms)
+        # Somente candles fechados: o candle em aberto ainda pode mudar
+        closed_until = min(until, int(time.time() * 1000) // timeframe_ms * timeframe_ms)
+
+        written = 0
+        while cursor < closed_until:
+            page = await self._fetch_page(symbol, timeframe, cursor)
+            candles = [c for c in page if cursor <= c[0] < closed_until]
+            if candles:
+                written += self.store.append(symbol, timeframe, candles)
+                cursor = int(max(c[0] for c in candles)) + timeframe_ms
+            elif page and page[-1][0] >= closed_until:
+                cursor = closed_until
+            else:
+                # Página vazia (ex.: antes da listagem do par): avança uma página inteira
+                cursor += self.page_limit * timeframe_ms
+            self._checkpoint[key] = cursor
+            self._save_checkpoint()
+
+        logger.info(f"Download de {symbol} {timeframe} concluído: {written} candles novos")
+        report = self.reports[(symbol, timeframe)] = self.verify(symbol, timeframe)
+        if report['gaps'] or report['duplicates'] or report['out_of_order']:
+            logger.warning(
+                f"Série {symbol} {timeframe} com {len(report['gaps'])} lacunas, {report['duplicates']} duplicados "
+                f"e {report['out_of_order']} fora de ordem (primeira lacuna: {report['gaps'][:1]})"
+            )
+        return written
+
+    @retry(
+        retry=retry_if_exception_type((ccxt_async.NetworkError, ccxt_async.RateLimitExceeded)),
+        wait=wait_exponential(multiplier=1, min=1, max=10),
+        stop=stop_after_attempt(5),
+        reraise=True
+    ) # Repetição com backoff exponencial
+    async def _fetch_page(self, symbol: str, timeframe: str, since: int) -> List[List[Union[int, float]]]:
+        async with self._semaphore:
+            if self.rate_limiter is not None: # Orçamento compartilhado com o bot, abaixo dos dados ao vivo
+                return await self.rate_limiter.call(
+                    'fetch_ohlcv',
+                    lambda: self.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=self.page_limit),
+                    PRIORITY_BACKFILL
+                )
+            await self._throttle()
+            return await self.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=self.page_limit)
+
+    async def _throttle(self) -> None:
+        """Garante o intervalo mínimo entre requisições de todas as séries."""
+        async with self._throttle_lock:
+            now = time.monotonic()
+            wait = self._next_request_at - now
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_request_at = max(now, self._next_request_at) + self.min_interval
+
+    def _key(self, symbol: str, timeframe: str) -> str:
+        return f"{symbol}|{timeframe}"
+
+    def _load_checkpoint(self) -> Dict[str, int]:
+        try:
+            with open(self.checkpoint_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except json.JSONDecodeError as e:
+            logger.error(f"Checkpoint inválido em {self.checkpoint_path}: {e}. Recomeçando a partir do armazenamento.")
+            return {}
+
+    def _save_checkpoint(self) -> None:
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.checkpoint_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self._checkpoint, f, indent=2)
+        os.replace(tmp_path, self.checkpoint_path) # Troca atômica: nunca deixa um checkpoint pela metade
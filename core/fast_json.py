@@ -0,0 +1,11 @@
+import json
+
+try:
+    import orjson # Opcional: decodificação várias vezes mais rápida que o json da biblioteca padrão
+except ImportError:
+    orjson = None
+
+JSON_BACKEND = 'orjson' if orjson is not None else 'json'
+
+# Decodifica str ou bytes; atribuído diretamente para não somar uma chamada por mensagem
+loads = orjson.loads if orjson is not None else json.loads
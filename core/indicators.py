@@ -0,0 +1,247 @@
+import math
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+def rsi_series(close: pd.Series, period: int = 14) -> pd.Series:
+    """RSI com médias móveis simples de ganhos e perdas."""
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0)
+    loss = -delta.where(delta < 0, 0)
+
+    avg_gain = gain.rolling(window=period).mean()
+    avg_loss = loss.rolling(window=period).mean()
+
+    rs = avg_gain / avg_loss
+    return 100 - (100 / (1 + rs))
+
+
+def macd_series(close: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[pd.Series, pd.Series, pd.Series]:
+    """Linha MACD, linha de sinal e histograma (EMAs com ``adjust=False``)."""
+    fast_ema = close.ewm(span=fast, adjust=False).mean()
+    slow_ema = close.ewm(span=slow, adjust=False).mean()
+    macd_line = fast_ema - slow_ema
+    signal_line = macd_line.ewm(span=signal, adjust=False).mean()
+    histogram = macd_line - signal_line
+    return macd_line, signal_line, histogram
+
+
+class _RollingMean:
+    """Média móvel de janela fixa atualizada em O(1).
+
+    Reproduz o algoritmo do ``rolling(window).mean()`` do pandas (soma com
+    compensação de Kahan e detecção de valores repetidos), de modo que os
+    valores coincidem com os calculados sobre a janela completa.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values: Deque[float] = deque()
+        self.sum = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.same_count = 0
+        self.prev_value = math.nan
+
+    def push(self, value: float) -> Tuple[float, float]:
+        """Adiciona um valor e retorna (média, valor removido da janela)."""
+        evicted = math.nan
+        if len(self.values) == self.window:
+            evicted = self.values.popleft()
+            y = -evicted - self.comp_remove
+            t = self.sum + y
+            self.comp_remove = t - self.sum - y
+            self.sum = t
+
+        self.values.append(value)
+        y = value - self.comp_add
+        t = self.sum + y
+        self.comp_add = t - self.sum - y
+        self.sum = t
+        if value == self.prev_value:
+            self.same_count += 1
+        else:
+            self.same_count = 1
+        self.prev_value = value
+        return self.mean(), evicted
+
+    def mean(self) -> float:
+        nobs = len(self.values)
+        if nobs < self.window:
+            return math.nan
+        if self.same_count >= nobs:
+            return self.prev_value
+        return max(self.sum / nobs, 0.0) # Entradas são ganhos/perdas, nunca negativas
+
+    def state(self) -> tuple:
+        return (self.sum, self.comp_add, self.comp_remove, self.same_count, self.prev_value)
+
+    def restore(self, state: tuple, evicted: float) -> None:
+        """Desfaz o último ``push`` a partir do estado salvo antes dele."""
+        self.values.pop()
+        if not math.isnan(evicted):
+            self.values.appendleft(evicted)
+        self.sum, self.comp_add, self.comp_remove, self.same_count, self.prev_value = state
+
+
+class _EMA:
+    """EMA equivalente a ``ewm(span=span, adjust=False).mean()`` do pandas."""
+
+    def __init__(self, span: int):
+        com = (span - 1) / 2.0
+        self.alpha = 1.0 / (1.0 + com)
+        self.old_wt = 1.0 - self.alpha
+        self.value = math.nan
+
+    def push(self, value: float) -> float:
+        if math.isnan(self.value):
+            self.value = value
+        elif self.value != value:
+            self.value = (self.old_wt * self.value + self.alpha * value) / (self.old_wt + self.alpha)
+        return self.value
+
+
+class IncrementalIndicators:
+    """Motor incremental de RSI e MACD.
+
+    Mantém o estado das médias e EMAs e atualiza os indicadores em tempo
+    constante a cada candle, produzindo os mesmos valores de
+    ``TradingStrategy.calculate_rsi`` e ``TradingStrategy.calculate_macd``.
+    Um candle com o mesmo timestamp do último é tratado como revisão do
+    candle em aberto e substitui o valor anterior.
+    """
+
+    def __init__(
+        self,
+        rsi_period: int = 14,
+        macd_fast: int = 12,
+        macd_slow: int = 26,
+        macd_signal: int = 9,
+        history: int = 100
+    ):
+        self.rsi_period = rsi_period
+        self.macd_fast = macd_fast
+        self.macd_slow = macd_slow
+        self.macd_signal = macd_signal
+        self.history = history
+
+        self._gain = _RollingMean(rsi_period)
+        self._loss = _RollingMean(rsi_period)
+        self._fast_ema = _EMA(macd_fast)
+        self._slow_ema = _EMA(macd_slow)
+        self._signal_ema = _EMA(macd_signal)
+        self._prev_close = math.nan # Fechamento do candle anterior ao último
+        self._snapshot: Optional[tuple] = None # Estado antes do último candle (para revisões)
+
+        self.count = 0
+        self.last_timestamp: Optional[int] = None
+        self._history: Dict[str, Deque[float]] = {
+            name: deque(maxlen=history)
+            for name in ('timestamp', 'close', 'rsi', 'macd', 'signal', 'histogram')
+        }
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def close(self) -> float:
+        return self._history['close'][-1] if self.count else math.nan
+
+    @property
+    def rsi(self) -> float:
+        return self._history['rsi'][-1] if self.count else math.nan
+
+    @property
+    def macd_line(self) -> float:
+        return self._history['macd'][-1] if self.count else math.nan
+
+    @property
+    def signal_line(self) -> float:
+        return self._history['signal'][-1] if self.count else math.nan
+
+    @property
+    def macd_histogram(self) -> float:
+        return self._history['histogram'][-1] if self.count else math.nan
+
+    def update(self, candle: Sequence[Union[int, float]]) -> None:
+        """Processa um candle OHLCV ``[timestamp, open, high, low, close, volume]``."""
+        timestamp, close = int(candle[0]), float(candle[4])
+
+        if self.last_timestamp is not None and timestamp < self.last_timestamp:
+            raise ValueError(f"Candle fora de ordem: {timestamp} < {self.last_timestamp}")
+
+        if timestamp == self.last_timestamp:
+            self._rollback()
+            for values in self._history.values():
+                values.pop()
+        else:
+            if self.count:
+                self._prev_close = self._history['close'][-1]
+
+        self._snapshot = (
+            self._gain.state(), self._loss.state(),
+            self._fast_ema.value, self._slow_ema.value, self._signal_ema.value
+        )
+
+        delta = close - self._prev_close
+        gain = delta if delta > 0 else 0.0 # diff() do primeiro candle é NaN e vira 0
+        loss = -delta if delta < 0 else 0.0
+        avg_gain, evicted_gain = self._gain.push(gain)
+        avg_loss, evicted_loss = self._loss.push(loss)
+        self._snapshot += (evicted_gain, evicted_loss)
+
+        fast = self._fast_ema.push(close)
+        slow = self._slow_ema.push(close)
+        macd = fast - slow
+        signal = self._signal_ema.push(macd)
+
+        self._history['timestamp'].append(timestamp)
+        self._history['close'].append(close)
+        self._history['rsi'].append(self._rsi(avg_gain, avg_loss))
+        self._history['macd'].append(macd)
+        self._history['signal'].append(signal)
+        self._history['histogram'].append(macd - signal)
+
+        if timestamp != self.last_timestamp:
+            self.count += 1
+        self.last_timestamp = timestamp
+
+    def sync(self, ohlcv: List[List[Union[int, float]]]) -> int:
+        """Aplica apenas os candles novos (ou o revisado) de uma janela OHLCV.
+
+        Retorna a quantidade de candles processados.
+        """
+        start = len(ohlcv)
+        if self.last_timestamp is None:
+            start = 0
+        else:
+            while start > 0 and ohlcv[start - 1][0] >= self.last_timestamp:
+                start -= 1
+        for candle in ohlcv[start:]:
+            self.update(candle)
+        return len(ohlcv) - start
+
+    def series(self, name: str) -> np.ndarray:
+        """Histórico recente de um indicador (``timestamp``, ``close``, ``rsi``, ``macd``, ``signal``, ``histogram``)."""
+        dtype = np.int64 if name == 'timestamp' else np.float64
+        return np.fromiter(self._history[name], dtype=dtype, count=len(self._history[name]))
+
+    def _rollback(self) -> None:
+        gain_state, loss_state, fast, slow, signal, evicted_gain, evicted_loss = self._snapshot
+        self._gain.restore(gain_state, evicted_gain)
+        self._loss.restore(loss_state, evicted_loss)
+        self._fast_ema.value = fast
+        self._slow_ema.value = slow
+        self._signal_ema.value = signal
+
+    @staticmethod
+    def _rsi(avg_gain: float, avg_loss: float) -> float:
+        if math.isnan(avg_gain) or math.isnan(avg_loss):
+            return math.nan
+        if avg_loss == 0:
+            return 100.0 if avg_gain > 0 else math.nan # Mesmo resultado da divisão por zero do pandas
+        rs = avg_gain / avg_loss
+        return 100 - (100 / (1 + rs))
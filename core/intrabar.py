@@ -0,0 +1,175 @@
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import ccxt.async_support as ccxt_async
+import numpy as np
+from loguru import logger
+
+from core.backtester import Backtester, OHLCV_COLUMNS, WARMUP_CANDLES
+from core.strategy import SIGNAL_CODES, TradingStrategy
+
+INTRABAR_SCAN_BLOCK = 256 # Sub-candles verificados por vez na busca da saída
+BOTH_HIT_POLICIES = ('stop_loss', 'take_profit')
+
+
+def bar_offsets(parent_timestamps: np.ndarray, child_timestamps: np.ndarray, timeframe_ms: int) -> np.ndarray:
+    """Índices dos sub-candles de cada barra: a barra ``i`` é ``child[offsets[i]:offsets[i + 1]]``.
+
+    Calculado uma única vez com busca binária; depois cada barra é um recorte.
+    """
+    parent_timestamps = np.asarray(parent_timestamps, dtype=np.int64)
+    bounds = np.append(parent_timestamps, parent_timestamps[-1] + timeframe_ms)
+    return np.searchsorted(np.asarray(child_timestamps, dtype=np.int64), bounds, side='left')
+
+
+def find_exit(
+    opens: np.ndarray,
+    highs: np.ndarray,
+    lows: np.ndarray,
+    start: int,
+    is_buy: bool,
+    take_profit_price: float,
+    stop_loss_price: float,
+    both_hit: str = 'stop_loss'
+) -> Optional[Tuple[int, float, str]]:
+    """Primeiro candle a partir de ``start`` que atinge TP ou SL: (índice, preço, motivo).
+
+    O preço é o nível atingido, ou a abertura do candle se ela já o
+    ultrapassou (gap). Retorna None se nenhum nível for atingido. A busca
+    usa blocos crescentes, mantendo poucas chamadas NumPy em posições longas.
+    """
+    total = len(opens)
+    block = INTRABAR_SCAN_BLOCK
+    while start < total:
+        end = min(start + block, total)
+        if is_buy:
+            tp_hit = highs[start:end] >= take_profit_price
+            sl_hit = lows[start:end] <= stop_loss_price
+        else:
+            tp_hit = lows[start:end] <= take_profit_price
+            sl_hit = highs[start:end] >= stop_loss_price
+        hits = np.flatnonzero(tp_hit | sl_hit)
+        if len(hits):
+            j = int(hits[0])
+            idx, open_price = start + j, float(opens[start + j])
+            take_first = tp_hit[j] and (not sl_hit[j] or both_hit == 'take_profit')
+            level, reason = (take_profit_price, 'take_profit') if take_first else (stop_loss_price, 'stop_loss')
+            gapped = (open_price >= level) if (is_buy == (reason == 'take_profit')) else (open_price <= level)
+            return idx, open_price if gapped else level, reason
+        start = end
+        block *= 2
+    return None
+
+
+class IntrabarBacktester(Backtester):
+    """Backtest com posições abertas entre barras e TP/SL resolvidos por sub-candles.
+
+    O sinal da barra ``i`` (calculado no fechamento) abre a posição no
+    primeiro sub-candle da barra seguinte; take profit e stop loss são
+    calculados a partir do fechamento da barra do sinal, como no
+    ``Backtester``. Sinais cuja barra seguinte não tem sub-candles (lacuna
+    ou início tardio da série menor) são ignorados (``skipped_signals``). A saída é o primeiro sub-candle (ex.: 1m de uma
+    estratégia 1h) que atinge um dos níveis, preenchida no nível ou na
+    abertura do sub-candle se ela já o ultrapassou (gap). Enquanto há posição
+    aberta novos sinais são ignorados; a posição restante é fechada no último
+    fechamento disponível.
+    """
+
+    def __init__(
+        self,
+        historical_data: Union[List[List[Union[int, float]]], np.ndarray, Dict[str, np.ndarray]],
+        lower_timeframe_data: Union[List[List[Union[int, float]]], np.ndarray, Dict[str, np.ndarray]],
+        settings_manager: 'SettingsManager',
+        timeframe: Optional[str] = None,
+        both_hit: str = 'stop_loss',
+        **kwargs
+    ):
+        """
+        Args:
+            lower_timeframe_data: Candles de timeframe menor alinhados à série principal.
+            timeframe (str): Timeframe das barras principais (ex.: '1h'); inferido dos timestamps se omitido.
+            both_hit (str): Nível assumido quando um único sub-candle atinge TP e SL.
+        """
+        super().__init__(historical_data, settings_manager, **kwargs)
+        if both_hit not in BOTH_HIT_POLICIES:
+            raise ValueError(f"both_hit inválido: {both_hit}. Use um de {BOTH_HIT_POLICIES}")
+        self.both_hit = both_hit
+
+        if isinstance(lower_timeframe_data, dict): # Colunas (ex.: CandleStore.load), usadas sem cópia
+            if any(col not in lower_timeframe_data for col in OHLCV_COLUMNS):
+                raise ValueError("Dados de timeframe menor incompletos")
+            self.lower = {col: np.asarray(lower_timeframe_data[col]) for col in OHLCV_COLUMNS}
+        else:
+            rows = np.asarray(lower_timeframe_data, dtype=np.float64)
+            if rows.ndim != 2 or rows.shape[1] != len(OHLCV_COLUMNS) or not len(rows):
+                raise ValueError("Dados de timeframe menor incompletos")
+            self.lower = {col: rows[:, i] for i, col in enumerate(OHLCV_COLUMNS)}
+
+        timestamps = self.data['timestamp'].to_numpy(dtype=np.int64)
+        if timeframe is not None:
+            self.timeframe_ms = ccxt_async.Exchange.parse_timeframe(timeframe) * 1000
+        else:
+            steps = np.diff(timestamps)
+            self.timeframe_ms = int(steps[steps > 0].min()) if np.any(steps > 0) else 0
+        self.offsets = bar_offsets(timestamps, self.lower['timestamp'], self.timeframe_ms)
+        self.skipped_signals = 0
+
+    def run(self, strategy_class=TradingStrategy, signals: np.ndarray = None) -> Dict[str, Any]:
+        """Executa o backtest; os sinais vêm de ``strategy_class.vectorized_signals`` ou de ``signals``."""
+        if signals is None:
+            signals = strategy_class.vectorized_signals(self.data['close'].to_numpy(dtype=np.float64), self.settings)
+        else:
+            signals = np.array(signals, dtype=np.int8)
+        signals[:WARMUP_CANDLES] = 0
+
+        closes = self.data['close'].to_numpy(dtype=np.float64)
+        timestamps = self.data['timestamp'].to_numpy(dtype=np.int64)
+        lower_ts = self.lower['timestamp']
+        index = self.data.index
+        quantity = self.settings.order_size
+        stop_loss = self.settings.stop_loss_percent / 100
+        take_profit = self.settings.take_profit_percent / 100
+        balance = self.initial_balance
+        self.skipped_signals = 0
+
+        next_bar = 0 # Primeira barra em que um novo sinal pode abrir posição
+        for i in np.flatnonzero(signals):
+            if i < next_bar or i + 1 >= len(self.data):
+                continue
+            start = self.offsets[i + 1]
+            if start >= len(lower_ts):
+                break
+            if lower_ts[start] >= timestamps[i + 1] + self.timeframe_ms: # Primeiro sub-candle já é de uma barra posterior
+                self.skipped_signals += 1
+                continue
+            is_buy = signals[i] > 0
+            entry = float(self.lower['open'][start]) * (1 + self.buy_slippage if is_buy else 1 - self.sell_slippage)
+            take_profit_price = closes[i] * (1 + take_profit if is_buy else 1 - take_profit)
+            stop_loss_price = closes[i] * (1 - stop_loss if is_buy else 1 + stop_loss)
+
+            exit_idx, exit_price, reason = find_exit(
+                self.lower['open'], self.lower['high'], self.lower['low'], start,
+                is_buy, take_profit_price, stop_loss_price, self.both_hit
+            ) or (len(lower_ts) - 1, float(self.lower['close'][-1]), 'end')
+            if is_buy:
+                pnl = (exit_price - entry) * quantity - (exit_price + entry) * quantity * self.commission
+            else:
+                pnl = (entry - exit_price) * quantity - (exit_price + entry) * quantity * self.commission
+            balance += pnl
+
+            # A barra que contém a saída pode gerar o próximo sinal (executado na barra seguinte)
+            next_bar = int(np.searchsorted(self.offsets, exit_idx, side='right')) - 1
+            self._record_trade({
+                'datetime': index[i],
+                'signal': SIGNAL_CODES[int(signals[i])],
+                'entry_price': entry,
+                'exit_price': exit_price,
+                'quantity': quantity,
+                'pnl': pnl,
+                'balance': balance,
+                'exit_datetime': np.datetime64(int(lower_ts[exit_idx]), 'ms'),
+                'exit_reason': reason
+            })
+
+        if self.skipped_signals:
+            logger.warning(f"{self.skipped_signals} sinais ignorados: barra de entrada sem sub-candles")
+        return self.analyze_results()
@@ -0,0 +1,119 @@
+from typing import Dict, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+ArrayLike = Union[int, float, Sequence[float], np.ndarray]
+
+
+def _ema_by_span(values: np.ndarray, spans: np.ndarray) -> np.ndarray:
+    """EMA (``adjust=False``) de cada linha de ``values`` com o span da linha.
+
+    As linhas são agrupadas por span e cada grupo é calculado em uma única
+    chamada, vetorizada entre as colunas do DataFrame.
+    """
+    result = np.empty_like(values)
+    for span in np.unique(spans):
+        rows = np.flatnonzero(spans == span)
+        frame = pd.DataFrame(values[rows].T)
+        result[rows] = frame.ewm(span=int(span), adjust=False).mean().to_numpy().T
+    return result
+
+
+def rsi_matrix(close: np.ndarray, periods: ArrayLike) -> np.ndarray:
+    """RSI para vários períodos: matriz (períodos × tempo).
+
+    Ganhos e perdas são calculados uma vez; cada período distinto gera uma
+    única média móvel, compartilhada pelas linhas que o utilizam.
+    """
+    close_series = pd.Series(np.asarray(close, dtype=np.float64))
+    periods = np.atleast_1d(np.asarray(periods, dtype=np.int64))
+    delta = close_series.diff()
+    moves = pd.DataFrame({'gain': delta.where(delta > 0, 0), 'loss': -delta.where(delta < 0, 0)})
+
+    unique_periods, inverse = np.unique(periods, return_inverse=True)
+    result = np.empty((len(unique_periods), len(close_series)), dtype=np.float64)
+    for i, period in enumerate(unique_periods):
+        averages = moves.rolling(window=int(period)).mean()
+        rs = averages['gain'] / averages['loss']
+        result[i] = (100 - (100 / (1 + rs))).to_numpy()
+    return result[inverse.reshape(-1)]
+
+
+def _unique_macd(close: np.ndarray, fast: np.ndarray, slow: np.ndarray, signal: np.ndarray):
+    """MACD e linha de sinal apenas dos conjuntos distintos, com o índice de expansão."""
+    # Conjuntos repetidos (ex.: variando só os limites de RSI) são calculados uma vez
+    unique_sets, inverse = np.unique(np.stack([fast, slow, signal], axis=1), axis=0, return_inverse=True)
+    fast_u, slow_u, signal_u = unique_sets.T
+
+    price_spans = np.unique(np.concatenate([fast_u, slow_u]))
+    price_emas = _ema_by_span(np.broadcast_to(close, (len(price_spans), len(close))).copy(), price_spans)
+    span_row = {int(span): i for i, span in enumerate(price_spans)}
+
+    macd = price_emas[[span_row[int(s)] for s in fast_u]] - price_emas[[span_row[int(s)] for s in slow_u]]
+    return macd, _ema_by_span(macd, signal_u), inverse.reshape(-1)
+
+
+def macd_matrix(close: np.ndarray, fast: ArrayLike, slow: ArrayLike, signal: ArrayLike) -> Dict[str, np.ndarray]:
+    """Linha MACD, linha de sinal e histograma para vários conjuntos de spans.
+
+    ``fast``, ``slow`` e ``signal`` são combinados por broadcasting; cada
+    EMA de preço distinta é calculada uma vez e reaproveitada.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    fast, slow, signal = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(x, dtype=np.int64)) for x in (fast, slow, signal))
+    )
+    macd, signal_line, inverse = _unique_macd(close, fast, slow, signal)
+    return {
+        'macd': macd[inverse],
+        'signal': signal_line[inverse],
+        'histogram': (macd - signal_line)[inverse],
+    }
+
+
+def signal_matrix(
+    close: np.ndarray,
+    rsi_buy: ArrayLike,
+    rsi_sell: ArrayLike,
+    macd_fast: ArrayLike = 12,
+    macd_slow: ArrayLike = 26,
+    macd_signal: ArrayLike = 9,
+    rsi_period: ArrayLike = 14
+) -> Dict[str, np.ndarray]:
+    """RSI, MACD e sinais de compra/venda para vários conjuntos de parâmetros.
+
+    Todos os parâmetros são combinados por broadcasting em ``P`` conjuntos e
+    cada matriz retornada tem formato (P × tempo). ``signals`` segue os
+    códigos de ``core.strategy.SIGNAL_CODES`` e coincide, linha a linha,
+    com ``TradingStrategy.vectorized_signals``.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    params = np.broadcast_arrays(*(np.atleast_1d(np.asarray(x)) for x in (
+        rsi_buy, rsi_sell, macd_fast, macd_slow, macd_signal, rsi_period
+    )))
+    rsi_buy, rsi_sell, macd_fast, macd_slow, macd_signal, rsi_period = params
+
+    rsi = rsi_matrix(close, rsi_period)
+    macd_line, signal_line, inverse = _unique_macd(
+        close, *(x.astype(np.int64) for x in (macd_fast, macd_slow, macd_signal))
+    )
+
+    signals = np.zeros(rsi.shape, dtype=np.int8)
+    if len(close) >= 30:
+        # Cruzamentos calculados por conjunto distinto de MACD e expandidos depois
+        cross_up = (macd_line[:, :-1] < signal_line[:, :-1]) & (macd_line[:, 1:] > signal_line[:, 1:])
+        cross_down = (macd_line[:, :-1] > signal_line[:, :-1]) & (macd_line[:, 1:] < signal_line[:, 1:])
+        buy = (rsi[:, 1:] < rsi_buy[:, None]) & cross_up[inverse]
+        sell = (rsi[:, 1:] > rsi_sell[:, None]) & cross_down[inverse]
+        signals[:, 1:][buy] = 1
+        signals[:, 1:][sell & ~buy] = -1
+        signals[:, :29] = 0 # Menos de 30 candles: HOLD
+
+    return {
+        'rsi': rsi,
+        'macd': macd_line[inverse],
+        'signal': signal_line[inverse],
+        'histogram': (macd_line - signal_line)[inverse],
+        'signals': signals,
+    }
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+import aiohttp
+from loguru import logger
+
+BITGET_WS_URL = "wss://ws.bitget.com/mix/v1/stream"
+OVERFLOW_POLICIES = ('drop_oldest', 'block')
+
+
+class MarketDataFeed:
+    """Cliente WebSocket asyncio (aiohttp) para o stream público da Bitget.
+
+    Roda como tarefa no event loop do bot: as mensagens recebidas vão para
+    uma fila limitada e são consumidas com ``async for message in feed``,
+    sem threads. Com a fila cheia, ``overflow='drop_oldest'`` descarta a
+    mensagem mais antiga (o bot sempre vê os dados mais recentes) e
+    ``'block'`` deixa de ler o socket até o consumidor liberar espaço.
+    Envia ``ping`` periodicamente, reconecta com backoff exponencial quando
+    a conexão cai ou o ``pong`` não chega, e refaz todas as inscrições.
+    """
+
+    def __init__(
+        self,
+        url: str = BITGET_WS_URL,
+        subscriptions: Iterable[Dict[str, str]] = (),
+        queue_size: int = 1000,
+        overflow: str = 'drop_oldest',
+        ping_interval: float = 25.0,
+        pong_timeout: float = 10.0,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow inválido: {overflow}. Use um de {OVERFLOW_POLICIES}")
+        self.url = url
+        self.subscriptions: List[Dict[str, str]] = list(subscriptions)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.overflow = overflow
+        self.ping_interval = ping_interval
+        self.pong_timeout = pong_timeout
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.connected = asyncio.Event()
+        self.dropped_messages = 0
+        self.reconnects = 0
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._closing = False
+        self._last_pong = 0.0
+
+    async def subscribe(self, args: Iterable[Dict[str, str]]) -> None:
+        """Inscreve nos canais; as inscrições são refeitas a cada reconexão."""
+        args = [arg for arg in args if arg not in self.subscriptions]
+        self.subscriptions.extend(args)
+        if args and self.connected.is_set():
+            await self._send({'op': 'subscribe', 'args': args})
+
+    async def unsubscribe(self, args: Iterable[Dict[str, str]]) -> None:
+        args = [arg for arg in args if arg in self.subscriptions]
+        self.subscriptions = [arg for arg in self.subscriptions if arg not in args]
+        if args and self.connected.is_set():
+            await self._send({'op': 'unsubscribe', 'args': args})
+
+    async def run(self) -> None:
+        """Mantém a conexão aberta até ``close()``, reconectando quando necessário."""
+        delay = self.reconnect_delay
+        async with aiohttp.ClientSession() as session:
+            while not self._closing:
+                try:
+                    async with session.ws_connect(self.url, autoping=True) as ws:
+                        self._ws = ws
+                        delay = self.reconnect_delay
+                        await self._on_connected()
+                        await self._read(ws)
+                except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                    logger.warning(f"Falha na conexão WebSocket: {e}")
+                except Exception: # Frame inválido, falha no envio ou erro de um consumidor: reconecta em vez de encerrar o feed
+                    logger.exception("Erro inesperado no WebSocket:")
+                finally:
+                    self._ws = None
+                    self.connected.clear()
+                if self._closing:
+                    break
+                self.reconnects += 1
+                logger.warning(f"WebSocket desconectado. Reconectando em {delay:.1f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay) # Backoff exponencial
+
+    async def close(self) -> None:
+        self._closing = True
+        if self._ws is not None:
+            await self._ws.close()
+
+    async def get_batch(self, max_messages: int = 256) -> List[str]:
+        """Aguarda ao menos uma mensagem e retorna as já enfileiradas (até ``max_messages``)."""
+        batch = [await self.queue.get()]
+        while len(batch) < max_messages and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        return batch
+
+    def __aiter__(self) -> AsyncIterator[str]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[str]:
+        while True:
+            message = await self.queue.get()
+            yield message
+
+    async def _on_connected(self) -> None:
+        self._last_pong = time.monotonic()
+        if self.subscriptions:
+            await self._send({'op': 'subscribe', 'args': self.subscriptions})
+            logger.info(f"Inscrito nos canais WebSocket: {self.subscriptions}")
+        self.connected.set()
+
+    async def _read(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        keepalive = asyncio.create_task(self._keepalive(ws))
+        try:
+            async for msg in ws:
+                if msg.type == aiohttp.WSMsgType.TEXT:
+                    if msg.data == 'pong': # Resposta ao ping de keepalive da Bitget
+                        self._last_pong = time.monotonic()
+                        continue
+                    await self._enqueue(msg.data)
+                elif msg.type == aiohttp.WSMsgType.ERROR:
+                    logger.error(f"Erro no WebSocket: {ws.exception()}")
+                    break
+        finally:
+            keepalive.cancel()
+
+    async def _enqueue(self, message: str) -> None:
+        if self.overflow == 'block':
+            await self.queue.put(message) # Backpressure: para de ler o socket até haver espaço
+            return
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped_messages += 1
+            if self.dropped_messages % 1000 == 1:
+                logger.warning(f"Fila do WebSocket cheia: {self.dropped_messages} mensagens antigas descartadas")
+        self.queue.put_nowait(message)
+
+    async def _keepalive(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        """Envia ``ping`` e fecha a conexão (forçando reconexão) se o ``pong`` não chegar."""
+        while not ws.closed:
+            await asyncio.sleep(self.ping_interval)
+            if time.monotonic() - self._last_pong > self.ping_interval + self.pong_timeout:
+                logger.warning("Pong não recebido. Reiniciando conexão WebSocket.")
+                await ws.close()
+                return
+            await ws.send_str('ping')
+
+    async def _send(self, payload: Dict[str, Any]) -> None:
+        if self._ws is not None:
+            await self._ws.send_str(json.dumps(payload))
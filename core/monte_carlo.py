@@ -0,0 +1,82 @@
+from typing import Any, Dict, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+MONTE_CARLO_METHODS = ('bootstrap', 'shuffle')
+PERCENTILES = (5, 25, 50, 75, 95)
+MAX_BATCH_ELEMENTS = 8_000_000 # ~64 MB por matriz float64 (simulações × trades)
+
+
+def trade_pnl(backtester: Any) -> np.ndarray:
+    """PnL de cada trade de um backtest já executado (lista em memória ou arquivo de spill)."""
+    if backtester.results:
+        return np.fromiter((trade['pnl'] for trade in backtester.results), dtype=np.float64, count=len(backtester.results))
+    if backtester.spill is not None:
+        return backtester.spill.read()['pnl'].to_numpy(dtype=np.float64)
+    raise ValueError("Backtest sem trades armazenados: execute com keep_trades=True ou spill_path")
+
+
+def _summary(values: np.ndarray) -> Dict[str, float]:
+    stats = {'mean': float(values.mean()), 'std': float(values.std())}
+    stats.update({f'p{p}': float(v) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))})
+    return stats
+
+
+def monte_carlo(
+    pnl: Union[Sequence[float], np.ndarray, pd.Series],
+    initial_balance: float = 10000,
+    simulations: int = 50000,
+    method: str = 'bootstrap',
+    ruin_fraction: float = 0.5,
+    seed: Optional[int] = None
+) -> Dict[str, Any]:
+    """Análise de Monte Carlo da sequência de PnL dos trades.
+
+    ``bootstrap`` sorteia os trades com reposição; ``shuffle`` apenas
+    reordena os trades (o saldo final não muda, só o caminho). Cada lote de
+    simulações é uma matriz (simulações × trades) processada com cumsum e
+    máximo acumulado, sem loop Python por simulação.
+
+    O drawdown segue ``Backtester.analyze_results`` (pico dos saldos após
+    cada trade menos o saldo). Ruína é o saldo atingir
+    ``initial_balance * (1 - ruin_fraction)`` em algum momento.
+    """
+    if method not in MONTE_CARLO_METHODS:
+        raise ValueError(f"Método inválido: {method}. Use um de {MONTE_CARLO_METHODS}")
+    if simulations <= 0:
+        raise ValueError(f"O número de simulações deve ser positivo: {simulations}")
+    pnl = np.asarray(pnl, dtype=np.float64)
+    if pnl.ndim != 1 or len(pnl) == 0:
+        raise ValueError("Sequência de PnL vazia")
+
+    rng = np.random.default_rng(seed)
+    ruin_level = initial_balance * (1 - ruin_fraction)
+    final_balance = np.empty(simulations, dtype=np.float64)
+    max_drawdown = np.empty(simulations, dtype=np.float64)
+    ruined = np.empty(simulations, dtype=bool)
+
+    batch_size = max(1, MAX_BATCH_ELEMENTS // len(pnl))
+    for start in range(0, simulations, batch_size):
+        rows = min(batch_size, simulations - start)
+        if method == 'bootstrap':
+            samples = pnl[rng.integers(0, len(pnl), size=(rows, len(pnl)))]
+        else:
+            samples = rng.permuted(np.broadcast_to(pnl, (rows, len(pnl))), axis=1)
+
+        balances = np.cumsum(samples, axis=1, out=samples) # Reaproveita a matriz sorteada
+        balances += initial_balance
+        batch = slice(start, start + rows)
+        final_balance[batch] = balances[:, -1]
+        ruined[batch] = balances.min(axis=1) <= ruin_level
+        max_drawdown[batch] = (np.maximum.accumulate(balances, axis=1) - balances).max(axis=1)
+
+    return {
+        'method': method,
+        'simulations': simulations,
+        'trades': len(pnl),
+        'final_balance': _summary(final_balance),
+        'max_drawdown': _summary(max_drawdown),
+        'risk_of_ruin': float(ruined.mean()),
+        'samples': {'final_balance': final_balance, 'max_drawdown': max_drawdown},
+    }
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+from typing import Iterable, List, Sequence, Union
+
+OHLCV_DTYPE = np.dtype([
+    ('timestamp', np.int64),
+    ('open', np.float64),
+    ('high', np.float64),
+    ('low', np.float64),
+    ('close', np.float64),
+    ('volume', np.float64),
+])
+
+
+class OHLCVRingBuffer:
+    """Buffer circular de capacidade fixa para candles OHLCV.
+
+    Cada posição é gravada duas vezes (em ``i`` e ``i + capacity``), de modo
+    que a janela atual é sempre um trecho contíguo do array e ``view()``
+    não precisa copiar dados. As views refletem o buffer vivo: uma escrita
+    posterior pode sobrescrever o conteúdo de uma view antiga.
+    """
+
+    def __init__(self, capacity: int = 100):
+        if capacity <= 0:
+            raise ValueError("capacity must be greater than 0")
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity, dtype=OHLCV_DTYPE)
+        self._end = 0 # Próxima posição de escrita (0..capacity-1)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def last_timestamp(self) -> Union[int, None]:
+        if not self._size:
+            return None
+        return int(self._data['timestamp'][(self._end - 1) % self.capacity])
+
+    def append(self, candle: Sequence[Union[int, float]]) -> bool:
+        """Adiciona um candle ou substitui o último se o timestamp for o mesmo.
+
+        Retorna True quando um candle novo foi adicionado.
+        """
+        row = tuple(candle[:6])
+        timestamp = int(row[0])
+        last = self.last_timestamp
+        if last is not None and timestamp < last:
+            raise ValueError(f"Candle fora de ordem: {timestamp} < {last}")
+
+        if timestamp == last:
+            self._write((self._end - 1) % self.capacity, row) # Atualiza o candle em aberto
+            return False
+
+        self._write(self._end, row)
+        self._end = (self._end + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        return True
+
+    def extend(self, ohlcv: Iterable[Sequence[Union[int, float]]]) -> int:
+        """Mescla uma lista de candles ignorando os anteriores ao último armazenado.
+
+        Retorna a quantidade de candles novos.
+        """
+        added = 0
+        last = self.last_timestamp
+        for candle in ohlcv:
+            if last is not None and candle[0] < last:
+                continue
+            added += self.append(candle)
+        return added
+
+    def view(self) -> np.ndarray:
+        """Janela atual como array estruturado, sem cópia."""
+        start = (self._end - self._size) % self.capacity
+        return self._data[start:start + self._size]
+
+    def column(self, name: str) -> np.ndarray:
+        """Coluna da janela atual (``timestamp``, ``open``, ``high``, ``low``, ``close`` ou ``volume``)."""
+        return self.view()[name]
+
+    def to_list(self) -> List[List[Union[int, float]]]:
+        """Janela no formato lista de listas retornado por ``fetch_ohlcv``."""
+        return [list(row) for row in self.view().tolist()]
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame indexado por data (usado nos gráficos)."""
+        view = self.view()
+        df = pd.DataFrame({name: view[name] for name in OHLCV_DTYPE.names[1:]})
+        df.index = pd.to_datetime(view['timestamp'], unit='ms')
+        df.index.name = 'timestamp'
+        return df
+
+    def _write(self, position: int, row: tuple) -> None:
+        self._data[position] = row
+        self._data[position + self.capacity] = row
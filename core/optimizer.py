@@ -0,0 +1,93 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from config.settings import Settings
+from core.backtest_cache import BacktestCache
+from core.backtester import Backtester, OHLCV_COLUMNS
+from core.worker_pool import init_worker, shared_arrays, worker_state
+
+# Campos de Settings que podem variar na varredura
+SWEEP_FIELDS = (
+    'rsi_buy', 'rsi_sell', 'macd_fast', 'macd_slow', 'macd_signal',
+    'take_profit_percent', 'stop_loss_percent'
+)
+
+
+def parameter_grid(grid: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Expande ``{campo: [valores]}`` em todas as combinações possíveis."""
+    invalid = [field for field in grid if field not in SWEEP_FIELDS]
+    if invalid:
+        raise ValueError(f"Campos não suportados na varredura: {invalid}")
+    fields = list(grid)
+    return [dict(zip(fields, values)) for values in itertools.product(*(grid[f] for f in fields))]
+
+
+def _evaluate(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Executa um backtest vetorizado para uma combinação de parâmetros."""
+    settings_manager = worker_state['settings_manager']
+    settings_manager.settings = Settings(**{**worker_state['base_settings'], **params})
+    backtester = Backtester(worker_state['data'], settings_manager, **worker_state['backtest_kwargs'])
+    metrics = backtester.run(vectorized=True)
+    return {**params, **{key: float(value) for key, value in metrics.items()}}
+
+
+class ParameterSweep:
+    """Varredura de parâmetros do Backtester em paralelo.
+
+    Os candles são copiados uma única vez para memória compartilhada e os
+    workers leem a mesma cópia, sem serializar os dados a cada tarefa.
+    """
+
+    def __init__(
+        self,
+        historical_data: Union[List[List[Union[int, float]]], np.ndarray],
+        base_settings: Settings,
+        initial_balance: float = 10000,
+        slippage: float = 0.001,
+        commission: float = 0.0005,
+        max_workers: Optional[int] = None,
+        cache_path: Optional[str] = None
+    ):
+        """
+        Args:
+            cache_path (str): Banco do ``BacktestCache`` compartilhado pelos workers;
+                combinações já avaliadas com os mesmos candles não são recalculadas.
+        """
+        self.data = np.asarray(historical_data, dtype=np.float64)
+        if self.data.ndim != 2 or self.data.shape[1] != len(OHLCV_COLUMNS):
+            raise ValueError("Dados históricos incompletos")
+        self.base_settings = base_settings
+        self.backtest_kwargs = {
+            'initial_balance': initial_balance,
+            'slippage': slippage,
+            'commission': commission,
+        }
+        if cache_path:
+            self.backtest_kwargs['cache'] = BacktestCache(cache_path)
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def run(self, grid: Dict[str, Sequence[Any]], sort_by: str = 'net_profit', ascending: bool = False) -> pd.DataFrame:
+        """Avalia todas as combinações e retorna as métricas ordenadas (rank 1 = melhor)."""
+        combinations = parameter_grid(grid)
+        if not combinations:
+            return pd.DataFrame()
+        logger.info(f"Varredura de {len(combinations)} combinações em {self.max_workers} processos")
+
+        base_settings = self.base_settings.model_dump()
+        chunksize = max(1, len(combinations) // (self.max_workers * 4))
+        with shared_arrays(data=self.data) as arrays, ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=init_worker,
+            initargs=(arrays, base_settings, {'base_settings': base_settings, 'backtest_kwargs': self.backtest_kwargs})
+        ) as executor:
+            rows = list(executor.map(_evaluate, combinations, chunksize=chunksize))
+
+        table = pd.DataFrame(rows).sort_values(sort_by, ascending=ascending, kind='stable')
+        table.index = pd.RangeIndex(1, len(table) + 1, name='rank')
+        return table
@@ -0,0 +1,176 @@
+import time
+import zlib
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+CHECKSUM_LEVELS = 25 # Níveis de cada lado usados no checksum da Bitget
+SIDES = ('bids', 'asks')
+
+
+def _levels(rows: Sequence[Sequence[str]]) -> Tuple[np.ndarray, np.ndarray, Dict[float, Tuple[str, str]]]:
+    """Converte ``[[preço, tamanho], ...]`` em arrays ordenados por preço e no texto original de cada nível."""
+    if not rows:
+        return np.empty(0), np.empty(0), {}
+    columns = list(zip(*rows))
+    prices = np.array(list(map(float, columns[0])))
+    sizes = np.array(list(map(float, columns[1])))
+    text = {price: (row[0], row[1]) for price, row in zip(prices.tolist(), rows)}
+    order = np.argsort(prices, kind='stable')
+    return prices[order], sizes[order], text
+
+
+class OrderBook:
+    """Livro de ofertas L2 local de um símbolo, mantido pelo canal ``books`` da Bitget.
+
+    Cada lado guarda preços (em ordem crescente) e tamanhos em arrays
+    NumPy: o melhor bid é o último nível de ``bids`` e o melhor ask o
+    primeiro de ``asks``. ``apply_snapshot`` substitui o livro e
+    ``apply_update`` aplica as alterações incrementais (tamanho zero remove
+    o nível). Após cada mensagem o checksum CRC32 dos 25 melhores níveis é
+    conferido; se divergir, o livro deixa de estar sincronizado
+    (``synced``) até um novo snapshot. Os tamanhos estão na moeda base.
+    """
+
+    def __init__(self, symbol: str, clock: Callable[[], float] = time.monotonic):
+        self.symbol = symbol
+        self.clock = clock
+        self.prices: Dict[str, np.ndarray] = {side: np.empty(0) for side in SIDES}
+        self.sizes: Dict[str, np.ndarray] = {side: np.empty(0) for side in SIDES}
+        self.synced = False
+        self.timestamp: Optional[int] = None # ts (ms) da exchange na última mensagem
+        self.updated: Optional[float] = None # Instante (clock) da última mensagem
+        self.checksum_errors = 0
+        self._text: Dict[str, Dict[float, Tuple[str, str]]] = {side: {} for side in SIDES} # Texto original, para o checksum
+
+    def __len__(self) -> int:
+        return len(self.prices['bids']) + len(self.prices['asks'])
+
+    def apply_snapshot(self, data: Dict) -> bool:
+        """Substitui o livro pelo snapshot; retorna False se o checksum não conferir."""
+        for side in SIDES:
+            self.prices[side], self.sizes[side], self._text[side] = _levels(data.get(side) or [])
+        return self._finish(data)
+
+    def apply_update(self, data: Dict) -> bool:
+        """Aplica uma atualização incremental; ignorada (False) se o livro não estiver sincronizado."""
+        if not self.synced:
+            return False
+        for side in SIDES:
+            rows = data.get(side)
+            if rows:
+                self._merge(side, *_levels(rows))
+        return self._finish(data)
+
+    def reset(self) -> None:
+        """Descarta o livro até o próximo snapshot."""
+        for side in SIDES:
+            self.prices[side], self.sizes[side], self._text[side] = np.empty(0), np.empty(0), {}
+        self.synced = False
+
+    def age(self) -> float:
+        """Segundos desde a última mensagem aplicada (infinito se nunca atualizado)."""
+        return float('inf') if self.updated is None else self.clock() - self.updated
+
+    def best_bid(self) -> Optional[Tuple[float, float]]:
+        """(preço, tamanho) do melhor bid, ou None com o lado vazio."""
+        if not len(self.prices['bids']):
+            return None
+        return float(self.prices['bids'][-1]), float(self.sizes['bids'][-1])
+
+    def best_ask(self) -> Optional[Tuple[float, float]]:
+        """(preço, tamanho) do melhor ask, ou None com o lado vazio."""
+        if not len(self.prices['asks']):
+            return None
+        return float(self.prices['asks'][0]), float(self.sizes['asks'][0])
+
+    def mid(self) -> Optional[float]:
+        bid, ask = self.best_bid(), self.best_ask()
+        if bid is None or ask is None:
+            return None
+        return (bid[0] + ask[0]) / 2
+
+    def depth(self, side: str, bps: float) -> float:
+        """Quantidade disponível em ``side`` ('bids' ou 'asks') até ``bps`` pontos-base do preço médio."""
+        mid = self.mid()
+        if mid is None:
+            return 0.0
+        prices, sizes = self.prices[side], self.sizes[side]
+        if side == 'asks':
+            return float(sizes[:np.searchsorted(prices, mid * (1 + bps / 10000), side='right')].sum())
+        return float(sizes[np.searchsorted(prices, mid * (1 - bps / 10000), side='left'):].sum())
+
+    def vwap(self, side: str, quantity: float) -> Optional[float]:
+        """Preço médio de uma ordem a mercado de ``quantity`` ('buy' consome os asks, 'sell' os bids).
+
+        Retorna None se o livro não tiver profundidade suficiente.
+        """
+        if quantity <= 0:
+            raise ValueError("A quantidade deve ser positiva")
+        if side == 'buy':
+            prices, sizes = self.prices['asks'], self.sizes['asks']
+        elif side == 'sell':
+            prices, sizes = self.prices['bids'][::-1], self.sizes['bids'][::-1] # Do melhor bid para baixo
+        else:
+            raise ValueError(f"Lado inválido: {side}")
+        filled = np.cumsum(sizes)
+        if not len(filled) or filled[-1] < quantity:
+            return None
+        last = int(np.searchsorted(filled, quantity)) # Último nível consumido (parcialmente)
+        before = filled[last - 1] if last else 0.0
+        cost = float(np.dot(prices[:last], sizes[:last])) + float(prices[last]) * (quantity - before)
+        return cost / quantity
+
+    def impact(self, side: str, quantity: float) -> Optional[float]:
+        """Custo fracionário de executar ``quantity`` a mercado em relação ao preço médio (inclui meio spread)."""
+        mid = self.mid()
+        price = self.vwap(side, quantity)
+        if mid is None or price is None:
+            return None
+        return price / mid - 1 if side == 'buy' else 1 - price / mid
+
+    def checksum(self) -> int:
+        """CRC32 (inteiro de 32 bits com sinal) de ``bid1:ask1:bid2:ask2...`` nos 25 melhores níveis."""
+        bids = self.prices['bids'][::-1][:CHECKSUM_LEVELS].tolist()
+        asks = self.prices['asks'][:CHECKSUM_LEVELS].tolist()
+        parts: List[str] = []
+        for level in range(max(len(bids), len(asks))):
+            if level < len(bids):
+                parts.extend(self._text['bids'][bids[level]])
+            if level < len(asks):
+                parts.extend(self._text['asks'][asks[level]])
+        value = zlib.crc32(':'.join(parts).encode())
+        return value - (1 << 32) if value >= 1 << 31 else value
+
+    def _merge(self, side: str, prices: np.ndarray, sizes: np.ndarray, text: Dict[float, Tuple[str, str]]) -> None:
+        book_prices, book_sizes = self.prices[side], self.sizes[side].copy()
+        position = np.searchsorted(book_prices, prices)
+        found = position < len(book_prices)
+        found[found] = book_prices[position[found]] == prices[found]
+        book_sizes[position[found]] = sizes[found] # Níveis existentes: novo tamanho (zero marca remoção)
+        new = ~found & (sizes > 0)
+        if new.any():
+            book_prices = np.insert(book_prices, position[new], prices[new])
+            book_sizes = np.insert(book_sizes, position[new], sizes[new])
+        keep = book_sizes > 0
+        if not keep.all():
+            book_prices, book_sizes = book_prices[keep], book_sizes[keep]
+        self.prices[side], self.sizes[side] = book_prices, book_sizes
+
+        levels = self._text[side]
+        for price, entry in text.items():
+            if float(entry[1]) > 0:
+                levels[price] = entry
+            else:
+                levels.pop(price, None)
+
+    def _finish(self, data: Dict) -> bool:
+        self.timestamp = int(data['ts']) if data.get('ts') is not None else self.timestamp
+        self.updated = self.clock()
+        expected = data.get('checksum')
+        if expected is not None and int(expected) != self.checksum():
+            self.checksum_errors += 1
+            self.synced = False
+            return False
+        self.synced = True
+        return True
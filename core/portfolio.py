@@ -0,0 +1,218 @@
+import heapq
+import itertools
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from core.backtest_metrics import MetricsAccumulator, empty_metrics
+from core.backtester import OHLCV_COLUMNS, WARMUP_CANDLES
+from core.indicators import macd_series, rsi_series
+from core.intrabar import BOTH_HIT_POLICIES, find_exit
+from core.risk_manager import RiskManager
+from core.strategy import SIGNAL_CODES, TradingStrategy
+
+
+def signal_matrix_by_symbol(close: np.ndarray, settings: 'Settings', strategy_class=TradingStrategy) -> np.ndarray:
+    """Sinais (símbolos × tempo) de ``TradingStrategy`` para vários símbolos de uma vez.
+
+    ``close`` tem NaN onde o símbolo não tem candle. RSI e MACD são calculados
+    em uma única operação de DataFrame sobre todas as colunas; símbolos com
+    lacunas no meio da série são recalculados individualmente sobre seus
+    candles, para coincidir com ``strategy_class.vectorized_signals``.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    frame = pd.DataFrame(close.T) # Uma coluna por símbolo
+    rsi = rsi_series(frame).to_numpy().T
+    macd_line, signal_line, _ = macd_series(frame, settings.macd_fast, settings.macd_slow, settings.macd_signal)
+    macd_line, signal_line = macd_line.to_numpy().T, signal_line.to_numpy().T
+
+    valid = ~np.isnan(close)
+    cross_up = (macd_line[:, :-1] < signal_line[:, :-1]) & (macd_line[:, 1:] > signal_line[:, 1:])
+    cross_down = (macd_line[:, :-1] > signal_line[:, :-1]) & (macd_line[:, 1:] < signal_line[:, 1:])
+    buy = (rsi[:, 1:] < settings.rsi_buy) & cross_up
+    sell = (rsi[:, 1:] > settings.rsi_sell) & cross_down
+    signals = np.zeros(close.shape, dtype=np.int8)
+    signals[:, 1:][buy] = 1
+    signals[:, 1:][sell & ~buy] = -1
+    signals[np.cumsum(valid, axis=1) < 30] = 0 # Menos de 30 candles do símbolo: HOLD
+    signals[~valid] = 0
+
+    for row in range(len(close)):
+        positions = np.flatnonzero(valid[row])
+        if len(positions) and positions[-1] - positions[0] + 1 != len(positions): # Lacuna interna
+            signals[row] = 0
+            signals[row, positions] = strategy_class.vectorized_signals(close[row, positions], settings)
+    return signals
+
+
+class PortfolioBacktester:
+    """Backtest de vários símbolos em um eixo de tempo comum, com capital compartilhado.
+
+    Os sinais são gerados como uma matriz (símbolos × tempo). Cada sinal abre
+    posição na abertura da barra seguinte do símbolo, com tamanho definido
+    pelo ``RiskManager`` do símbolo sobre o saldo realizado da carteira, e
+    só é executado se houver margem livre (``quantidade × preço / leverage``).
+    A posição fica aberta entre barras até atingir take profit ou stop loss
+    (calculados a partir do fechamento da barra do sinal, como no
+    ``Backtester``); se uma barra atinge os dois níveis, ``both_hit`` decide.
+    Posições abertas no fim são fechadas no último fechamento do símbolo.
+    """
+
+    def __init__(
+        self,
+        historical_data: Dict[str, Union[List[List[Union[int, float]]], np.ndarray, Dict[str, np.ndarray]]],
+        settings_manager: 'SettingsManager',
+        initial_balance: float = 10000,
+        slippage: float = 0.001,
+        commission: float = 0.0005,
+        max_positions: Optional[int] = None,
+        both_hit: str = 'stop_loss'
+    ):
+        if not historical_data:
+            raise ValueError("Dados históricos incompletos")
+        self.symbols = list(historical_data)
+        self.settings_manager = settings_manager
+        self.settings = settings_manager.settings
+        self.initial_balance = initial_balance
+        self.slippage = slippage
+        self.commission = commission
+        self.max_positions = max_positions or len(self.symbols)
+        if both_hit not in BOTH_HIT_POLICIES:
+            raise ValueError(f"both_hit inválido: {both_hit}. Use um de {BOTH_HIT_POLICIES}")
+        self.both_hit = both_hit
+        self.risk_managers = {
+            symbol: RiskManager(settings_manager=settings_manager, balance=initial_balance, symbol=symbol)
+            for symbol in self.symbols
+        }
+
+        columns = {}
+        for symbol, data in historical_data.items():
+            if isinstance(data, dict):
+                columns[symbol] = {col: np.asarray(data[col], dtype=np.float64) for col in OHLCV_COLUMNS}
+            else:
+                rows = np.asarray(data, dtype=np.float64)
+                if rows.ndim != 2 or rows.shape[1] != len(OHLCV_COLUMNS) or not len(rows):
+                    raise ValueError(f"Dados históricos incompletos para {symbol}")
+                columns[symbol] = {col: rows[:, i] for i, col in enumerate(OHLCV_COLUMNS)}
+
+        # Eixo comum: união dos timestamps; NaN onde o símbolo não tem candle
+        self.timestamps = np.unique(np.concatenate([c['timestamp'] for c in columns.values()])).astype(np.int64)
+        shape = (len(self.symbols), len(self.timestamps))
+        self.matrices = {col: np.full(shape, np.nan) for col in ('open', 'high', 'low', 'close')}
+        for row, symbol in enumerate(self.symbols):
+            positions = np.searchsorted(self.timestamps, columns[symbol]['timestamp'].astype(np.int64))
+            for col in self.matrices:
+                self.matrices[col][row, positions] = columns[symbol][col]
+
+        self.results: List[Dict[str, Any]] = []
+        self.metrics: Dict[str, Any] = {}
+        self.skipped_signals = 0
+
+    def run(self, strategy_class=TradingStrategy, signals: np.ndarray = None) -> Dict[str, Any]:
+        """Executa o backtest da carteira e retorna as métricas consolidadas."""
+        if signals is None:
+            signals = signal_matrix_by_symbol(self.matrices['close'], self.settings, strategy_class)
+        else:
+            signals = np.array(signals, dtype=np.int8)
+        signals[:, :WARMUP_CANDLES] = 0
+
+        self.results = []
+        self.skipped_signals = 0
+        accumulator = MetricsAccumulator()
+        balance = self.initial_balance
+        used_margin = 0.0
+        busy_until = np.full(len(self.symbols), -1) # Barra de saída da posição aberta de cada símbolo
+        exits = [] # Heap: (barra de saída, ordem de entrada, trade)
+        order = itertools.count()
+        opens, closes = self.matrices['open'], self.matrices['close']
+        stop_loss = self.settings.stop_loss_percent / 100
+        take_profit = self.settings.take_profit_percent / 100
+
+        def release(until_bar: int) -> None:
+            nonlocal balance, used_margin
+            while exits and exits[0][0] < until_bar:
+                _, _, trade = heapq.heappop(exits)
+                balance += trade['pnl']
+                used_margin -= trade.pop('margin')
+                trade['balance'] = balance
+                accumulator.add(trade['pnl'], balance)
+                self.results.append(trade)
+
+        # Ordem cronológica; no mesmo candle, a ordem dos símbolos em historical_data
+        times, rows = np.nonzero(signals.T)
+        for t, row in zip(times, rows):
+            entry_bar = t + 1
+            if entry_bar >= len(self.timestamps) or np.isnan(opens[row, entry_bar]):
+                continue
+            release(entry_bar)
+            if busy_until[row] >= entry_bar:
+                continue
+            if np.count_nonzero(busy_until >= entry_bar) >= self.max_positions:
+                self.skipped_signals += 1
+                continue
+
+            is_buy = signals[row, t] > 0
+            entry = opens[row, entry_bar] * (1 + self.slippage if is_buy else 1 - self.slippage)
+            take_profit_price = closes[row, t] * (1 + take_profit if is_buy else 1 - take_profit)
+            stop_loss_price = closes[row, t] * (1 - stop_loss if is_buy else 1 + stop_loss)
+            risk_manager = self.risk_managers[self.symbols[row]]
+            risk_manager.balance = balance
+            quantity, _ = risk_manager.calculate_position_size(entry, stop_loss_price)
+            margin = quantity * entry / self.settings.leverage
+            if margin > balance - used_margin: # Sem margem livre
+                self.skipped_signals += 1
+                continue
+
+            exit_bar, exit_price, reason = find_exit(
+                opens[row], self.matrices['high'][row], self.matrices['low'][row], entry_bar,
+                is_buy, take_profit_price, stop_loss_price, self.both_hit
+            ) or self._last_close(row)
+            if is_buy:
+                pnl = (exit_price - entry) * quantity - (exit_price + entry) * quantity * self.commission
+            else:
+                pnl = (entry - exit_price) * quantity - (exit_price + entry) * quantity * self.commission
+            used_margin += margin
+            busy_until[row] = exit_bar
+            heapq.heappush(exits, (exit_bar, next(order), {
+                'symbol': self.symbols[row],
+                'datetime': pd.Timestamp(int(self.timestamps[t]), unit='ms'),
+                'exit_datetime': pd.Timestamp(int(self.timestamps[exit_bar]), unit='ms'),
+                'signal': SIGNAL_CODES[int(signals[row, t])],
+                'entry_price': entry,
+                'exit_price': exit_price,
+                'quantity': quantity,
+                'pnl': pnl,
+                'exit_reason': reason,
+                'stop_loss_price': stop_loss_price,
+                'margin': margin,
+            }))
+        release(len(self.timestamps) + 1)
+
+        if self.skipped_signals:
+            logger.info(f"{self.skipped_signals} sinais ignorados por falta de margem ou limite de posições")
+        self.metrics = accumulator.metrics() if accumulator.total_trades else empty_metrics()
+        return self.metrics
+
+    def symbol_summary(self) -> pd.DataFrame:
+        """Trades, PnL e taxa de acerto por símbolo."""
+        if not self.results:
+            return pd.DataFrame(columns=['trades', 'net_profit', 'win_rate'])
+        df = pd.DataFrame(self.results)
+        grouped = df.groupby('symbol')['pnl']
+        return pd.DataFrame({
+            'trades': grouped.size(),
+            'net_profit': grouped.sum(),
+            'win_rate': grouped.apply(lambda pnl: (pnl > 0).mean() * 100),
+        })
+
+    @property
+    def equity_curve(self) -> pd.Series:
+        """Saldo realizado após cada saída."""
+        return pd.Series([t['balance'] for t in self.results], index=[t['exit_datetime'] for t in self.results], name='balance')
+
+    def _last_close(self, row: int) -> Tuple[int, float, str]:
+        """Saída no último fechamento do símbolo, quando nem TP nem SL são atingidos."""
+        valid = np.flatnonzero(~np.isnan(self.matrices['close'][row]))
+        return int(valid[-1]), float(self.matrices['close'][row, valid[-1]]), 'end'
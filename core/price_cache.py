@@ -0,0 +1,69 @@
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+QUOTE_FIELDS = ('last', 'bid', 'ask')
+
+
+class PriceCache:
+    """Último preço, melhor bid e melhor ask por símbolo, alimentados pelo WebSocket.
+
+    Cada campo guarda o instante (``clock``, monotônico) da sua última
+    atualização: trades renovam só ``last`` e o ticker renova também bid e
+    ask. Campos mais antigos que o limite de idade do símbolo
+    (``set_max_age``), ou de ``max_age`` por padrão, são tratados como
+    ausentes para que o chamador recorra à API REST.
+    """
+
+    def __init__(self, max_age: float = 5.0, clock: Callable[[], float] = time.monotonic):
+        self.max_age = max_age
+        self.clock = clock
+        self.max_ages: Dict[str, float] = {} # Limite de idade (s) por símbolo
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, Dict[str, Tuple[float, float]]] = {} # símbolo -> campo -> (valor, atualização)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._entries
+
+    def set_max_age(self, symbol: str, max_age: float) -> None:
+        self.max_ages[symbol] = max_age
+
+    def update(self, symbol: str, last: float = None, bid: float = None, ask: float = None) -> None:
+        """Atualiza os campos informados; os demais mantêm o valor e a idade anteriores."""
+        entry = self._entries.setdefault(symbol, {})
+        now = self.clock()
+        for field, value in (('last', last), ('bid', bid), ('ask', ask)):
+            if value is not None:
+                entry[field] = (float(value), now)
+
+    def get(self, symbol: str, field: str = 'last', max_age: float = None) -> Optional[float]:
+        """Valor de ``field`` (``last``, ``bid`` ou ``ask``), ou None se ausente ou antigo."""
+        if self.age(symbol, field) > self._max_age(symbol, max_age):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._entries[symbol][field][0]
+
+    def quote(self, symbol: str, max_age: float = None) -> Optional[Dict[str, Optional[float]]]:
+        """Último preço, bid e ask do símbolo (None nos campos antigos), ou None se nenhum estiver atual."""
+        limit = self._max_age(symbol, max_age)
+        quote = {
+            field: self._entries[symbol][field][0] if self.age(symbol, field) <= limit else None
+            for field in QUOTE_FIELDS
+        }
+        if all(value is None for value in quote.values()):
+            return None
+        return quote
+
+    def age(self, symbol: str, field: str = None) -> float:
+        """Segundos desde a atualização de ``field`` (ou do campo mais recente); infinito se nunca atualizado."""
+        entry = self._entries.get(symbol)
+        if not entry or (field is not None and field not in entry):
+            return float('inf')
+        updated = entry[field][1] if field is not None else max(item[1] for item in entry.values())
+        return self.clock() - updated
+
+    def _max_age(self, symbol: str, max_age: Optional[float]) -> float:
+        if max_age is not None:
+            return max_age
+        return self.max_ages.get(symbol, self.max_age)
@@ -0,0 +1,225 @@
+import asyncio
+import itertools
+import math
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional
+
+import ccxt.async_support as ccxt_async
+from loguru import logger
+
+# Prioridades: menor valor é atendido primeiro
+PRIORITY_ORDER = 0 # Criação e cancelamento de ordens
+PRIORITY_ACCOUNT = 1 # Saldo e posições
+PRIORITY_MARKET_DATA = 2 # Ticker, candles e mercados
+PRIORITY_BACKFILL = 3 # Download de histórico
+
+# Requisições por segundo por endpoint, espelhando os limites da API mix da Bitget
+BITGET_RATE_LIMITS: Dict[str, float] = {
+    'create_order': 10,
+    'cancel_order': 10,
+    'fetch_balance': 10,
+    'fetch_positions': 5,
+    'fetch_ticker': 20,
+    'fetch_ohlcv': 20,
+    'load_markets': 20,
+    'default': 10,
+}
+GLOBAL_RATE_LIMIT = 50.0 # Orçamento compartilhado por todos os endpoints (req/s)
+MIN_RATE_FACTOR = 0.1 # Menor fração da taxa base após reduções adaptativas
+LOW_REMAINING_RATIO = 0.2 # Abaixo desta fração restante do limite, reduz a taxa
+RATE_RECOVERY = 0.05 # Fração da taxa base recuperada por segundo após uma redução
+
+
+class TokenBucket:
+    """Balde de tokens: ``rate`` tokens por segundo, acumulando até ``capacity``.
+
+    Depois de uma redução, ``rate`` volta linearmente a ``base_rate``
+    (``RATE_RECOVERY`` da taxa base por segundo, fora das pausas).
+    """
+
+    def __init__(self, rate: float, capacity: float = None, clock: Callable[[], float] = time.monotonic):
+        self.base_rate = rate
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+        self.paused_until = 0.0
+
+    def wait_time(self, weight: float = 1) -> float:
+        """Segundos até haver ``weight`` tokens disponíveis (0 se já houver)."""
+        now = self.clock()
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            recovering = now - max(self.updated, self.paused_until)
+            if self.rate < self.base_rate and recovering > 0:
+                self.rate = min(self.base_rate, self.rate + self.base_rate * RATE_RECOVERY * recovering)
+            self.updated = now
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.tokens >= weight:
+            return 0.0
+        return (weight - self.tokens) / self.rate
+
+    def consume(self, weight: float = 1) -> None:
+        self.tokens -= weight
+
+
+class RateLimitScheduler:
+    """Agendador central das requisições à exchange, com baldes de tokens e prioridades.
+
+    Cada endpoint tem seu balde (``limits``) e todos dividem um balde
+    global. Quando não há tokens, as requisições esperam em fila e são
+    liberadas por prioridade (ordens antes de dados de mercado) e, dentro da
+    mesma prioridade, por ordem de chegada. Uma requisição bloqueada apenas
+    pelo orçamento global reserva os próximos tokens globais para si. A
+    taxa de cada endpoint se adapta: cai pela metade em um 429 (com pausa
+    de ``Retry-After``) ou quando os cabeçalhos de limite indicam pouca
+    folga, e se recupera com o tempo até a taxa base, mesmo sem cabeçalhos.
+
+    ``exchange.last_response_headers`` é compartilhado por todas as
+    requisições: com chamadas simultâneas, os cabeçalhos lidos após uma
+    resposta podem ser de outro endpoint, então ``observe`` é só uma
+    estimativa e a recuperação pelo tempo não depende dele.
+    """
+
+    def __init__(
+        self,
+        limits: Mapping[str, float] = BITGET_RATE_LIMITS,
+        global_rate: Optional[float] = GLOBAL_RATE_LIMIT,
+        headers: Callable[[], Optional[Mapping[str, Any]]] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            limits (dict): Requisições por segundo por endpoint; ``default`` para os demais.
+            global_rate (float): Requisições por segundo somando todos os endpoints (None desativa).
+            headers (callable): Retorna os cabeçalhos da última resposta (ex.: ``exchange.last_response_headers``).
+        """
+        self.limits = dict(limits)
+        self.clock = clock
+        self.headers = headers
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.global_bucket = TokenBucket(global_rate, clock=clock) if global_rate else None
+        self.throttled = 0 # Requisições que precisaram esperar
+        self.rate_limited = 0 # Respostas 429 recebidas
+        self._waiters: List[tuple] = [] # (prioridade, ordem, endpoint, peso, future)
+        self._order = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def bucket(self, endpoint: str) -> TokenBucket:
+        if endpoint not in self.buckets:
+            rate = self.limits.get(endpoint, self.limits['default'])
+            self.buckets[endpoint] = TokenBucket(rate, clock=self.clock)
+        return self.buckets[endpoint]
+
+    async def call(
+        self,
+        endpoint: str,
+        request: Callable[[], Awaitable[Any]],
+        priority: int = PRIORITY_MARKET_DATA,
+        weight: float = 1
+    ) -> Any:
+        """Executa ``request()`` quando houver orçamento para ``endpoint``."""
+        await self.acquire(endpoint, priority, weight)
+        try:
+            result = await request()
+        except ccxt_async.RateLimitExceeded:
+            self.penalize(endpoint)
+            raise
+        if self.headers is not None:
+            self.observe(endpoint, self.headers())
+        return result
+
+    async def acquire(self, endpoint: str, priority: int = PRIORITY_MARKET_DATA, weight: float = 1) -> None:
+        """Aguarda tokens para uma requisição de ``endpoint``."""
+        bucket = self.bucket(endpoint)
+        if not self._waiters and self._available(bucket, weight):
+            self._consume(bucket, weight) # Caminho rápido: sem fila e com tokens
+            return
+        self.throttled += 1
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((priority, next(self._order), endpoint, weight, future))
+        self._wakeup.set()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        await future
+
+    def observe(self, endpoint: str, headers: Optional[Mapping[str, Any]]) -> None:
+        """Ajusta a taxa do endpoint pelos cabeçalhos ``X-RateLimit-Limit``/``X-RateLimit-Remaining``."""
+        if not headers:
+            return
+        headers = {str(k).lower(): v for k, v in headers.items()}
+        try:
+            remaining = float(headers['x-ratelimit-remaining']) / float(headers['x-ratelimit-limit'])
+        except (KeyError, TypeError, ValueError, ZeroDivisionError):
+            return
+        bucket = self.bucket(endpoint)
+        if remaining < LOW_REMAINING_RATIO:
+            bucket.rate = max(bucket.base_rate * MIN_RATE_FACTOR, bucket.rate * 0.5)
+        elif bucket.rate < bucket.base_rate:
+            bucket.rate = min(bucket.base_rate, bucket.rate * 1.1) # Recuperação gradual
+
+    def penalize(self, endpoint: str, retry_after: float = None) -> None:
+        """Resposta 429: reduz a taxa pela metade e pausa o endpoint."""
+        self.rate_limited += 1
+        bucket = self.bucket(endpoint)
+        bucket.rate = max(bucket.base_rate * MIN_RATE_FACTOR, bucket.rate * 0.5)
+        if retry_after is None:
+            retry_after = self._retry_after()
+        bucket.tokens = 0.0
+        bucket.paused_until = self.clock() + (retry_after if retry_after is not None else 1.0 / bucket.rate)
+        logger.warning(f"Limite de requisições atingido em {endpoint}. Nova taxa: {bucket.rate:.2f} req/s")
+
+    def _retry_after(self) -> Optional[float]:
+        headers = self.headers() if self.headers is not None else None
+        if not headers:
+            return None
+        for key, value in headers.items():
+            if str(key).lower() == 'retry-after':
+                try:
+                    return float(value)
+                except (TypeError, ValueError):
+                    return None
+        return None
+
+    def _available(self, bucket: TokenBucket, weight: float) -> bool:
+        return bucket.wait_time(weight) == 0 and (self.global_bucket is None or self.global_bucket.wait_time(weight) == 0)
+
+    def _consume(self, bucket: TokenBucket, weight: float) -> None:
+        bucket.consume(weight)
+        if self.global_bucket is not None:
+            self.global_bucket.consume(weight)
+
+    async def _dispatch(self) -> None:
+        """Libera as requisições em espera por prioridade conforme os tokens ficam disponíveis."""
+        while self._waiters:
+            self._wakeup.clear()
+            self._waiters.sort(key=lambda waiter: waiter[:2])
+            pending = []
+            next_wake = math.inf
+            for position, waiter in enumerate(self._waiters):
+                _, _, endpoint, weight, future = waiter
+                if future.done(): # Chamador cancelado
+                    continue
+                bucket = self.bucket(endpoint)
+                wait = bucket.wait_time(weight)
+                if wait > 0:
+                    next_wake = min(next_wake, wait)
+                    pending.append(waiter)
+                    continue
+                if self.global_bucket is not None:
+                    wait = self.global_bucket.wait_time(weight)
+                    if wait > 0: # Reserva o orçamento global para esta e as seguintes
+                        next_wake = min(next_wake, wait)
+                        pending.extend(w for w in self._waiters[position:] if not w[4].done())
+                        break
+                self._consume(bucket, weight)
+                future.set_result(None)
+            self._waiters = pending
+            if pending:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=next_wake)
+                except asyncio.TimeoutError:
+                    pass
@@ -0,0 +1,224 @@
+import asyncio
+import contextvars
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, Iterator, Optional
+
+import ccxt.async_support as ccxt_async
+from loguru import logger
+
+HEDGED_METHODS = ('fetch_ticker', 'fetch_ohlcv', 'fetch_balance') # Leituras idempotentes
+WRITE_METHODS = ('create_order', 'cancel_order') # Nunca canceladas pelo prazo depois de enviadas
+HEDGE_QUANTILE = 0.95
+MIN_LATENCY_SAMPLES = 20 # Amostras antes de começar a duplicar requisições
+MIN_HEDGE_DELAY = 0.05 # s
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar('request_deadline', default=None)
+
+
+class DeadlineExceeded(ccxt_async.RequestTimeout):
+    """O prazo do ciclo terminou antes da resposta."""
+
+
+class CircuitOpenError(ccxt_async.ExchangeNotAvailable):
+    """Endpoint com o circuito aberto: falha imediata sem chamar a exchange."""
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """Prazo para todas as chamadas à exchange feitas dentro do bloco (inclusive em tarefas filhas).
+
+    Prazos aninhados nunca estendem o prazo externo.
+    """
+    now = time.monotonic()
+    current = _deadline.get()
+    token = _deadline.set(now + seconds if current is None else min(current, now + seconds))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """Segundos até o prazo atual, ou None sem prazo."""
+    current = _deadline.get()
+    return None if current is None else current - time.monotonic()
+
+
+class LatencyTracker:
+    """Latências recentes de um endpoint (janela deslizante)."""
+
+    def __init__(self, window: int = 200):
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def quantile(self, q: float = HEDGE_QUANTILE) -> float:
+        if not self.samples:
+            return math.nan
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class CircuitBreaker:
+    """Circuito por endpoint: abre após ``failure_threshold`` falhas seguidas.
+
+    Aberto, recusa chamadas até ``reset_timeout`` segundos; depois permite
+    uma única chamada de teste (meio aberto), que fecha o circuito se der
+    certo ou o reabre se falhar.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self.state == 'closed':
+            return True
+        if self.state == 'open' and self.clock() - self.opened_at >= self.reset_timeout:
+            self.state = 'half_open'
+        if self.state == 'half_open' and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.state = 'closed'
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probing = False
+        if self.state == 'half_open' or self.failures >= self.failure_threshold:
+            self.state = 'open'
+            self.opened_at = self.clock()
+
+    def release(self) -> None:
+        """Chamada de teste cancelada sem resultado: libera outra tentativa."""
+        self._probing = False
+
+
+class ResilientExecutor:
+    """Execução com prazo, circuito por endpoint e requisições duplicadas (hedging).
+
+    Leituras idempotentes (``hedged_methods``) que passam do p95 recente do
+    endpoint recebem uma segunda requisição; vale a primeira resposta e a
+    outra é cancelada. Apenas erros de rede e prazos estourados contam como
+    falha do endpoint; respostas de erro da exchange (ex.: saldo
+    insuficiente), 429 (tratado pelo ``RateLimitScheduler``) e o fim do
+    prazo do chamador (que inclui a espera na fila de limites) não abrem o
+    circuito. Leituras não passam do prazo definido por ``deadline``; escritas
+    (``write_methods``) só verificam o prazo antes do envio, pois uma ordem
+    cancelada no meio do caminho pode já ter chegado à exchange.
+    """
+
+    def __init__(
+        self,
+        hedged_methods: Iterable[str] = HEDGED_METHODS,
+        write_methods: Iterable[str] = WRITE_METHODS,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.hedged_methods = set(hedged_methods)
+        self.write_methods = set(write_methods)
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.latencies: Dict[str, LatencyTracker] = {}
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.hedges = 0 # Requisições duplicadas enviadas
+        self.hedge_wins = 0 # Vezes em que a duplicata respondeu primeiro
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        if endpoint not in self.breakers:
+            self.breakers[endpoint] = CircuitBreaker(self.failure_threshold, self.reset_timeout, self.clock)
+        return self.breakers[endpoint]
+
+    def latency(self, endpoint: str) -> LatencyTracker:
+        if endpoint not in self.latencies:
+            self.latencies[endpoint] = LatencyTracker()
+        return self.latencies[endpoint]
+
+    def hedge_delay(self, endpoint: str) -> Optional[float]:
+        """Espera antes da requisição duplicada, ou None se o endpoint não for duplicado."""
+        tracker = self.latency(endpoint)
+        if endpoint not in self.hedged_methods or len(tracker) < MIN_LATENCY_SAMPLES:
+            return None
+        return max(MIN_HEDGE_DELAY, tracker.quantile(HEDGE_QUANTILE))
+
+    async def call(self, endpoint: str, request: Callable[[], Awaitable[Any]]) -> Any:
+        remaining = remaining_time()
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceeded(f"Prazo esgotado antes de chamar {endpoint}")
+        breaker = self.breaker(endpoint)
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuito aberto para {endpoint}")
+
+        if endpoint in self.write_methods:
+            remaining = None # Enviada a ordem, aguarda a resposta mesmo após o prazo
+        started = self.clock()
+        outcome = None
+        try:
+            result = await asyncio.wait_for(self._execute(endpoint, request), timeout=remaining)
+            outcome = 'success'
+            return result
+        except asyncio.TimeoutError: # Prazo do chamador, não lentidão do endpoint: não conta como falha
+            raise DeadlineExceeded(f"Prazo esgotado aguardando {endpoint}") from None
+        except ccxt_async.RateLimitExceeded:
+            raise
+        except ccxt_async.NetworkError:
+            outcome = 'failure'
+            raise
+        except ccxt_async.ExchangeError:
+            outcome = 'success' # A exchange respondeu (ex.: saldo insuficiente): endpoint saudável
+            raise
+        finally:
+            if outcome == 'success':
+                breaker.record_success()
+                self.latency(endpoint).record(self.clock() - started)
+            elif outcome == 'failure':
+                was_open = breaker.state == 'open'
+                breaker.record_failure()
+                if breaker.state == 'open' and not was_open:
+                    logger.warning(f"Circuito aberto para {endpoint} após {breaker.failures} falhas")
+            else:
+                breaker.release() # Cancelado, prazo do chamador, 429 ou erro inesperado: não indica degradação
+
+    async def _execute(self, endpoint: str, request: Callable[[], Awaitable[Any]]) -> Any:
+        delay = self.hedge_delay(endpoint)
+        if delay is None:
+            return await request()
+        tasks = [asyncio.ensure_future(request())]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                self.hedges += 1
+                tasks.append(asyncio.ensure_future(request()))
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not tasks[0]:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
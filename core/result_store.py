@@ -0,0 +1,174 @@
+import json
+import math
+import os
+from datetime import datetime, timezone
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from loguru import logger
+
+from core.backtest_metrics import MetricsAccumulator
+
+# Colunas de cada trade; a curva de equity é ``datetime`` + ``balance``
+TRADE_SCHEMA = pa.schema([
+    ('datetime', pa.timestamp('ms')),
+    ('signal', pa.string()),
+    ('entry_price', pa.float64()),
+    ('exit_price', pa.float64()),
+    ('quantity', pa.float64()),
+    ('pnl', pa.float64()),
+    ('balance', pa.float64()),
+])
+TIME_COLUMNS = ('datetime', 'exit_datetime')
+NON_FINITE = {'Infinity': math.inf, '-Infinity': -math.inf, 'NaN': math.nan} # Gravados como texto no sidecar
+
+
+def _to_json(value: Any) -> Any:
+    """Converte valores NumPy e não finitos (ex.: profit factor sem perdas) para JSON estrito."""
+    if isinstance(value, dict):
+        return {key: _to_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return 'NaN' if math.isnan(value) else ('Infinity' if value > 0 else '-Infinity')
+    return value
+
+
+def _from_json(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _from_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_from_json(item) for item in value]
+    if isinstance(value, str) and value in NON_FINITE:
+        return NON_FINITE[value]
+    return value
+
+
+class ResultStore:
+    """Resultados de backtest em Parquet (colunar, tipado e comprimido) com sidecar de métricas.
+
+    Cada ``append`` grava um novo arquivo ``trades/part-NNNNN.parquet`` e
+    atualiza ``metrics.json`` com as métricas acumuladas, sem reler os trades
+    anteriores. ``read`` carrega apenas as colunas e o intervalo de tempo
+    pedidos (os filtros usam as estatísticas dos row groups do Parquet).
+    """
+
+    def __init__(self, path: Union[str, Path] = 'data/backtest_results', compression: str = 'zstd'):
+        self.path = Path(path)
+        self.compression = compression
+        self.trades_path = self.path / 'trades'
+        self.sidecar_path = self.path / 'metrics.json'
+
+    def __len__(self) -> int:
+        return self.sidecar().get('rows', 0)
+
+    def append(self, trades: Union[pd.DataFrame, List[Dict[str, Any]]]) -> int:
+        """Acrescenta trades (em ordem cronológica) e atualiza o sidecar. Retorna as linhas gravadas."""
+        frame = self._normalize(trades)
+        if frame.empty:
+            return 0
+        sidecar = self.sidecar()
+        schema = self._schema_for(frame)
+        if sidecar.get('schema') and sidecar['schema'] != schema.names:
+            raise ValueError(f"Colunas incompatíveis com os resultados existentes: {frame.columns.tolist()}")
+        if sidecar.get('end') is not None and frame['datetime'].iloc[0] < pd.Timestamp(sidecar['end']):
+            raise ValueError("Trades anteriores aos já armazenados: grave em ordem cronológica")
+
+        self.trades_path.mkdir(parents=True, exist_ok=True)
+        part = self.trades_path / f"part-{sidecar.get('parts', 0):05d}.parquet"
+        table = pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+        pq.write_table(table, part, compression=self.compression)
+
+        accumulator = MetricsAccumulator.from_dict(sidecar['accumulator']) if 'accumulator' in sidecar else MetricsAccumulator()
+        accumulator.add_many(frame['pnl'].to_numpy(), frame['balance'].to_numpy())
+        self._write_sidecar({
+            'rows': sidecar.get('rows', 0) + len(frame),
+            'parts': sidecar.get('parts', 0) + 1,
+            'schema': schema.names,
+            'start': sidecar.get('start') or frame['datetime'].iloc[0].isoformat(),
+            'end': frame['datetime'].iloc[-1].isoformat(),
+            'final_balance': float(frame['balance'].iloc[-1]),
+            'updated_at': datetime.now(timezone.utc).isoformat(),
+            'metrics': accumulator.metrics(),
+            'accumulator': accumulator.to_dict(),
+        })
+        logger.debug(f"{len(frame)} trades gravados em {part}")
+        return len(frame)
+
+    def read(
+        self,
+        columns: Optional[Iterable[str]] = None,
+        start: Optional[Union[str, datetime, pd.Timestamp]] = None,
+        end: Optional[Union[str, datetime, pd.Timestamp]] = None
+    ) -> pd.DataFrame:
+        """Trades com ``start <= datetime < end``, apenas com ``columns`` (todas por padrão)."""
+        if not self.trades_path.exists():
+            return pd.DataFrame(columns=list(columns) if columns else TRADE_SCHEMA.names)
+        dataset = ds.dataset(self.trades_path, format='parquet')
+        condition = None
+        if start is not None:
+            condition = ds.field('datetime') >= pa.scalar(pd.Timestamp(start).to_datetime64(), pa.timestamp('ms'))
+        if end is not None:
+            upper = ds.field('datetime') < pa.scalar(pd.Timestamp(end).to_datetime64(), pa.timestamp('ms'))
+            condition = upper if condition is None else condition & upper
+        columns = list(columns) if columns is not None else None
+        return dataset.to_table(columns=columns, filter=condition).to_pandas()
+
+    def equity_curve(self, start=None, end=None) -> pd.Series:
+        """Saldo após cada trade, indexado pelo horário."""
+        frame = self.read(columns=['datetime', 'balance'], start=start, end=end)
+        return frame.set_index('datetime')['balance']
+
+    def sidecar(self) -> Dict[str, Any]:
+        """Conteúdo de ``metrics.json`` (vazio se ainda não houver resultados)."""
+        try:
+            with open(self.sidecar_path, 'r') as f:
+                return _from_json(json.load(f))
+        except FileNotFoundError:
+            return {}
+
+    def metrics(self) -> Dict[str, Any]:
+        """Métricas pré-calculadas de todos os trades armazenados."""
+        return self.sidecar().get('metrics', {})
+
+    def clear(self) -> None:
+        if self.trades_path.exists():
+            for part in self.trades_path.glob('part-*.parquet'):
+                part.unlink()
+        self.sidecar_path.unlink(missing_ok=True)
+
+    def _normalize(self, trades: Union[pd.DataFrame, List[Dict[str, Any]]]) -> pd.DataFrame:
+        frame = pd.DataFrame(trades).reset_index(drop=True)
+        if frame.empty:
+            return frame
+        missing = [name for name in TRADE_SCHEMA.names if name not in frame]
+        if missing:
+            raise ValueError(f"Colunas obrigatórias ausentes: {missing}")
+        frame['signal'] = [s.value if isinstance(s, Enum) else s for s in frame['signal']]
+        for column in TIME_COLUMNS:
+            if column in frame:
+                frame[column] = pd.to_datetime(frame[column]).astype('datetime64[ms]')
+        return frame
+
+    def _schema_for(self, frame: pd.DataFrame) -> pa.Schema:
+        """Esquema fixo das colunas conhecidas; colunas extras (ex.: ``exit_reason``) são inferidas."""
+        extra = [name for name in frame.columns if name not in TRADE_SCHEMA.names]
+        if not extra:
+            return TRADE_SCHEMA
+        inferred = pa.Schema.from_pandas(frame[extra], preserve_index=False)
+        return pa.schema(list(TRADE_SCHEMA) + list(inferred))
+
+    def _write_sidecar(self, sidecar: Dict[str, Any]) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.sidecar_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(_to_json(sidecar), f, indent=2, allow_nan=False)
+        os.replace(tmp_path, self.sidecar_path) # Troca atômica, como no checkpoint do downloader
@@ -1,8 +1,12 @@
 import asyncio
+from typing import TYPE_CHECKING
 
 from loguru import logger
 from config.settings import SettingsManager
 
+if TYPE_CHECKING:
+    from core.order_book import OrderBook
+
 class RiskManager:
     def __init__(self, settings_manager: SettingsManager, balance, symbol):  # Recebe settings_manager
         """
@@ -15,11 +19,24 @@ class RiskManager:
         self.settings_manager = settings_manager
         self.settings = self.settings_manager.settings
         
-    def calculate_position_size(self, entry_price, stop_loss_price):
-        """Calcula tamanho de posição com parâmetros dinâmicos."""
+    def calculate_position_size(self, entry_price, stop_loss_price, order_book: 'OrderBook' = None):
+        """Calcula tamanho de posição com parâmetros dinâmicos.
+
+        Com ``order_book`` (livro local do WebSocket), o risco por unidade usa
+        o preço médio estimado de execução a mercado (VWAP) em vez de
+        ``entry_price``, incluindo o impacto da ordem no livro.
+        """
         risk_amount = self.balance * self.settings.risk_per_trade  # Usa settings
         delta_price = abs(entry_price - stop_loss_price)
         quantity = (risk_amount / delta_price) * self.settings.leverage  # Usa settings
+        if order_book is not None and quantity > 0:
+            side = 'buy' if stop_loss_price < entry_price else 'sell'
+            fill_price = order_book.vwap(side, quantity)
+            if fill_price is None:
+                logger.warning(f"Livro de ofertas de {self.symbol} sem profundidade para {quantity}; usando o preço de entrada")
+            else:
+                delta_price = abs(fill_price - stop_loss_price) # Uma iteração: a quantidade menor só reduz o impacto
+                quantity = (risk_amount / delta_price) * self.settings.leverage
         return quantity, risk_amount
 
     def validate_stop_loss(self, current_price, stop_loss_price):
@@ -0,0 +1,106 @@
+import asyncio
+import contextvars
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Mapping, Optional, Tuple
+
+# TTL (s) das respostas por método; 0 apenas agrupa chamadas simultâneas
+DEFAULT_READ_TTLS: Dict[Any, float] = {
+    'fetch_ticker': 0.5,
+    'fetch_balance': 1.0,
+    'fetch_ohlcv': 0.0, # O candle em aberto muda a cada trade; fetch_ohlcv_cached já evita buscas repetidas
+    'load_markets': 0.0,
+}
+
+
+class SingleFlightCache:
+    """Agrupa leituras idênticas simultâneas e guarda as respostas por um TTL curto.
+
+    Chamadas com a mesma chave enquanto uma requisição está em andamento
+    recebem o mesmo resultado (ou a mesma exceção) sem nova chamada HTTP.
+    A requisição roda em uma tarefa própria, então o cancelamento de um
+    chamador não afeta os demais. Com TTL maior que zero, a resposta é
+    reutilizada até expirar; erros nunca são guardados. ``invalidate``
+    também desliga as leituras em andamento do cache: quem já aguarda
+    recebe o resultado, mas ele não é guardado e as chamadas seguintes
+    enviam uma nova requisição. A tarefa compartilhada roda em um contexto
+    vazio, sem herdar o ``deadline`` de quem a criou: cada chamador limita
+    a própria espera. O TTL é procurado por ``(método, símbolo)`` e depois
+    por ``método``; métodos ausentes de ``ttls`` não passam pelo cache. As respostas são compartilhadas: não as
+    modifique.
+    """
+
+    def __init__(
+        self,
+        ttls: Mapping[Any, float] = DEFAULT_READ_TTLS,
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.ttls = dict(ttls)
+        self.max_entries = max_entries
+        self.clock = clock
+        self.hits = 0 # Respostas servidas pelo cache
+        self.misses = 0 # Requisições realmente enviadas
+        self.coalesced = 0 # Chamadas que aguardaram uma requisição já em andamento
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {} # chave -> (expiração, resposta)
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def handles(self, method: str) -> bool:
+        return method in self.ttls
+
+    def ttl(self, method: str, symbol: Optional[str] = None) -> float:
+        return self.ttls.get((method, symbol), self.ttls.get(method, 0.0))
+
+    async def get(self, method: str, args: tuple, kwargs: Mapping[str, Any], request: Callable[[], Awaitable[Any]]) -> Any:
+        """Resposta de ``request()`` para a chamada ``method(*args, **kwargs)``."""
+        key = self.key(method, args, kwargs)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > self.clock():
+                self.hits += 1
+                return entry[1]
+            del self._entries[key]
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            ttl = self.ttl(method, args[0] if args else None)
+            task = self._in_flight[key] = asyncio.get_running_loop().create_task(
+                self._run(key, request, ttl), context=contextvars.Context() # Sem o prazo do primeiro chamador
+            )
+        return await asyncio.shield(task) # Cancelar um chamador não cancela a requisição compartilhada
+
+    def invalidate(self, method: str = None) -> None:
+        """Descarta as respostas guardadas (de ``method`` ou todas), ex.: após criar uma ordem."""
+        if method is None:
+            self._entries.clear()
+            self._in_flight.clear()
+        else:
+            self._entries = {key: entry for key, entry in self._entries.items() if key[0] != method}
+            self._in_flight = {key: task for key, task in self._in_flight.items() if key[0] != method}
+
+    @staticmethod
+    def key(method: str, args: tuple, kwargs: Mapping[str, Any]) -> Hashable:
+        return (method, repr(args), repr(sorted(kwargs.items()))) # repr aceita argumentos não hasheáveis (ex.: params)
+
+    async def _run(self, key: Hashable, request: Callable[[], Awaitable[Any]], ttl: float) -> Any:
+        try:
+            result = await request()
+            if ttl > 0 and self._in_flight.get(key) is asyncio.current_task(): # Descartada por invalidate: não guarda
+                if len(self._entries) >= self.max_entries:
+                    self._evict()
+                self._entries[key] = (self.clock() + ttl, result)
+            return result
+        finally:
+            if self._in_flight.get(key) is asyncio.current_task():
+                del self._in_flight[key]
+
+    def _evict(self) -> None:
+        now = self.clock()
+        self._entries = {key: entry for key, entry in self._entries.items() if entry[0] > now}
+        while len(self._entries) >= self.max_entries: # Ainda cheio: remove as que expiram primeiro
+            del self._entries[min(self._entries, key=lambda k: self._entries[k][0])]
@@ -4,6 +4,7 @@ from ta.momentum import RSIIndicator
 from ta.trend import MACD
 from loguru import logger
 from config.settings import SettingsManager  # Importa configurações dinâmicas
+from core.indicators import IncrementalIndicators, macd_series, rsi_series
 from typing import Dict, List, Tuple, Union
 from enum import Enum
 
@@ -13,6 +14,13 @@ class TradingSignal(Enum):
     STRONG_SELL = "strong_sell"
     HOLD = "hold"
 
+# Códigos usados na geração vetorizada de sinais
+SIGNAL_CODES: Dict[int, TradingSignal] = {
+    1: TradingSignal.STRONG_BUY,
+    -1: TradingSignal.STRONG_SELL,
+    0: TradingSignal.HOLD,
+}
+
 class TradingStrategy:
     def __init__(self, ohlcv: List[List[Union[int, float]]], settings: 'Settings'):
         self.settings = settings
@@ -21,36 +29,75 @@ class TradingStrategy:
         )
         self.data['timestamp'] = pd.to_datetime(self.data['timestamp'], unit='ms')
         self.data.set_index('timestamp', inplace=True) # Define timestamp como índice
+        self.candle_count = len(self.data)
+        self.close_price: float = float(self.data['close'].iloc[-1]) if self.candle_count else 0.0
         self.rsi = self.calculate_rsi()
-        self.macd_line, self.signal_line, self.macd_histogram = self.calculate_macd()
+        self.macd_line, self.signal_line, self.macd_histogram = self.calculate_macd(
+            self.settings.macd_fast, self.settings.macd_slow, self.settings.macd_signal
+        )
         self.signal: TradingSignal = self.generate_signal() # Adiciona type hint
         self.stop_loss_price: float = self.calculate_stop_loss_price() # Calcula o preço de stop loss
 
-    def calculate_rsi(self, period: int = 14) -> pd.Series:
-        """Calcula RSI manualmente."""
-        delta = self.data['close'].diff()
-        gain = delta.where(delta > 0, 0)
-        loss = -delta.where(delta < 0, 0)
+    @classmethod
+    def from_indicators(cls, indicators: IncrementalIndicators, settings: 'Settings') -> 'TradingStrategy':
+        """Cria a estratégia sobre o estado incremental, sem reconstruir o DataFrame."""
+        strategy = cls.__new__(cls)
+        strategy.settings = settings
+        strategy.data = None # Sem DataFrame: os valores vêm direto do motor incremental
+        strategy.candle_count = len(indicators)
+        strategy.close_price = indicators.close if strategy.candle_count else 0.0
+
+        index = pd.to_datetime(indicators.series('timestamp'), unit='ms')
+        strategy.rsi = pd.Series(indicators.series('rsi'), index=index)
+        strategy.macd_line = pd.Series(indicators.series('macd'), index=index)
+        strategy.signal_line = pd.Series(indicators.series('signal'), index=index)
+        strategy.macd_histogram = pd.Series(indicators.series('histogram'), index=index)
+        strategy.signal = strategy.generate_signal()
+        strategy.stop_loss_price = strategy.calculate_stop_loss_price()
+        return strategy
+
+    @classmethod
+    def vectorized_signals(cls, close: np.ndarray, settings: 'Settings') -> np.ndarray:
+        """Gera os sinais de todos os candles em uma única passada.
 
-        avg_gain = gain.rolling(window=period).mean()
-        avg_loss = loss.rolling(window=period).mean()
+        O valor no índice ``i`` (ver ``SIGNAL_CODES``) é o sinal que a
+        estratégia geraria recebendo apenas os candles até ``i``.
+        """
+        close_series = pd.Series(close, dtype=np.float64, copy=False)
+        rsi = rsi_series(close_series).to_numpy()
+        macd_line, signal_line, _ = macd_series(
+            close_series, settings.macd_fast, settings.macd_slow, settings.macd_signal
+        )
+        macd_line = macd_line.to_numpy()
+        signal_line = signal_line.to_numpy()
+
+        signals = np.zeros(len(close), dtype=np.int8)
+        if len(close) < 30:
+            return signals
+
+        prev_macd, prev_signal = macd_line[:-1], signal_line[:-1]
+        cur_macd, cur_signal = macd_line[1:], signal_line[1:]
+        cross_up = (prev_macd < prev_signal) & (cur_macd > cur_signal)
+        cross_down = (prev_macd > prev_signal) & (cur_macd < cur_signal)
 
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+        buy = (rsi[1:] < settings.rsi_buy) & cross_up
+        sell = (rsi[1:] > settings.rsi_sell) & cross_down
+        signals[1:][buy] = 1
+        signals[1:][sell & ~buy] = -1
+        signals[:29] = 0 # Menos de 30 candles: HOLD
+        return signals
+
+    def calculate_rsi(self, period: int = 14) -> pd.Series:
+        """Calcula RSI manualmente."""
+        return rsi_series(self.data['close'], period)
 
     def calculate_macd(self, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[pd.Series, pd.Series, pd.Series]:
         """Calcula MACD manualmente."""
-        fast_ema = self.data['close'].ewm(span=fast, adjust=False).mean()
-        slow_ema = self.data['close'].ewm(span=slow, adjust=False).mean()
-        macd_line = fast_ema - slow_ema
-        signal_line = macd_line.ewm(span=signal, adjust=False).mean()
-        histogram = macd_line - signal_line
-        return macd_line, signal_line, histogram
+        return macd_series(self.data['close'], fast, slow, signal)
 
     def generate_signal(self) -> TradingSignal:
         """Gera sinal de trade."""
-        if len(self.data) < 30:
+        if self.candle_count < 30:
             return TradingSignal.HOLD
         
         rsi_buy = self.rsi.iloc[-1] < self.settings.rsi_buy
@@ -74,10 +121,10 @@ class TradingStrategy:
 
     def calculate_stop_loss_price(self) -> float:
         if self.signal == TradingSignal.STRONG_BUY:
-            return self.data['close'].iloc[-1] * (1 - self.settings.stop_loss_percent / 100)
+            return self.close_price * (1 - self.settings.stop_loss_percent / 100)
         elif self.signal == TradingSignal.STRONG_SELL:
-            return self.data['close'].iloc[-1] * (1 + self.settings.stop_loss_percent / 100)
+            return self.close_price * (1 + self.settings.stop_loss_percent / 100)
         elif self.signal == TradingSignal.HOLD: # Adiciona condição para TradingSignal.HOLD
             return 0.0
         else:
-            return self.data['close'].iloc[-1] # Retorna o preço atual se o sinal não for de compra ou venda
\ No newline at end of file
+            return self.close_price # Retorna o preço atual se o sinal não for de compra ou venda
\ No newline at end of file
@@ -0,0 +1,177 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from config.settings import Settings
+from core.backtest_metrics import MetricsAccumulator
+from core.backtester import Backtester, OHLCV_COLUMNS, WARMUP_CANDLES
+from core.kernels import signal_matrix
+from core.optimizer import parameter_grid
+from core.worker_pool import init_worker, shared_arrays, worker_state
+
+
+def _window_trades(backtester: Backtester, params: Dict[str, Any], signals: np.ndarray) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """Trades e métricas de uma combinação na janela de ``backtester``."""
+    backtester.settings = Settings(**{**worker_state['base_settings'], **params})
+    trades = backtester._vectorized_trades(signals)
+    accumulator = MetricsAccumulator()
+    pnl = trades['pnl']
+    accumulator.add_many(pnl, backtester.initial_balance + np.cumsum(pnl))
+    return trades, accumulator.metrics()
+
+
+def _run_window(task: Tuple[int, int, int, str, bool]) -> Dict[str, Any]:
+    """Otimiza na janela de treino e avalia a melhor combinação na janela de teste."""
+    train_start, train_end, test_end, sort_by, ascending = task
+    data, signals = worker_state['data'], worker_state['signals']
+    combinations = worker_state['combinations']
+    kwargs = worker_state['backtest_kwargs']
+
+    train = Backtester(data[train_start:train_end], worker_state['settings_manager'], **kwargs)
+    scores = []
+    for i, params in enumerate(combinations):
+        _, metrics = _window_trades(train, params, signals[i, train_start:train_end])
+        scores.append(metrics)
+    table = pd.DataFrame(scores).sort_values(sort_by, ascending=ascending, kind='stable')
+    best = int(table.index[0])
+
+    test = Backtester(data[train_end:test_end], worker_state['settings_manager'], **kwargs)
+    trades, test_metrics = _window_trades(test, combinations[best], signals[best, train_end:test_end])
+    trades['idx'] = trades['idx'] + train_end # Índices relativos à série completa
+    return {
+        'params': combinations[best],
+        'train_metrics': scores[best],
+        'test_metrics': test_metrics,
+        'trades': trades,
+    }
+
+
+class WalkForward:
+    """Otimização walk-forward com janelas móveis de treino e teste.
+
+    Em cada janela, a grade de ``Settings`` é avaliada no treino e a melhor
+    combinação é aplicada na janela de teste seguinte; os trades de teste
+    formam a curva de equity fora da amostra. Os sinais de todas as
+    combinações são calculados uma única vez sobre a série completa
+    (``core.kernels.signal_matrix``) e cada janela apenas recorta a matriz,
+    então os indicadores de janelas sobrepostas não são recalculados.
+    Os indicadores são causais: o valor em ``i`` usa somente candles até ``i``.
+    As janelas rodam em paralelo, em processos que leem candles e sinais de
+    memória compartilhada.
+    """
+
+    def __init__(
+        self,
+        historical_data: Union[List[List[Union[int, float]]], np.ndarray],
+        base_settings: Settings,
+        grid: Dict[str, Sequence[Any]],
+        train_size: int,
+        test_size: int,
+        anchored: bool = False,
+        initial_balance: float = 10000,
+        slippage: float = 0.001,
+        commission: float = 0.0005,
+        max_workers: Optional[int] = None
+    ):
+        """
+        Args:
+            train_size (int): Candles da janela de treino (mínimo inicial se ``anchored``).
+            test_size (int): Candles de cada janela de teste; também é o passo entre janelas.
+            anchored (bool): Janela de treino expansível, sempre a partir do primeiro candle.
+        """
+        self.data = np.asarray(historical_data, dtype=np.float64)
+        if self.data.ndim != 2 or self.data.shape[1] != len(OHLCV_COLUMNS):
+            raise ValueError("Dados históricos incompletos")
+        if train_size <= 0 or test_size <= 0:
+            raise ValueError("train_size e test_size devem ser positivos")
+        self.base_settings = base_settings
+        self.combinations = parameter_grid(grid)
+        self.train_size = train_size
+        self.test_size = test_size
+        self.anchored = anchored
+        self.backtest_kwargs = {
+            'initial_balance': initial_balance,
+            'slippage': slippage,
+            'commission': commission,
+        }
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.backtester: Optional[Backtester] = None # Backtest combinado fora da amostra
+        self.metrics: Dict[str, Any] = {}
+
+    def windows(self) -> List[Tuple[int, int, int]]:
+        """``(início do treino, fim do treino = início do teste, fim do teste)`` de cada janela."""
+        windows = []
+        train_end = self.train_size
+        while train_end + self.test_size <= len(self.data):
+            train_start = 0 if self.anchored else train_end - self.train_size
+            windows.append((train_start, train_end, train_end + self.test_size))
+            train_end += self.test_size
+        return windows
+
+    def signals(self) -> np.ndarray:
+        """Matriz (combinações × candles) de sinais sobre a série completa."""
+        params = {field: [] for field in ('rsi_buy', 'rsi_sell', 'macd_fast', 'macd_slow', 'macd_signal')}
+        for combination in self.combinations:
+            settings = self.base_settings.model_copy(update=combination)
+            for field in params:
+                params[field].append(getattr(settings, field))
+        signals = signal_matrix(self.data[:, 4], **params)['signals']
+        signals[:, :WARMUP_CANDLES] = 0 # Mesmo aquecimento do Backtester
+        return signals
+
+    def run(self, sort_by: str = 'net_profit', ascending: bool = False) -> pd.DataFrame:
+        """Executa todas as janelas e retorna uma linha por janela.
+
+        A curva fora da amostra fica em ``self.backtester`` (trades e saldo)
+        e suas métricas em ``self.metrics``.
+        """
+        windows = self.windows()
+        if not windows or not self.combinations:
+            raise ValueError("Histórico insuficiente para uma janela de treino e teste")
+        logger.info(
+            f"Walk-forward: {len(windows)} janelas × {len(self.combinations)} combinações "
+            f"em {self.max_workers} processos"
+        )
+
+        signals = self.signals()
+        base_settings = self.base_settings.model_dump()
+        state = {'base_settings': base_settings, 'combinations': self.combinations, 'backtest_kwargs': self.backtest_kwargs}
+        with shared_arrays(data=self.data, signals=signals) as arrays, ProcessPoolExecutor( # Candles e matriz de sinais
+            max_workers=min(self.max_workers, len(windows)),
+            initializer=init_worker,
+            initargs=(arrays, base_settings, state)
+        ) as executor:
+            tasks = [(*window, sort_by, ascending) for window in windows]
+            results = list(executor.map(_run_window, tasks))
+
+        # Curva fora da amostra: trades de teste em ordem, com saldo contínuo entre janelas
+        settings_manager = SimpleNamespace(settings=self.base_settings) # Não altera o SettingsManager global
+        self.backtester = Backtester(self.data, settings_manager, **self.backtest_kwargs)
+        trades = {key: np.concatenate([r['trades'][key] for r in results]) for key in results[0]['trades']}
+        self.metrics = self.backtester._record_vectorized(trades)
+
+        timestamps = pd.to_datetime(self.data[:, 0].astype(np.int64), unit='ms')
+        rows = []
+        for (train_start, train_end, test_end), result in zip(windows, results):
+            rows.append({
+                'train_start': timestamps[train_start],
+                'test_start': timestamps[train_end],
+                'test_end': timestamps[test_end - 1],
+                **result['params'],
+                **{f'train_{k}': float(v) for k, v in result['train_metrics'].items()},
+                **{f'test_{k}': float(v) for k, v in result['test_metrics'].items()},
+            })
+        return pd.DataFrame(rows, index=pd.RangeIndex(1, len(rows) + 1, name='window'))
+
+    @property
+    def equity_curve(self) -> pd.Series:
+        """Saldo após cada trade fora da amostra."""
+        if self.backtester is None or not self.backtester.results:
+            return pd.Series(dtype=np.float64)
+        results = self.backtester.results
+        return pd.Series([t['balance'] for t in results], index=[t['datetime'] for t in results], name='balance')
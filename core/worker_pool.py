@@ -0,0 +1,55 @@
+import asyncio
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterator, Tuple
+
+import numpy as np
+from loguru import logger
+
+from config.settings import Settings, SettingsManager
+
+ArraySpec = Tuple[str, Tuple[int, ...], str] # (nome do bloco, shape, dtype)
+
+# Estado de cada processo do pool (definido por init_worker)
+worker_state: Dict[str, Any] = {}
+
+
+@contextmanager
+def shared_arrays(**arrays: np.ndarray) -> Iterator[Dict[str, ArraySpec]]:
+    """Copia os arrays para memória compartilhada e retorna a descrição de cada um para ``init_worker``.
+
+    Os blocos são liberados ao sair do ``with``, depois que o pool terminou.
+    """
+    blocks = []
+    try:
+        specs = {}
+        for key, array in arrays.items():
+            shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+            blocks.append(shm)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[:] = array
+            specs[key] = (shm.name, array.shape, array.dtype.str)
+        yield specs
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+
+def init_worker(arrays: Dict[str, ArraySpec], settings: Dict[str, Any], state: Dict[str, Any]) -> None:
+    """Anexa o processo aos arrays em memória compartilhada (somente leitura).
+
+    Cada array fica em ``worker_state`` com a mesma chave usada em
+    ``shared_arrays``, junto de um ``SettingsManager`` com ``settings`` e
+    dos valores de ``state``.
+    """
+    logger.disable('core.backtester') # Evita milhares de linhas de log por worker
+    shms = []
+    for key, (name, shape, dtype) in arrays.items():
+        shm = shared_memory.SharedMemory(name=name)
+        shms.append(shm)
+        array = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        array.flags.writeable = False
+        worker_state[key] = array
+    settings_manager = asyncio.run(SettingsManager())
+    settings_manager.settings = Settings(**settings)
+    worker_state.update(state, shms=shms, settings_manager=settings_manager)
@@ -1,6 +1,8 @@
 import asyncio
 import sys
 from core.api_connector import BitgetAPIConnector
+from core.indicators import IncrementalIndicators
+from core.resilience import deadline
 from core.strategy import TradingStrategy
 from utils.logger import PositionManager
 from utils.notifier import Notifier
@@ -30,52 +32,60 @@ async def main(dry_run=False):
     logger.info(f"Iniciando o bot com as configurações: {settings}") # Usa settings diretamente
 
     position_manager = PositionManager(api, settings_manager)
+    indicators = IncrementalIndicators( # Estado de RSI/MACD mantido entre ciclos
+        macd_fast=settings.macd_fast, macd_slow=settings.macd_slow, macd_signal=settings.macd_signal
+    )
 
     # Loop principal com controle de concorrência
     while True:
         async with notifier.lock:  # Garante acesso exclusivo
             if notifier.bot_running:
                 try:
-                    # Obtém dados OHLCV com validação
-                    ohlcv = await api.exchange.fetch_ohlcv(
-                    symbol=settings.symbol,
-                    timeframe=settings.timeframe,
-                    limit=100
-                )
-
-                    if settings.telegram_bot_token: # Verifica se as configurações do Telegram estão presentes
-                        await notifier.send_telegram(start_message) # Envia a mensagem de inicialização
-
-                    if len(ohlcv) < 100:
-                        raise ValueError("Dados insuficientes para análise")
-
-                    # Atualiza estratégia e preço
-                    strategy = TradingStrategy(ohlcv, settings)
-                    notifier.latest_ohlcv = ohlcv
-                    notifier.latest_strategy = strategy
-                    notifier.latest_price = strategy.data['close'].iloc[-1]
-
-                    # Verifica sinal de trading, calcula tamanho da posição e abre posição
-                    if strategy.signal in ["strong_buy", "strong_sell"]:
-                        try:
-                            quantity = position_manager.risk_manager.calculate_position_size(
-                                entry_price=notifier.latest_price,
-                                stop_loss_price=strategy.stop_loss_price
-                            )[0]
-
-                            await position_manager.open_position(
-                                symbol=settings.symbol,
-                                side=strategy.signal.split('_')[1],
-                                quantity=quantity,
-                                entry_price=notifier.latest_price
-                            )
-                        except Exception as e:
-                            logger.error(f"Erro ao abrir posição: {e}")
-                            await notifier.send_telegram(f"⚠️ Erro ao abrir posição: {str(e)}")
-
-                    # Gerencia posições e aguarda o próximo ciclo
-                    await position_manager.manage_positions()
-                    await asyncio.sleep(settings.trade_frequency)
+                    with deadline(settings.trade_frequency): # Nenhuma chamada à exchange passa do orçamento do ciclo
+                        # Obtém dados OHLCV com validação (montados pelo stream de trades após o primeiro ciclo)
+                        candles = await api.fetch_ohlcv_cached(
+                        symbol=settings.symbol,
+                        timeframe=settings.timeframe,
+                        limit=100
+                    )
+
+                        if settings.telegram_bot_token: # Verifica se as configurações do Telegram estão presentes
+                            await notifier.send_telegram(start_message) # Envia a mensagem de inicialização
+
+                        if len(candles) < 100:
+                            raise ValueError("Dados insuficientes para análise")
+
+                        # Atualiza estratégia e preço
+                        indicators.sync(candles.view()) # Processa só os candles novos ou revisados
+                        strategy = TradingStrategy.from_indicators(indicators, settings)
+                        notifier.latest_ohlcv = candles
+                        notifier.latest_strategy = strategy
+                        notifier.latest_price = strategy.close_price
+
+                        # Verifica sinal de trading, calcula tamanho da posição e abre posição
+                        if strategy.signal in ["strong_buy", "strong_sell"]:
+                            try:
+                                quantity = position_manager.risk_manager.calculate_position_size(
+                                    entry_price=notifier.latest_price,
+                                    stop_loss_price=strategy.stop_loss_price,
+                                    order_book=api.get_order_book(settings.symbol) # Impacto estimado pelo livro local, sem chamada REST
+                                )[0]
+
+                                await position_manager.open_position(
+                                    symbol=settings.symbol,
+                                    side=strategy.signal.split('_')[1],
+                                    quantity=quantity,
+                                    entry_price=notifier.latest_price
+                                )
+                            except Exception as e:
+                                logger.error(f"Erro ao abrir posição: {e}")
+                                await notifier.send_telegram(f"⚠️ Erro ao abrir posição: {str(e)}")
+
+                        # Gerencia posições
+                        await position_manager.manage_positions()
+
+                    # Aguarda o fechamento do próximo candle (no máximo trade_frequency)
+                    await api.wait_candle_close(settings.timeframe, timeout=settings.trade_frequency)
 
                 except Exception as e:
                     logger.exception(f"Erro no ciclo de trading:") # Captura o traceback completo
@@ -3,6 +3,7 @@ from decouple import Config, RepositoryEnv, UndefinedValueError
 import pandas as pd
 import plotly.graph_objects as go
 from core.api_connector import BitgetAPIConnector
+from core.result_store import ResultStore
 
 # Carrega configurações do .env
 try:
@@ -84,14 +85,24 @@ else:
 
 # Backtest
 st.title("📜 Histórico de Backtest")
-try:
-    backtest_df = pd.read_csv('backtest_results.csv')
+results = ResultStore('data/backtest_results')
+summary = results.sidecar() # Métricas pré-calculadas: não relê os trades
+if summary.get('rows'):
+    period = (pd.Timestamp(summary['start']).date(), pd.Timestamp(summary['end']).date())
+    selected = st.sidebar.date_input("Período do backtest", value=period)
+    start_date, end_date = selected if len(selected) == 2 else period # Seleção incompleta: período inteiro
+    backtest_df = results.read(
+        columns=['datetime', 'signal', 'entry_price', 'exit_price', 'pnl', 'balance'],
+        start=pd.Timestamp(start_date),
+        end=pd.Timestamp(end_date) + pd.Timedelta(days=1)
+    )
     st.dataframe(backtest_df)
-    
-    total_trades = len(backtest_df)
-    win_rate = (backtest_df['signal'].str.contains('buy').sum() / total_trades) * 100
-    col1, col2 = st.columns(2)
-    col1.metric("Total de Trades", total_trades)
-    col2.metric("Taxa de Acerto", f"{win_rate:.2f}%")
-except FileNotFoundError:
-    st.warning("Execute o backtest primeiro: `python main.py --backtest`")
\ No newline at end of file
+    st.line_chart(backtest_df.set_index('datetime')['balance'])
+
+    metrics = summary['metrics']
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Total de Trades", metrics['total_trades'])
+    col2.metric("Taxa de Acerto", f"{metrics['win_rate']:.2f}%")
+    col3.metric("Lucro Líquido", f"{metrics['net_profit']:.2f}")
+else:
+    st.warning("Execute o backtest e exporte os resultados com `Backtester.export_results()`")
@@ -1,11 +1,15 @@
 import asyncio
 import json
 import os
+import numpy as np
 import pytest
 from pathlib import Path  # Importa Path
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
-from config.settings import SettingsManager
+from config.settings import Settings, SettingsManager
+
+# Parâmetros que geram trades com frequência nos candles sintéticos dos testes de backtest
+BACKTEST_SETTINGS = {'rsi_buy': 45, 'rsi_sell': 55, 'take_profit_percent': 0.1, 'stop_loss_percent': 0.1}
 
 
 @pytest.fixture
@@ -15,6 +19,45 @@ async def settings():
     return settings_manager
 
 
+class FakeClock:
+    """Relógio controlado pelo teste (``clock.now``), no lugar de ``time.monotonic``."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def settings_manager_factory():
+    """Cria SettingsManager falsos com ``BACKTEST_SETTINGS`` e os campos passados, sem ler o arquivo de configurações."""
+    def factory(**overrides):
+        manager = MagicMock()
+        manager.load = AsyncMock()
+        manager.settings = Settings(**{**BACKTEST_SETTINGS, **overrides})
+        return manager
+    return factory
+
+
+@pytest.fixture
+def random_walk_ohlcv():
+    """Cria candles sintéticos (lista no formato do ccxt) com pavios suficientes para acionar TP/SL."""
+    def factory(n, seed):
+        rng = np.random.default_rng(seed)
+        close = 30000 + np.cumsum(rng.normal(0, 40, n))
+        open_ = np.r_[close[0], close[:-1]]
+        high = np.maximum(open_, close) + rng.random(n) * 30
+        low = np.minimum(open_, close) - rng.random(n) * 30
+        return [[1700000000000 + i * 60000, open_[i], high[i], low[i], close[i], 1.0] for i in range(n)]
+    return factory
+
+
 @pytest.fixture(scope="session", autouse=True)
 def event_loop():
     """Redefine event_loop como autouse para evitar warnings."""
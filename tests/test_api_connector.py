@@ -1,9 +1,13 @@
 import asyncio
+import json
 import pytest
 from loguru import logger
 from unittest.mock import AsyncMock, MagicMock, patch
-from core.api_connector import BitgetAPIConnector
+from core.api_connector import BitgetAPIConnector, CANDLE_CLOSE_GRACE_MS
+from core.rate_limiter import PRIORITY_ACCOUNT, PRIORITY_ORDER
+from core.resilience import DeadlineExceeded, deadline
 import ccxt.async_support as ccxt_async
+from config.settings import Settings
 
 @pytest.fixture
 async def api(settings):
@@ -83,69 +87,260 @@ async def test_format_symbol(api):
     assert api.format_symbol("BTC/USDT:USDT") == "BTCUSDTUSDT"
     assert api.format_symbol("ETH/USD") == "ETHUSD"
 
+def _candles(start, count, timeframe_ms=60000):
+    return [[start + i * timeframe_ms, 100.0 + i, 101.0 + i, 99.0 + i, 100.5 + i, 1.0] for i in range(count)]
+
+@pytest.fixture
+def connector():
+    settings_manager = MagicMock()
+    settings_manager.settings = Settings()
+    return BitgetAPIConnector(settings_manager)
+
 @pytest.mark.asyncio
-async def test_websocket_on_message(api):
-    api_instance = await api # Aguarda a fixture api
-    mock_ws = MagicMock()
-    message = '{"data":[{"tradeId":"123"}]}'
-    api_instance.on_message(mock_ws, message) # Chama o método diretamente
+async def test_fetch_ohlcv_cached_delta(connector):
+    """Após a carga inicial, busca apenas a partir do último candle conhecido."""
+    now = 1700000000000 + 99 * 60000 + 30000 # Meio do candle em aberto
+    initial = _candles(1700000000000, 100)
+    with patch.object(connector.exchange, 'milliseconds', return_value=now), \
+        patch.object(connector.exchange, 'fetch_ohlcv', new_callable=AsyncMock) as mock_fetch:
+        mock_fetch.return_value = initial
+        buffer = await connector.fetch_ohlcv_cached('BTC/USDT:USDT', '1m')
+        assert len(buffer) == 100
+
+        # Um minuto depois: candle anterior revisado + um candle novo
+        update = _candles(initial[-1][0], 2)
+        update[0][4] = 555.0
+        mock_fetch.return_value = update
+        connector.exchange.milliseconds.return_value = now + 60000
+        buffer = await connector.fetch_ohlcv_cached('BTC/USDT:USDT', '1m')
+
+        mock_fetch.assert_awaited_with('BTC/USDT:USDT', '1m', since=initial[-1][0], limit=2)
+        assert len(buffer) == 100
+        assert buffer.column('close')[-2] == 555.0
+        assert buffer.last_timestamp == update[-1][0]
 
 @pytest.mark.asyncio
-async def test_websocket_on_close(api, event_loop): # Adiciona event_loop
-    api_instance = await api # Aguarda a fixture api
-    mock_ws = MagicMock()
-    with patch.object(api.connected_event, 'clear') as mock_clear:
-        api.on_close(mock_ws, 1000, "Test Close")
-        mock_clear.assert_called_once()
+async def test_fetch_ohlcv_cached_full_refresh_on_gap(connector):
+    initial = _candles(1700000000000, 100)
+    with patch.object(connector.exchange, 'milliseconds', return_value=initial[-1][0]), \
+        patch.object(connector.exchange, 'fetch_ohlcv', new_callable=AsyncMock) as mock_fetch:
+        mock_fetch.return_value = initial
+        await connector.fetch_ohlcv_cached('BTC/USDT:USDT', '1m')
+
+        # Bot parado por mais que a janela: recarrega tudo
+        refreshed = _candles(initial[-1][0] + 500 * 60000, 100)
+        mock_fetch.return_value = refreshed
+        connector.exchange.milliseconds.return_value = refreshed[-1][0]
+        buffer = await connector.fetch_ohlcv_cached('BTC/USDT:USDT', '1m')
+
+        mock_fetch.assert_awaited_with('BTC/USDT:USDT', '1m', limit=100)
+        assert buffer.view()['timestamp'][0] == refreshed[0][0]
+
+
+def test_websocket_on_message(connector):
+    message = '{"data":[["1700000000000","100.5","0.1","buy"]]}'
+    connector.on_message(message) # Chamado no event loop, sem o objeto ws
+
+def test_trade_subscription(connector):
+    assert connector.trade_subscription('BTC/USDT:USDT') == {"instType": "mc", "channel": "trade", "instId": "BTCUSDT"}
+    assert connector.feed.subscriptions == [
+        connector.trade_subscription(connector.settings.symbol),
+        connector.ticker_subscription(connector.settings.symbol),
+        connector.books_subscription(connector.settings.symbol),
+    ]
 
 @pytest.mark.asyncio
-async def test_websocket_on_error(api, event_loop): # Adiciona event_loop
-    api_instance = await api # Aguarda a fixture api
+async def test_connect(connector):
+    async def fake_run():
+        connector.feed.connected.set()
+        await asyncio.Event().wait() # Mantém a "conexão" aberta
 
-    mock_ws = MagicMock()
-    with patch.object(logger, 'exception') as mock_log:
-        api.on_error(mock_ws, Exception("Test Error"))
-        mock_log.assert_called_once()
+    with patch.object(connector.exchange, 'load_markets', new_callable=AsyncMock) as mock_load, \
+        patch.object(connector.feed, 'run', side_effect=fake_run), \
+        patch.object(connector.exchange, 'close', new_callable=AsyncMock):
+        await asyncio.wait_for(connector.connect(), timeout=1)
+        mock_load.assert_awaited_once()
+        assert connector.connected_event.is_set()
+        await connector.close()
+        assert connector.feed_tasks == []
 
 @pytest.mark.asyncio
-async def test_websocket_on_open(api, event_loop): # Adiciona event_loop
-    api_instance = await api # Aguarda a fixture api
-    mock_ws = MagicMock()
-    with patch.object(mock_ws, 'send') as mock_send:
-        api.on_open(mock_ws)
-        mock_send.assert_called_once()
+async def test_connect_times_out_without_websocket(connector):
+    with patch.object(connector.exchange, 'load_markets', new_callable=AsyncMock), \
+        patch.object(connector.feed, 'run', side_effect=asyncio.Event().wait), \
+        patch.object(connector.exchange, 'close', new_callable=AsyncMock) as mock_close:
+        with pytest.raises(ConnectionError):
+            await asyncio.wait_for(connector.connect(timeout=0.05), timeout=1)
+        assert connector.feed_tasks == [] # Tarefas do feed canceladas
+        mock_close.assert_awaited_once()
 
 @pytest.mark.asyncio
-async def test_set_connected_event(api, event_loop): # Adiciona event_loop
-    api_instance = await api # Aguarda a fixture api
-    with patch.object(api.connected_event, 'set') as mock_set:
-        await api.set_connected_event()
-        mock_set.assert_called_once()
+async def test_consume_feed_dispatches_messages(connector):
+    with patch.object(connector, 'on_message', side_effect=[ValueError('inválida'), None]) as mock_on_message:
+        task = asyncio.create_task(connector.consume_feed())
+        connector.feed.queue.put_nowait('primeira')
+        connector.feed.queue.put_nowait('segunda')
+        for _ in range(10):
+            await asyncio.sleep(0)
+        task.cancel()
+        # Uma mensagem com erro não interrompe o consumo das seguintes
+        assert [c.args[0] for c in mock_on_message.call_args_list] == ['primeira', 'segunda']
+
+def _trade_message(connector, *trades):
+    return json.dumps({'action': 'update', 'arg': connector.trade_arg, 'data': [[str(ts), str(price), '1', 'buy'] for ts, price in trades]})
+
+def test_on_message_builds_candles_from_every_trade(connector):
+    connector.on_message(_trade_message(connector, (1000, 100), (2000, 101), (3000, 99)))
+    connector.on_message(json.dumps({'event': 'subscribe', 'arg': connector.trade_arg})) # Sem dados
+    assert connector.candle_builder.buffers['1m'].to_list() == [[0, 100.0, 101.0, 99.0, 99.0, 3.0]]
+
+    connector.on_message(_trade_message(connector, (60000, 102)))
+    assert connector.candle_events.get_nowait() == ('1m', [0, 100.0, 101.0, 99.0, 99.0, 3.0])
 
 @pytest.mark.asyncio
-async def test_connect(api, event_loop): # Adiciona event_loop
-    api_instance = await api # Aguarda a fixture api
-    with patch('core.api_connector.BitgetAPIConnector.start_websocket') as mock_start_ws:
-        with patch.object(api.connected_event, 'wait', new_callable=AsyncMock) as mock_wait:
-            await api.connect()
-            mock_start_ws.assert_called_once()
-            mock_wait.assert_awaited_once()
+async def test_wait_candle_close(connector):
+    with patch.object(connector.exchange, 'milliseconds', return_value=30000):
+        connector.on_message(_trade_message(connector, (1000, 100)))
+        waiter = asyncio.create_task(connector.wait_candle_close('1m', timeout=5))
+        await asyncio.sleep(0)
+        connector.on_message(_trade_message(connector, (60500, 101)))
+        assert await asyncio.wait_for(waiter, timeout=1) == [0, 100.0, 100.0, 100.0, 100.0, 1.0]
+
+        assert await connector.wait_candle_close('1m', timeout=0.01) is None
+
+        # Sem trades após o fim do período: fecha pelo relógio
+        connector.exchange.milliseconds.return_value = 120000 + CANDLE_CLOSE_GRACE_MS
+        assert (await connector.wait_candle_close('1m', timeout=1))[0] == 60000
 
 @pytest.mark.asyncio
-async def test_start_websocket(api, event_loop): # Adiciona event_loop
-    api_instance = await api # Aguarda a fixture api
-    with patch('threading.Thread') as mock_thread:
-        api.start_websocket()
-        mock_thread.assert_called_once()
+async def test_fetch_ohlcv_cached_uses_stream_after_seed(connector):
+    initial = _candles(1700000000000, 100)
+    connector.connected_event.set()
+    with patch.object(connector.exchange, 'milliseconds', return_value=initial[-1][0]), \
+        patch.object(connector.exchange, 'fetch_ohlcv', new_callable=AsyncMock) as mock_fetch:
+        mock_fetch.return_value = initial
+        buffer = await connector.fetch_ohlcv_cached(connector.settings.symbol, '1m')
+        assert buffer is connector.candle_builder.buffers['1m']
+
+        connector.on_message(_trade_message(connector, (initial[-1][0] + 60000, 321.0)))
+        buffer = await connector.fetch_ohlcv_cached(connector.settings.symbol, '1m')
+        assert mock_fetch.await_count == 1 # Sem nova chamada REST
+        assert buffer.column('close')[-1] == 321.0 and len(buffer) == 100
+
+        connector.feed.reconnects += 1 # Trades perdidos durante a reconexão: busca de novo
+        await connector.fetch_ohlcv_cached(connector.settings.symbol, '1m')
+        assert mock_fetch.await_count == 2
 
 @pytest.mark.asyncio
-async def test_run_websocket(api, event_loop): # Adiciona event_loop
-    api_instance = await api # Aguarda a fixture api
-    with patch('websocket.WebSocketApp') as mock_ws_app:
-        with patch.object(api, 'on_open'):
-            with patch.object(logger, 'error'):
-                try:
-                    api.run_websocket()
-                except Exception:
-                    pass # Expected exception due to mock setup
-                mock_ws_app.assert_called_once()
+async def test_get_current_price_from_stream(connector):
+    ticker_arg = connector.ticker_subscription(connector.settings.symbol)
+    connector.on_message(json.dumps({'action': 'snapshot', 'arg': ticker_arg, 'data': [{'instId': 'BTCUSDT', 'last': '30000.5', 'bestBid': '30000', 'bestAsk': '30001'}]}))
+    connector.on_message(_trade_message(connector, (2000, 30003), (1000, 29999)))
+    with patch.object(connector, 'fetch_ticker', new_callable=AsyncMock) as mock_fetch:
+        assert await connector.get_current_price(connector.settings.symbol) == 30003.0 # Trade mais recente
+        assert connector.price_cache.quote(connector.settings.symbol)['bid'] == 30000.0
+        mock_fetch.assert_not_awaited()
+
+        # Preço antigo ou símbolo sem stream: recorre à API REST
+        mock_fetch.return_value = {'last': 31000}
+        assert await connector.get_current_price(connector.settings.symbol, max_age=0) == 31000
+        assert await connector.get_current_price('ETH/USDT:USDT') == 31000
+        assert mock_fetch.await_count == 2
+
+@pytest.mark.asyncio
+async def test_stream_prices_subscribes_ticker(connector):
+    with patch.object(connector.feed, 'subscribe', new_callable=AsyncMock) as mock_subscribe:
+        await connector.stream_prices('ETH/USDT:USDT')
+        mock_subscribe.assert_awaited_once_with([{"instType": "mc", "channel": "ticker", "instId": "ETHUSDT"}])
+    connector.on_message(json.dumps({'arg': connector.ticker_subscription('ETH/USDT:USDT'), 'data': [{'last': '2000'}]}))
+    assert connector.price_cache.get('ETH/USDT:USDT') == 2000.0
+
+@pytest.mark.asyncio
+async def test_requests_go_through_rate_limiter(connector):
+    with patch.object(connector.rate_limiter, 'acquire', new_callable=AsyncMock) as mock_acquire, \
+        patch.object(connector.exchange, 'create_order', new_callable=AsyncMock, return_value={'id': '1'}), \
+        patch.object(connector.exchange, 'fetch_balance', new_callable=AsyncMock, return_value={'total': {}}):
+        await connector.create_order('BTC/USDT:USDT', 'buy', 1)
+        await connector.fetch_balance()
+        assert mock_acquire.await_args_list[0].args == ('create_order', PRIORITY_ORDER, 1)
+        assert mock_acquire.await_args_list[1].args == ('fetch_balance', PRIORITY_ACCOUNT, 1)
+    assert connector.exchange.enableRateLimit is False # Sem throttle duplicado do ccxt
+
+@pytest.mark.asyncio
+async def test_concurrent_balance_reads_are_coalesced(connector):
+    async def slow_balance():
+        await asyncio.sleep(0.01)
+        return {'total': {'USDT': 100.0}}
+
+    with patch.object(connector.exchange, 'fetch_balance', side_effect=slow_balance) as mock_balance, \
+        patch.object(connector.exchange, 'create_order', new_callable=AsyncMock, return_value={'id': '1'}):
+        balances = await asyncio.gather(*(connector.fetch_balance() for _ in range(4)))
+        assert mock_balance.call_count == 1 and balances[0] == balances[3]
+        await connector.fetch_balance() # Dentro do TTL
+        assert mock_balance.call_count == 1
+
+        await connector.create_order('BTC/USDT:USDT', 'buy', 1) # Invalida o saldo; ordens nunca são agrupadas
+        await connector.fetch_balance()
+        assert mock_balance.call_count == 2
+
+@pytest.mark.asyncio
+async def test_fetch_ticker_fails_fast_when_circuit_open(connector):
+    connector.resilience.breaker('fetch_ticker').state = 'open'
+    connector.resilience.breaker('fetch_ticker').opened_at = float('inf')
+    with patch.object(connector.exchange, 'fetch_ticker', new_callable=AsyncMock) as mock_fetch:
+        assert await connector.fetch_ticker('BTC/USDT:USDT') is None
+        mock_fetch.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_coalesced_reader_respects_own_deadline(connector):
+    async def slow_balance():
+        await asyncio.sleep(0.2)
+        return {'total': {'USDT': 1.0}}
+
+    with patch.object(connector.exchange, 'fetch_balance', side_effect=slow_balance):
+        first = asyncio.create_task(connector.fetch_balance())
+        await asyncio.sleep(0)
+        with deadline(0.02):
+            with pytest.raises(DeadlineExceeded):
+                await connector.fetch_balance()
+        assert (await first)['total']['USDT'] == 1.0 # A requisição compartilhada continua
+
+def test_on_message_dispatch_by_channel(connector):
+    connector.on_message(json.dumps({'arg': {'instType': 'mc', 'channel': 'books5', 'instId': 'BTCUSDT'}, 'data': [{}]})) # Canal sem tratador
+    connector.on_message(json.dumps({'arg': connector.trade_subscription('ETH/USDT:USDT'), 'data': [['1000', '2000', '1', 'buy']]})) # Outro contrato
+    assert len(connector.candle_builder.buffers['1m']) == 0
+
+    connector.on_message(_trade_message(connector, (1000, 100)).encode()) # O decodificador aceita bytes
+    assert connector.candle_builder.buffers['1m'].to_list() == [[0, 100.0, 100.0, 100.0, 100.0, 1.0]]
+    assert connector.price_cache.get(connector.settings.symbol) == 100.0
+
+@pytest.mark.asyncio
+async def test_order_book_from_depth_channel(connector):
+    arg = connector.books_subscription(connector.settings.symbol)
+    assert arg == {"instType": "mc", "channel": "books", "instId": "BTCUSDT"}
+    assert connector.get_order_book(connector.settings.symbol) is None # Sem snapshot
+
+    connector.on_message(json.dumps({'action': 'update', 'arg': arg, 'data': [{'bids': [['99', '1']], 'asks': []}]})) # Antes do snapshot
+    connector.on_message(json.dumps({'action': 'snapshot', 'arg': arg, 'data': [{'bids': [['100', '2']], 'asks': [['101', '3']], 'ts': '1'}]}))
+    connector.on_message(json.dumps({'action': 'update', 'arg': arg, 'data': [{'bids': [['100.5', '1']], 'asks': [], 'ts': '2'}]}))
+    book = connector.get_order_book(connector.settings.symbol)
+    assert book.best_bid() == (100.5, 1.0) and book.best_ask() == (101.0, 3.0)
+
+    with patch.object(connector.feed, 'unsubscribe', new_callable=AsyncMock) as mock_unsubscribe, \
+            patch.object(connector.feed, 'subscribe', new_callable=AsyncMock) as mock_subscribe:
+        connector.on_message(json.dumps({'action': 'update', 'arg': arg, 'data': [{'asks': [['101', '0']], 'checksum': 42}]}))
+        assert connector.get_order_book(connector.settings.symbol) is None
+        await asyncio.sleep(0)
+        mock_unsubscribe.assert_awaited_once_with([arg]) # Nova inscrição para receber outro snapshot
+        mock_subscribe.assert_awaited_once_with([arg])
+
+@pytest.mark.asyncio
+async def test_create_order_completes_after_cycle_deadline(connector):
+    async def slow_order(*args, **kwargs):
+        await asyncio.sleep(0.1) # Resposta da exchange chega depois do fim do prazo do ciclo
+        return {'id': '1'}
+
+    with patch.object(connector.exchange, 'create_order', side_effect=slow_order):
+        with deadline(0.02):
+            assert await connector.create_order(connector.settings.symbol, 'buy', 1) == {'id': '1'}
+    assert connector.resilience.breaker('create_order').failures == 0
@@ -0,0 +1,60 @@
+import pytest
+from unittest.mock import MagicMock
+from core.backtester import Backtester
+from core.backtest_cache import BacktestCache, strategy_fingerprint
+from core.strategy import TradingStrategy
+
+class OtherStrategy(TradingStrategy):
+    pass
+
+@pytest.fixture
+def cache(tmp_path):
+    return BacktestCache(tmp_path / 'cache.sqlite')
+
+def test_cached_run_returns_same_results(cache, settings_manager_factory, random_walk_ohlcv):
+    data = random_walk_ohlcv(400, seed=5)
+    first_bt = Backtester(data, settings_manager_factory(), cache=cache)
+    first = first_bt.run(vectorized=True)
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    second_bt = Backtester(data, settings_manager_factory(), cache=cache)
+    second_bt._run_vectorized = MagicMock(side_effect=AssertionError("não deveria recalcular"))
+    second = second_bt.run(vectorized=True)
+    assert cache.hits == 1
+    assert second == first
+    assert second_bt.results == first_bt.results
+
+def test_key_changes_with_data_settings_and_strategy(cache, settings_manager_factory, random_walk_ohlcv):
+    data = random_walk_ohlcv(200, seed=5)
+    key = cache.make_key(Backtester(data, settings_manager_factory()), TradingStrategy)
+    assert cache.make_key(Backtester(data, settings_manager_factory()), TradingStrategy) == key
+
+    changed_data = [row[:] for row in data]
+    changed_data[100][4] += 1.0
+    assert cache.make_key(Backtester(changed_data, settings_manager_factory()), TradingStrategy) != key
+    assert cache.make_key(Backtester(data, settings_manager_factory(rsi_buy=40)), TradingStrategy) != key
+    assert cache.make_key(Backtester(data, settings_manager_factory(), commission=0.001), TradingStrategy) != key
+    assert cache.make_key(Backtester(data, settings_manager_factory()), OtherStrategy) != key
+    assert strategy_fingerprint(OtherStrategy) != strategy_fingerprint(TradingStrategy)
+
+def test_streaming_entry_is_not_used_when_trades_are_needed(cache, settings_manager_factory, random_walk_ohlcv):
+    data = random_walk_ohlcv(400, seed=5)
+    Backtester(data, settings_manager_factory(), keep_trades=False, cache=cache).run(vectorized=True)
+    full_bt = Backtester(data, settings_manager_factory(), cache=cache)
+    full_bt.run(vectorized=True)
+    assert full_bt.results # Recalculado, pois a entrada anterior não tinha os trades
+    assert cache.get(cache.make_key(full_bt, TradingStrategy))[1] == full_bt.results
+
+def test_lru_eviction_respects_max_bytes(tmp_path):
+    cache = BacktestCache(tmp_path / 'cache.sqlite', max_bytes=2500)
+    metrics = {'total_trades': 1, 'net_profit': 1.0}
+    trades = [{'pnl': float(i)} for i in range(60)]
+    cache.put('a', metrics, trades)
+    cache.put('b', metrics, trades)
+    assert cache.get('a') is not None # 'a' passa a ser o mais recente
+    cache.put('c', metrics, trades)
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert cache.get('c') is not None
+    assert len(cache) == 2
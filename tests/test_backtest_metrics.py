@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+from core.backtester import Backtester
+from core.backtest_metrics import MetricsAccumulator, TradeSpill
+from core.strategy import TradingSignal
+
+@pytest.fixture
+def settings_manager(settings_manager_factory):
+    return settings_manager_factory()
+
+def _assert_same_metrics(actual, expected):
+    assert actual['total_trades'] == expected['total_trades']
+    for key in ('win_rate', 'net_profit', 'max_drawdown', 'profit_factor'):
+        assert actual[key] == pytest.approx(expected[key], rel=1e-9)
+
+def test_accumulator_matches_dataframe_metrics():
+    pnl = [100.0, -50.0, 200.0, -300.0, 25.0]
+    balance = list(10000 + np.cumsum(pnl))
+    single, batch = MetricsAccumulator(), MetricsAccumulator()
+    for p, b in zip(pnl, balance):
+        single.add(p, b)
+    batch.add_many(pnl[:2], balance[:2])
+    batch.add_many(pnl[2:], balance[2:])
+
+    expected = {
+        'total_trades': 5,
+        'win_rate': 60.0,
+        'net_profit': -25.0,
+        'max_drawdown': 300.0,
+        'profit_factor': 325.0 / 350.0
+    }
+    _assert_same_metrics(single.metrics(), expected)
+    _assert_same_metrics(batch.metrics(), expected)
+
+def test_accumulator_without_trades():
+    assert MetricsAccumulator().metrics()['total_trades'] == 0
+
+@pytest.mark.parametrize('vectorized', [False, True])
+def test_streaming_backtest_matches_full_results(settings_manager, vectorized, random_walk_ohlcv):
+    data = random_walk_ohlcv(500, seed=21)
+    full = Backtester(data, settings_manager).run(vectorized=vectorized)
+    streaming_bt = Backtester(data, settings_manager, keep_trades=False)
+    streaming = streaming_bt.run(vectorized=vectorized)
+
+    assert full['total_trades'] > 0
+    assert streaming_bt.results == []
+    _assert_same_metrics(streaming, full)
+
+def test_spill_writes_chunks(settings_manager, tmp_path, random_walk_ohlcv):
+    data = random_walk_ohlcv(500, seed=21)
+    reference = Backtester(data, settings_manager)
+    reference.run(vectorized=True)
+
+    spill_path = tmp_path / 'trades.csv'
+    bt = Backtester(data, settings_manager, keep_trades=False, spill_path=str(spill_path), spill_chunk_size=3)
+    bt.run(vectorized=True)
+    spilled = bt.spill.read()
+    expected = pd.DataFrame(reference.results)
+
+    assert len(spilled) == len(expected)
+    assert list(spilled['signal']) == [s.value for s in expected['signal']]
+    np.testing.assert_allclose(spilled['balance'], expected['balance'])
+
+def test_trade_spill_roundtrip(tmp_path):
+    spill = TradeSpill(tmp_path / 'trades.csv', chunk_size=2)
+    for i in range(5):
+        spill.append({'datetime': pd.Timestamp('2024-01-01') + pd.Timedelta(minutes=i),
+                      'signal': TradingSignal.STRONG_BUY, 'pnl': float(i), 'balance': 100.0 + i})
+    assert spill.rows_written == 4 # Último bloco ainda em memória
+    frame = spill.read()
+    assert len(frame) == 5
+    assert frame['signal'].unique().tolist() == ['strong_buy']
@@ -4,6 +4,8 @@ import numpy as np
 import asyncio
 from unittest.mock import MagicMock, patch
 from core.backtester import Backtester
+from core.order_book import OrderBook
+from core.strategy import TradingSignal
 from config.settings import Settings, SettingsManager
 
 # Dados de teste OHLCV
@@ -122,4 +124,37 @@ class TestBacktester:
 
         bt = Backtester(minimal_data, settings_instance) # Usa settings_instance
         bt.run()
-        assert bt.metrics['total_trades'] == 0  # sem sinais
\ No newline at end of file
+        assert bt.metrics['total_trades'] == 0  # sem sinais
+
+@pytest.fixture
+def settings_manager_stub(settings_manager_factory):
+    return settings_manager_factory()
+
+def test_vectorized_run_matches_loop(settings_manager_stub, random_walk_ohlcv):
+    """O modo vetorizado deve gerar exatamente os mesmos trades do loop por candle."""
+    data = random_walk_ohlcv(600, seed=3)
+    loop_bt = Backtester(data, settings_manager_stub)
+    loop_metrics = loop_bt.run()
+    vector_bt = Backtester(data, settings_manager_stub)
+    vector_metrics = vector_bt.run(vectorized=True)
+
+    assert loop_metrics['total_trades'] > 0
+    assert vector_metrics == loop_metrics
+    assert vector_bt.results == loop_bt.results
+
+def test_vectorized_run_without_signals(settings_manager_stub):
+    data = [[1625097600000 + i * 60000, 30000, 30000, 30000, 30000, 1000] for i in range(100)]
+    bt = Backtester(data, settings_manager_stub)
+    assert bt.run(vectorized=True)['total_trades'] == 0
+
+
+def test_depth_slippage_from_order_book(sample_ohlcv):
+    settings_manager = MagicMock()
+    settings_manager.settings = Settings(order_size=2)
+    book = OrderBook('BTC/USDT:USDT')
+    book.apply_snapshot({'bids': [['99', '1'], ['98', '5']], 'asks': [['101', '1'], ['103', '5']]})
+
+    bt = Backtester(sample_ohlcv, settings_manager, order_book=book)
+    assert bt.buy_slippage == pytest.approx(102 / 100 - 1) and bt.sell_slippage == pytest.approx(1 - 98.5 / 100)
+    assert bt._apply_slippage(100.0, TradingSignal.STRONG_BUY) == pytest.approx(102.0)
+    assert Backtester(sample_ohlcv, settings_manager).buy_slippage == 0.001 # Sem livro: slippage fixo
@@ -0,0 +1,56 @@
+import json
+import numpy as np
+from loguru import logger
+from benchmarks.run import compare, main
+from benchmarks.synthetic import synthetic_ohlcv, synthetic_trade_messages
+
+def test_synthetic_ohlcv_is_reproducible_and_consistent():
+    data = synthetic_ohlcv(1000, seed=7)
+    np.testing.assert_array_equal(data, synthetic_ohlcv(1000, seed=7))
+    assert not np.array_equal(data, synthetic_ohlcv(1000, seed=8))
+
+    timestamps, open_, high, low, close, volume = data.T
+    assert np.all(np.diff(timestamps) == 60000)
+    assert np.all(high >= np.maximum(open_, close))
+    assert np.all(low <= np.minimum(open_, close))
+    assert np.all(volume > 0)
+
+def test_synthetic_trade_messages_format():
+    messages = synthetic_trade_messages(10, seed=1)
+    assert messages == synthetic_trade_messages(10, seed=1)
+    trade = json.loads(messages[0])['data'][0]
+    assert len(trade) == 4 and trade[3] in ('buy', 'sell')
+
+def test_compare_flags_only_slower_results():
+    baseline = {'results': [{'name': 'a', 'size': 10, 'median': 1.0}, {'name': 'b', 'size': 10, 'median': 1.0}]}
+    current = {'results': [
+        {'name': 'a', 'size': 10, 'median': 1.5},
+        {'name': 'b', 'size': 10, 'median': 1.1},
+        {'name': 'c', 'size': 10, 'median': 9.0}, # Sem referência
+    ]}
+    regressions = compare(baseline, current, threshold=0.2)
+    assert [(r['name'], r['ratio']) for r in regressions] == [('a', 1.5)]
+
+def test_main_writes_json_report(tmp_path):
+    output = tmp_path / 'report.json'
+    assert main(['--only', 'on_message', '--repeat', '1', '--output', str(output)]) == 0
+    report = json.loads(output.read_text())
+    assert report['metadata']['seed'] == 42
+    [result] = report['results']
+    assert result['name'] == 'api_connector.on_message'
+    assert result['per_second'] > 0
+
+    baseline = tmp_path / 'baseline.json'
+    report['results'][0]['median'] = result['median'] / 1000 # Referência artificialmente rápida
+    baseline.write_text(json.dumps(report))
+    assert main(['--only', 'on_message', '--repeat', '1', '--output', str(output), '--baseline', str(baseline)]) == 1
+
+def test_main_keeps_caller_log_sinks(tmp_path):
+    messages = []
+    sink = logger.add(messages.append, level='INFO')
+    try:
+        main(['--only', 'on_message', '--repeat', '1', '--output', str(tmp_path / 'report.json')])
+        logger.info('depois do benchmark')
+    finally:
+        logger.remove(sink)
+    assert any('depois do benchmark' in message for message in messages)
@@ -0,0 +1,107 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_trade_messages
+from core.candle_builder import CandleBuilder
+
+MINUTE = 60000
+
+
+def _trade(ts, price, size=1.0, side='buy'):
+    return [str(ts), str(price), str(size), side]
+
+
+def test_aggregates_trades_and_emits_closed_candle():
+    builder = CandleBuilder(['1m'])
+    assert builder.add_trades([_trade(0, 100), _trade(1000, 105, 2), _trade(2000, 95), _trade(3000, 101)]) == []
+    assert builder.buffers['1m'].to_list() == [[0, 100.0, 105.0, 95.0, 101.0, 5.0]] # Candle em aberto visível
+
+    closed = builder.add_trades([_trade(MINUTE + 10, 102)])
+    assert closed == [('1m', [0, 100.0, 105.0, 95.0, 101.0, 5.0])]
+    assert builder.buffers['1m'].to_list()[-1] == [MINUTE, 102.0, 102.0, 102.0, 102.0, 1.0]
+
+
+def test_unsorted_batch_and_late_trades():
+    builder = CandleBuilder(['1m'])
+    builder.add_trades([_trade(MINUTE + 5, 110), _trade(MINUTE + 1, 100)]) # Snapshot do mais novo ao mais antigo
+    assert builder.buffers['1m'].to_list() == [[MINUTE, 100.0, 110.0, 100.0, 110.0, 2.0]]
+
+    assert builder.add_trades([_trade(10, 1)]) == [] # Candle anterior já passou
+    assert builder.late_trades == 1
+    assert len(builder.buffers['1m']) == 1
+
+
+def test_matches_pandas_resample_for_several_timeframes():
+    messages = synthetic_trade_messages(5000, seed=3)
+    builder = CandleBuilder(['1m', '5m'])
+    closed = []
+    for message in messages:
+        closed += builder.add_trades(json.loads(message)['data'])
+
+    trades = pd.DataFrame([json.loads(m)['data'][0] for m in messages], columns=['ts', 'price', 'size', 'side'])
+    trades.index = pd.to_datetime(trades['ts'].astype(np.int64), unit='ms')
+    trades = trades[['price', 'size']].astype(float)
+    for timeframe, rule in (('1m', '1min'), ('5m', '5min')):
+        expected = trades.resample(rule).agg({'price': ['first', 'max', 'min', 'last'], 'size': 'sum'}).dropna()
+        built = np.array(builder.buffers[timeframe].to_list())[-len(expected):]
+        np.testing.assert_allclose(built[:, 1:], expected.to_numpy())
+        emitted = [c for tf, c in closed if tf == timeframe]
+        assert len(emitted) == len(expected) - 1 # Todos exceto o candle em aberto
+        assert [c[0] for c in emitted] == list(built[:-1, 0])
+
+
+def test_close_elapsed_without_new_trades():
+    builder = CandleBuilder(['1m'])
+    builder.add_trades([_trade(1000, 100)])
+    assert builder.next_close('1m') == MINUTE
+    assert builder.close_elapsed(MINUTE - 1) == []
+    assert builder.close_elapsed(MINUTE) == [('1m', [0, 100.0, 100.0, 100.0, 100.0, 1.0])]
+    assert builder.next_close('1m') is None
+    assert builder.add_trades([_trade(MINUTE + 1, 101)]) == [] # Já emitido pelo relógio
+
+
+def test_seed_merges_rest_history_with_stream():
+    builder = CandleBuilder(['1m'], capacity=5)
+    builder.add_trades([_trade(2 * MINUTE + 1, 120), _trade(2 * MINUTE + 2, 90), _trade(3 * MINUTE, 99)])
+    history = [[i * MINUTE, 100.0, 101.0, 99.0, 100.5, 10.0] for i in range(3)] # Último em aberto na API
+
+    buffer = builder.seed('1m', history)
+    assert buffer is builder.buffers['1m']
+    assert buffer.to_list() == [
+        [0, 100.0, 101.0, 99.0, 100.5, 10.0],
+        [MINUTE, 100.0, 101.0, 99.0, 100.5, 10.0],
+        [2 * MINUTE, 100.0, 120.0, 90.0, 90.0, 10.0],
+        [3 * MINUTE, 99.0, 99.0, 99.0, 99.0, 1.0],
+    ]
+    closed = builder.add_trades([_trade(4 * MINUTE, 98)])
+    assert closed == [('1m', [3 * MINUTE, 99.0, 99.0, 99.0, 99.0, 1.0])]
+
+
+def test_vectorized_batches_match_python_loop(monkeypatch):
+    import core.candle_builder as candle_builder
+    rng = np.random.default_rng(7)
+    batches = []
+    ts = 0
+    for _ in range(40):
+        size = int(rng.integers(1, 300))
+        stamps = ts + np.cumsum(rng.integers(0, 400, size)) # Inclui timestamps repetidos
+        ts = int(stamps[-1])
+        stamps = stamps - rng.integers(0, 2, size) * 3 * MINUTE # Alguns trades atrasados
+        batch = [_trade(int(t), round(float(p), 1), round(float(s), 4)) for t, p, s in zip(stamps, 100 + rng.normal(0, 1, size).cumsum(), rng.random(size))]
+        rng.shuffle(batch)
+        batches.append(batch)
+
+    results = []
+    for threshold in (10**9, 1): # Só o laço Python, depois só a agregação vetorizada
+        monkeypatch.setattr(candle_builder, 'VECTOR_BATCH_MIN', threshold)
+        builder = CandleBuilder(['1m', '5m'], capacity=500)
+        closed = [builder.add_trades(batch) for batch in batches]
+        results.append((closed, {tf: builder.buffers[tf].to_list() for tf in builder.timeframes}, builder.late_trades, builder.last_trade))
+
+    (loop_closed, loop_buffers, loop_late, loop_last), (vec_closed, vec_buffers, vec_late, vec_last) = results
+    assert loop_late > 0 and vec_late == loop_late and vec_last == loop_last
+    for timeframe in loop_buffers:
+        np.testing.assert_allclose(vec_buffers[timeframe], loop_buffers[timeframe])
+    assert [[(tf, c[0]) for tf, c in batch] for batch in vec_closed] == [[(tf, c[0]) for tf, c in batch] for batch in loop_closed]
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from config.settings import Settings
+from core.backtester import Backtester
+from core.candle_store import CandleStore
+
+SYMBOL = 'BTC/USDT:USDT'
+
+@pytest.fixture
+def sample_ohlcv():
+    rng = np.random.default_rng(9)
+    close = 30000 + np.cumsum(rng.normal(0, 40, 500))
+    return [[1700000000000 + i * 60000, c, c + 10, c - 10, c, 1.0] for i, c in enumerate(close)]
+
+@pytest.fixture
+def store(tmp_path):
+    return CandleStore(tmp_path / 'candles')
+
+def test_append_and_load(store, sample_ohlcv):
+    assert store.append(SYMBOL, '1m', sample_ohlcv[:300]) == 300
+    assert store.append(SYMBOL, '1m', sample_ohlcv[250:]) == 200 # Sobreposição ignorada
+    assert store.count(SYMBOL, '1m') == 500
+    assert store.last_timestamp(SYMBOL, '1m') == sample_ohlcv[-1][0]
+
+    columns = store.load(SYMBOL, '1m')
+    assert isinstance(columns['close'], np.memmap)
+    np.testing.assert_array_equal(columns['timestamp'], [c[0] for c in sample_ohlcv])
+    np.testing.assert_array_equal(columns['close'], [c[4] for c in sample_ohlcv])
+
+def test_load_time_range(store, sample_ohlcv):
+    store.append(SYMBOL, '1m', sample_ohlcv)
+    start, end = sample_ohlcv[100][0], sample_ohlcv[200][0]
+    columns = store.load(SYMBOL, '1m', start=start, end=end, columns=['timestamp', 'close'])
+    assert set(columns) == {'timestamp', 'close'}
+    assert len(columns['timestamp']) == 100
+    assert columns['timestamp'][0] == start
+    assert columns['timestamp'][-1] == sample_ohlcv[199][0]
+
+def test_empty_and_invalid(store):
+    assert store.count(SYMBOL, '1h') == 0
+    assert len(store.load(SYMBOL, '1h')['close']) == 0
+    with pytest.raises(ValueError):
+        store.append(SYMBOL, '1h', [[1, 2, 3]])
+
+def test_recovers_from_partial_write(store, sample_ohlcv):
+    """Bytes extras de uma gravação interrompida não desalinham as colunas."""
+    store.append(SYMBOL, '1m', sample_ohlcv[:10])
+    with open(store.path(SYMBOL, '1m') / 'close.bin', 'ab') as f:
+        f.write(b'\x00' * 12)
+    store.append(SYMBOL, '1m', sample_ohlcv[10:20])
+    columns = store.load(SYMBOL, '1m')
+    np.testing.assert_array_equal(columns['close'], [c[4] for c in sample_ohlcv[:20]])
+
+def test_backtester_from_store(store, sample_ohlcv):
+    """O backtester sobre colunas mapeadas deve dar o mesmo resultado da lista em memória."""
+    store.append(SYMBOL, '1m', sample_ohlcv)
+    settings_manager = MagicMock()
+    settings_manager.load = AsyncMock()
+    settings_manager.settings = Settings(rsi_buy=45, rsi_sell=55)
+
+    columns = store.load(SYMBOL, '1m')
+    assert np.shares_memory(Backtester(columns, settings_manager).data['close'].to_numpy(), columns['close'])
+
+    from_store = Backtester.from_store(store, SYMBOL, '1m', settings_manager)
+    from_list = Backtester(sample_ohlcv, settings_manager)
+    assert from_store.run(vectorized=True) == from_list.run(vectorized=True)
+    assert from_store.results == from_list.results
@@ -0,0 +1,38 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from benchmarks.synthetic import synthetic_ohlcv
+from config.settings import Settings
+from core.backtester import Backtester
+from core.chunked_backtest import ChunkedBacktest, default_warmup
+
+@pytest.fixture
+def settings_manager():
+    manager = MagicMock()
+    manager.load = AsyncMock()
+    manager.settings = Settings(rsi_buy=45, rsi_sell=55, take_profit_percent=0.5, stop_loss_percent=0.5)
+    return manager
+
+def test_boundaries_cover_series_with_overlap(settings_manager):
+    backtester = Backtester(synthetic_ohlcv(1000), settings_manager)
+    chunked = ChunkedBacktest(backtester, chunks=4, warmup=100, max_workers=1)
+    bounds = chunked.boundaries()
+    assert bounds[0] == (0, 0, 250)
+    assert bounds[1] == (150, 250, 500)
+    assert [b[1] for b in bounds[1:]] == [b[2] for b in bounds[:-1]]
+    assert bounds[-1][2] == 1000
+    assert default_warmup(settings_manager.settings) == 50 * 26
+
+def test_chunked_run_matches_serial(settings_manager):
+    data = synthetic_ohlcv(20000, seed=11)
+    serial = Backtester(data, settings_manager)
+    expected = serial.run(vectorized=True)
+
+    backtester = Backtester(data, settings_manager)
+    metrics = ChunkedBacktest(backtester, chunks=5, max_workers=2).run()
+
+    assert expected['total_trades'] > 0
+    assert metrics['total_trades'] == expected['total_trades']
+    for key in ('win_rate', 'net_profit', 'max_drawdown', 'profit_factor'):
+        assert metrics[key] == pytest.approx(expected[key], rel=1e-9)
+    assert [t['datetime'] for t in backtester.results] == [t['datetime'] for t in serial.results]
+    assert backtester.results[-1]['balance'] == pytest.approx(serial.results[-1]['balance'], rel=1e-12)
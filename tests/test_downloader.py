@@ -0,0 +1,104 @@
+import asyncio
+import ccxt.async_support as ccxt_async
+import pytest
+from core.candle_store import CandleStore
+from core.downloader import HistoricalDownloader
+from core.rate_limiter import RateLimitScheduler
+
+START = 1699999980000 # Alinhado ao minuto
+MINUTE = 60000
+
+class FakeExchange:
+    """Exchange offline: candles de 1m contínuos a partir de START."""
+
+    def __init__(self, listed_since=START, fail_on_call=None, error=ccxt_async.NetworkError):
+        self.listed_since = listed_since
+        self.fail_on_call = fail_on_call
+        self.error = error
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+
+    async def fetch_ohlcv(self, symbol, timeframe, since=None, limit=100):
+        self.calls.append((symbol, timeframe, since))
+        if self.fail_on_call is not None and len(self.calls) == self.fail_on_call:
+            raise self.error("falha simulada")
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.001)
+        self.active -= 1
+        first = max(since, self.listed_since)
+        first += (-first) % MINUTE
+        return [[first + i * MINUTE, 1.0, 2.0, 0.5, 1.5, 10.0] for i in range(limit)]
+
+@pytest.fixture
+def store(tmp_path):
+    return CandleStore(tmp_path / 'candles')
+
+@pytest.mark.asyncio
+async def test_download_multiple_series(store, tmp_path):
+    exchange = FakeExchange()
+    downloader = HistoricalDownloader(
+        exchange, store, tmp_path / 'checkpoint.json',
+        max_concurrency=2, requests_per_second=0, page_limit=50
+    )
+    until = START + 500 * MINUTE
+    written = await downloader.download(['BTC/USDT:USDT', 'ETH/USDT:USDT', 'SOL/USDT:USDT'], ['1m'], START, until)
+
+    assert all(count == 500 for count in written.values())
+    assert exchange.max_active <= 2
+    report = downloader.verify('ETH/USDT:USDT', '1m')
+    assert report == {'candles': 500, 'duplicates': 0, 'out_of_order': 0, 'gaps': []}
+    assert downloader.reports[('ETH/USDT:USDT', '1m')] == report # Verificado ao fim de cada série
+    assert len(downloader.reports) == 3
+
+@pytest.mark.asyncio
+async def test_resume_after_interruption(store, tmp_path):
+    checkpoint = tmp_path / 'checkpoint.json'
+    until = START + 300 * MINUTE
+    failing = FakeExchange(fail_on_call=4, error=ccxt_async.ExchangeError)
+    with pytest.raises(ccxt_async.ExchangeError):
+        await HistoricalDownloader(failing, store, checkpoint, requests_per_second=0, page_limit=50).download(
+            ['BTC/USDT:USDT'], ['1m'], START, until
+        )
+    assert store.count('BTC/USDT:USDT', '1m') == 150
+
+    exchange = FakeExchange()
+    downloader = HistoricalDownloader(exchange, store, checkpoint, requests_per_second=0, page_limit=50)
+    written = await downloader.download(['BTC/USDT:USDT'], ['1m'], START, until)
+    assert written[('BTC/USDT:USDT', '1m')] == 150
+    assert exchange.calls[0][2] == START + 150 * MINUTE # Retoma de onde parou
+    assert downloader.verify('BTC/USDT:USDT', '1m')['candles'] == 300
+
+@pytest.mark.asyncio
+async def test_skips_range_before_listing(store, tmp_path):
+    exchange = FakeExchange(listed_since=START + 120 * MINUTE)
+    downloader = HistoricalDownloader(exchange, store, tmp_path / 'checkpoint.json', requests_per_second=0, page_limit=50)
+    await downloader.download(['NEW/USDT:USDT'], ['1m'], START, START + 200 * MINUTE)
+    columns = store.load('NEW/USDT:USDT', '1m')
+    assert columns['timestamp'][0] == START + 120 * MINUTE
+    assert downloader.verify('NEW/USDT:USDT', '1m')['candles'] == 80
+
+@pytest.mark.asyncio
+async def test_retries_network_errors(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(HistoricalDownloader._fetch_page.retry, 'sleep', lambda _: asyncio.sleep(0))
+    exchange = FakeExchange(fail_on_call=1)
+    downloader = HistoricalDownloader(exchange, store, tmp_path / 'checkpoint.json', requests_per_second=0, page_limit=50)
+    written = await downloader.download(['BTC/USDT:USDT'], ['1m'], START, START + 100 * MINUTE)
+    assert written[('BTC/USDT:USDT', '1m')] == 100
+
+def test_verify_reports_gaps(store, tmp_path):
+    candles = [[START + i * MINUTE, 1.0, 2.0, 0.5, 1.5, 10.0] for i in range(10) if i not in (4, 5)]
+    store.append('BTC/USDT:USDT', '1m', candles)
+    downloader = HistoricalDownloader(FakeExchange(), store, tmp_path / 'checkpoint.json')
+    assert downloader.verify('BTC/USDT:USDT', '1m')['gaps'] == [(START + 3 * MINUTE, START + 6 * MINUTE)]
+
+@pytest.mark.asyncio
+async def test_download_through_shared_rate_limiter(store, tmp_path):
+    scheduler = RateLimitScheduler(limits={'default': 1000}, global_rate=None)
+    downloader = HistoricalDownloader(
+        FakeExchange(), store, tmp_path / 'checkpoint.json', page_limit=50, rate_limiter=scheduler
+    )
+    written = await downloader.download(['BTC/USDT:USDT'], ['1m'], START, START + 200 * MINUTE)
+    assert written[('BTC/USDT:USDT', '1m')] == 200
+    assert 'fetch_ohlcv' in scheduler.buckets
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+from config.settings import Settings
+from core.indicators import IncrementalIndicators
+from core.strategy import TradingStrategy, TradingSignal
+
+@pytest.fixture
+def sample_ohlcv():
+    """Passeio aleatório com um trecho lateral (ganhos e perdas zerados)."""
+    rng = np.random.default_rng(42)
+    closes = np.round(30000 + np.cumsum(rng.normal(0, 50, 500)), 1)
+    closes[200:240] = closes[200]
+    return [
+        [1700000000000 + i * 60000, c, c + 5, c - 5, c, 10.0]
+        for i, c in enumerate(closes)
+    ]
+
+def test_matches_pandas_indicators(sample_ohlcv):
+    """Valores incrementais devem ser idênticos aos calculados pelo pandas."""
+    strategy = TradingStrategy(sample_ohlcv, Settings())
+    indicators = IncrementalIndicators(history=len(sample_ohlcv))
+    for candle in sample_ohlcv:
+        indicators.update(candle)
+
+    np.testing.assert_array_equal(indicators.series('rsi'), strategy.rsi.values)
+    np.testing.assert_array_equal(indicators.series('macd'), strategy.macd_line.values)
+    np.testing.assert_array_equal(indicators.series('signal'), strategy.signal_line.values)
+    np.testing.assert_array_equal(indicators.series('histogram'), strategy.macd_histogram.values)
+
+def test_revision_of_open_candle(sample_ohlcv):
+    """Revisar o candle em aberto não deve deixar resíduo no estado."""
+    indicators = IncrementalIndicators(history=len(sample_ohlcv))
+    for candle in sample_ohlcv:
+        provisional = list(candle)
+        provisional[4] = candle[4] * 1.01
+        indicators.update(provisional)
+        indicators.update(candle)
+
+    reference = IncrementalIndicators(history=len(sample_ohlcv))
+    for candle in sample_ohlcv:
+        reference.update(candle)
+
+    assert len(indicators) == len(sample_ohlcv)
+    np.testing.assert_array_equal(indicators.series('rsi'), reference.series('rsi'))
+    np.testing.assert_array_equal(indicators.series('signal'), reference.series('signal'))
+
+def test_sync_processes_only_new_candles(sample_ohlcv):
+    indicators = IncrementalIndicators()
+    assert indicators.sync(sample_ohlcv[:100]) == 100
+    assert indicators.sync(sample_ohlcv[2:102]) == 3 # Último revisado + 2 novos
+    assert indicators.last_timestamp == sample_ohlcv[101][0]
+    assert len(indicators.series('close')) == 100
+
+def test_out_of_order_candle(sample_ohlcv):
+    indicators = IncrementalIndicators()
+    indicators.update(sample_ohlcv[1])
+    with pytest.raises(ValueError):
+        indicators.update(sample_ohlcv[0])
+
+def test_strategy_from_indicators(sample_ohlcv):
+    """A estratégia sobre o motor incremental gera o mesmo sinal da versão com DataFrame."""
+    settings = Settings()
+    indicators = IncrementalIndicators()
+    for end in range(30, len(sample_ohlcv)):
+        window = sample_ohlcv[max(0, end - 100):end]
+        indicators.sync(window)
+        expected = TradingStrategy(sample_ohlcv[:end], settings)
+        strategy = TradingStrategy.from_indicators(indicators, settings)
+        assert strategy.signal == expected.signal
+        assert strategy.stop_loss_price == expected.stop_loss_price
+    assert strategy.close_price == sample_ohlcv[end - 1][4]
+
+def test_strategy_from_indicators_insufficient_data(sample_ohlcv):
+    indicators = IncrementalIndicators()
+    indicators.sync(sample_ohlcv[:10])
+    strategy = TradingStrategy.from_indicators(indicators, Settings())
+    assert strategy.signal == TradingSignal.HOLD
+    assert strategy.stop_loss_price == 0.0
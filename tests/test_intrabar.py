@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from config.settings import Settings
+from core.intrabar import IntrabarBacktester, bar_offsets
+from core.order_book import OrderBook
+from core.strategy import TradingSignal
+
+HOUR, MINUTE = 3600000, 60000
+START = 1700002800000 # Alinhado à hora
+
+def _flat_data(bars=40, price=100.0):
+    """Barras de 1h e sub-candles de 1m com preço constante."""
+    parent = np.array([[START + i * HOUR, price, price, price, price, 1.0] for i in range(bars)])
+    child = np.array([[START + i * MINUTE, price, price, price, price, 1.0] for i in range(bars * 60)])
+    return parent, child
+
+def _move(parent, child, minute, high=None, low=None, open_=None):
+    """Altera um sub-candle e mantém a barra principal coerente."""
+    bar = minute // 60
+    if high is not None:
+        child[minute, 2] = high
+        parent[bar, 2] = max(parent[bar, 2], high)
+    if low is not None:
+        child[minute, 3] = low
+        parent[bar, 3] = min(parent[bar, 3], low)
+    if open_ is not None:
+        child[minute, 1] = open_
+
+@pytest.fixture
+def settings_manager():
+    manager = MagicMock()
+    manager.load = AsyncMock()
+    manager.settings = Settings(take_profit_percent=1.0, stop_loss_percent=1.0, order_size=1.0)
+    return manager
+
+def _signals(bars, **at):
+    signals = np.zeros(bars, dtype=np.int8)
+    for bar, code in at.items():
+        signals[int(bar[1:])] = code
+    return signals
+
+def test_bar_offsets():
+    offsets = bar_offsets([0, 100, 200], [0, 50, 100, 150, 160, 200, 250, 300], 100)
+    assert offsets.tolist() == [0, 2, 5, 7]
+
+def test_stop_loss_first_inside_bar(settings_manager):
+    parent, child = _flat_data()
+    # Barra 36: stop loss no minuto 10 e take profit no minuto 40
+    _move(parent, child, 36 * 60 + 10, low=98.5)
+    _move(parent, child, 36 * 60 + 40, high=101.5)
+    backtester = IntrabarBacktester(parent, child, settings_manager, slippage=0, commission=0)
+    metrics = backtester.run(signals=_signals(40, b35=1))
+
+    [trade] = backtester.results
+    assert trade['signal'] == TradingSignal.STRONG_BUY
+    assert trade['exit_reason'] == 'stop_loss'
+    assert trade['exit_price'] == pytest.approx(99.0)
+    assert trade['exit_datetime'] == np.datetime64(START + (36 * 60 + 10) * MINUTE, 'ms')
+    assert metrics['net_profit'] == pytest.approx(-1.0)
+
+def test_position_stays_open_across_bars(settings_manager):
+    parent, child = _flat_data()
+    _move(parent, child, 38 * 60 + 5, low=98.0) # Venda: take profit duas barras depois da entrada
+    backtester = IntrabarBacktester(parent, child, settings_manager, timeframe='1h', slippage=0, commission=0)
+    backtester.run(signals=_signals(40, b35=-1, b36=1, b37=1))
+
+    [trade] = backtester.results # Sinais com posição aberta são ignorados
+    assert trade['exit_reason'] == 'take_profit'
+    assert trade['exit_price'] == pytest.approx(99.0)
+    assert trade['pnl'] == pytest.approx(1.0)
+
+def test_gap_fills_at_open_and_open_position_closes_at_end(settings_manager):
+    parent, child = _flat_data()
+    _move(parent, child, 36 * 60, low=95.0, open_=96.0) # Abre abaixo do stop loss
+    backtester = IntrabarBacktester(parent, child, settings_manager, slippage=0, commission=0)
+    backtester.run(signals=_signals(40, b35=1, b37=1))
+
+    first, second = backtester.results
+    assert (first['exit_reason'], first['exit_price']) == ('stop_loss', pytest.approx(96.0))
+    assert (second['exit_reason'], second['exit_price']) == ('end', pytest.approx(100.0))
+
+def test_signal_skipped_when_entry_bar_has_no_sub_candles(settings_manager):
+    parent, child = _flat_data()
+    child = np.delete(child, np.s_[33 * 60:35 * 60], axis=0) # Barras 33 e 34 sem sub-candles
+    backtester = IntrabarBacktester(parent, child, settings_manager, timeframe='1h', slippage=0, commission=0)
+    backtester.run(signals=_signals(40, b32=1, b34=-1))
+
+    [trade] = backtester.results # A compra da barra 32 não entra na barra 35
+    assert trade['signal'] == TradingSignal.STRONG_SELL
+    assert trade['exit_reason'] == 'end'
+    assert backtester.skipped_signals == 1
+
+    _, full_child = _flat_data()
+    late = IntrabarBacktester(parent, full_child[36 * 60:], settings_manager, timeframe='1h') # Sub-candles só a partir da barra 36
+    late.run(signals=_signals(40, b33=1))
+    assert late.results == [] and late.skipped_signals == 1
+
+def test_invalid_lower_timeframe_data(settings_manager):
+    parent, _ = _flat_data()
+    with pytest.raises(ValueError):
+        IntrabarBacktester(parent, [], settings_manager)
+    with pytest.raises(ValueError):
+        IntrabarBacktester(parent, parent, settings_manager, both_hit='close')
+
+def test_entry_uses_order_book_slippage(settings_manager):
+    parent, child = _flat_data()
+    book = OrderBook('BTC/USDT:USDT')
+    book.apply_snapshot({'bids': [['99', '100']], 'asks': [['101', '100']]}) # Impacto de 1% para qualquer lado
+    backtester = IntrabarBacktester(parent, child, settings_manager, slippage=0, commission=0, order_book=book)
+    backtester.run(signals=_signals(40, b35=1))
+
+    [trade] = backtester.results
+    assert trade['entry_price'] == pytest.approx(101.0) # Abertura de 100 mais 1% de impacto
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from config.settings import Settings
+from core.backtester import Backtester
+from core.indicators import macd_series, rsi_series
+from core.kernels import macd_matrix, rsi_matrix, signal_matrix
+from core.strategy import TradingStrategy
+
+@pytest.fixture
+def closes():
+    rng = np.random.default_rng(5)
+    return 30000 + np.cumsum(rng.normal(0, 40, 1000))
+
+def test_rsi_matrix(closes):
+    periods = [7, 14, 14, 21]
+    rsi = rsi_matrix(closes, periods)
+    assert rsi.shape == (4, len(closes))
+    for row, period in zip(rsi, periods):
+        np.testing.assert_array_equal(row, rsi_series(pd.Series(closes), period).to_numpy())
+
+def test_macd_matrix(closes):
+    fast, slow, signal = [8, 12, 12], [26, 26, 30], 9 # signal por broadcasting
+    result = macd_matrix(closes, fast, slow, signal)
+    assert result['macd'].shape == (3, len(closes))
+    for i in range(3):
+        macd_line, signal_line, histogram = macd_series(pd.Series(closes), fast[i], slow[i], 9)
+        np.testing.assert_array_equal(result['macd'][i], macd_line.to_numpy())
+        np.testing.assert_array_equal(result['signal'][i], signal_line.to_numpy())
+        np.testing.assert_array_equal(result['histogram'][i], histogram.to_numpy())
+
+def test_signal_matrix_matches_strategy(closes):
+    """Cada linha deve ser idêntica aos sinais vetorizados da estratégia."""
+    rsi_buy = np.array([35, 45, 45, 50])
+    rsi_sell = np.array([65, 55, 55, 50])
+    fast = np.array([12, 12, 8, 10])
+    grid = signal_matrix(closes, rsi_buy, rsi_sell, macd_fast=fast)
+    assert grid['signals'].shape == (4, len(closes))
+    assert (grid['signals'] != 0).any()
+    for i in range(4):
+        settings = Settings(rsi_buy=int(rsi_buy[i]), rsi_sell=int(rsi_sell[i]), macd_fast=int(fast[i]))
+        np.testing.assert_array_equal(grid['signals'][i], TradingStrategy.vectorized_signals(closes, settings))
+
+def test_backtester_accepts_precomputed_signals(closes):
+    settings_manager = MagicMock()
+    settings_manager.load = AsyncMock()
+    settings_manager.settings = Settings(rsi_buy=45, rsi_sell=55)
+    ohlcv = [[1700000000000 + i * 60000, c, c * 1.001, c * 0.999, c, 1.0] for i, c in enumerate(closes)]
+    grid = signal_matrix(closes, [45], [55])
+
+    expected = Backtester(ohlcv, settings_manager).run(vectorized=True)
+    assert Backtester(ohlcv, settings_manager).run(signals=grid['signals'][0]) == expected
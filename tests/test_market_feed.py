@@ -0,0 +1,171 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+from aiohttp import web
+
+from core.market_feed import MarketDataFeed
+
+TRADE_ARG = {"instType": "mc", "channel": "trade", "instId": "BTCUSDT"}
+
+
+class FakeBitget:
+    """Servidor WebSocket local que registra inscrições e responde ao ping."""
+
+    def __init__(self, answer_ping=True):
+        self.answer_ping = answer_ping
+        self.received = []
+        self.connections = []
+
+    async def handler(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections.append(ws)
+        async for msg in ws:
+            if msg.data == 'ping':
+                self.received.append('ping')
+                if self.answer_ping:
+                    await ws.send_str('pong')
+            else:
+                self.received.append(json.loads(msg.data))
+        return ws
+
+    def subscriptions(self):
+        return [m for m in self.received if isinstance(m, dict) and m['op'] == 'subscribe']
+
+
+@asynccontextmanager
+async def fake_server():
+    fake = FakeBitget()
+    app = web.Application()
+    app.router.add_get('/ws', fake.handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        yield fake, f"http://127.0.0.1:{port}/ws"
+    finally:
+        await runner.cleanup()
+
+
+async def _wait_for(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condição não atingida"
+        await asyncio.sleep(0.01)
+
+
+async def _start(feed):
+    task = asyncio.create_task(feed.run())
+    await asyncio.wait_for(feed.connected.wait(), timeout=2)
+    return task
+
+
+async def _stop(feed, task):
+    await feed.close()
+    await asyncio.wait_for(task, timeout=2)
+
+
+@pytest.mark.asyncio
+async def test_subscribes_and_delivers_messages():
+    async with fake_server() as (fake, url):
+        feed = MarketDataFeed(url, subscriptions=[TRADE_ARG])
+        task = await _start(feed)
+        await _wait_for(lambda: fake.subscriptions())
+        assert fake.subscriptions()[0]['args'] == [TRADE_ARG]
+
+        await fake.connections[0].send_str('{"data": [1]}')
+        message = await asyncio.wait_for(feed.__aiter__().__anext__(), timeout=2)
+        assert message == '{"data": [1]}'
+        await _stop(feed, task)
+
+
+@pytest.mark.asyncio
+async def test_resubscribes_after_reconnect():
+    async with fake_server() as (fake, url):
+        feed = MarketDataFeed(url, subscriptions=[TRADE_ARG], reconnect_delay=0.01)
+        task = await _start(feed)
+        other = {"instType": "mc", "channel": "trade", "instId": "ETHUSDT"}
+        await feed.subscribe([other])
+        await _wait_for(lambda: len(fake.subscriptions()) == 2)
+
+        await fake.connections[0].close() # Servidor derruba a conexão
+        await _wait_for(lambda: len(fake.connections) == 2 and len(fake.subscriptions()) == 3)
+        assert fake.subscriptions()[-1]['args'] == [TRADE_ARG, other]
+        assert feed.reconnects == 1
+        await _stop(feed, task)
+
+
+@pytest.mark.asyncio
+async def test_reconnects_after_unexpected_error():
+    async with fake_server() as (fake, url):
+        feed = MarketDataFeed(url, subscriptions=[TRADE_ARG], reconnect_delay=0.01)
+        on_connected = feed._on_connected
+        failures = [RuntimeError('bug no consumidor')]
+
+        async def flaky():
+            if failures:
+                raise failures.pop()
+            await on_connected()
+
+        feed._on_connected = flaky
+        task = await _start(feed)
+        assert feed.reconnects == 1 and not task.done() # O feed continua após o erro
+        await _stop(feed, task)
+
+
+@pytest.mark.asyncio
+async def test_keepalive_ping_and_missing_pong():
+    async with fake_server() as (fake, url):
+        feed = MarketDataFeed(url, ping_interval=0.05, pong_timeout=0.05, reconnect_delay=0.01)
+        task = await _start(feed)
+        await _wait_for(lambda: fake.received.count('ping') >= 2)
+        assert len(fake.connections) == 1 # Pong respondido: conexão mantida
+
+        fake.answer_ping = False
+        await _wait_for(lambda: len(fake.connections) == 2) # Sem pong: reconecta
+        await _stop(feed, task)
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest_when_queue_is_full():
+    feed = MarketDataFeed(queue_size=2)
+    for message in ('a', 'b', 'c'):
+        await feed._enqueue(message)
+    assert feed.dropped_messages == 1
+    assert [feed.queue.get_nowait() for _ in range(2)] == ['b', 'c']
+
+
+@pytest.mark.asyncio
+async def test_block_applies_backpressure():
+    feed = MarketDataFeed(queue_size=1, overflow='block')
+    await feed._enqueue('a')
+    pending = asyncio.create_task(feed._enqueue('b'))
+    await asyncio.sleep(0.01)
+    assert not pending.done() # Leitura do socket suspensa até o consumidor liberar espaço
+    assert feed.queue.get_nowait() == 'a'
+    await asyncio.wait_for(pending, timeout=1)
+    assert feed.queue.get_nowait() == 'b' and feed.dropped_messages == 0
+
+
+def test_invalid_overflow_policy():
+    with pytest.raises(ValueError):
+        MarketDataFeed(overflow='ignore')
+
+
+@pytest.mark.asyncio
+async def test_get_batch_drains_queued_messages():
+    feed = MarketDataFeed()
+    for message in ('a', 'b', 'c'):
+        await feed._enqueue(message)
+    assert await feed.get_batch(max_messages=2) == ['a', 'b']
+    assert await feed.get_batch() == ['c']
+
+    waiter = asyncio.create_task(feed.get_batch())
+    await asyncio.sleep(0.01)
+    assert not waiter.done() # Fila vazia: aguarda a próxima mensagem
+    await feed._enqueue('d')
+    assert await asyncio.wait_for(waiter, timeout=1) == ['d']
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from benchmarks.synthetic import synthetic_ohlcv
+from config.settings import Settings
+from core.backtester import Backtester
+from core.monte_carlo import monte_carlo, trade_pnl
+
+PNL = np.array([120.0, -80.0, 45.0, -300.0, 210.0, -15.0, 60.0, -95.0])
+
+def _reference(samples, initial_balance, ruin_level):
+    """Cálculo simulação a simulação, para comparar com a versão matricial."""
+    finals, drawdowns, ruined = [], [], []
+    for row in samples:
+        balance, peak, drawdown, ruin = initial_balance, -np.inf, 0.0, False
+        for pnl in row:
+            balance += pnl
+            peak = max(peak, balance)
+            drawdown = max(drawdown, peak - balance)
+            ruin = ruin or balance <= ruin_level
+        finals.append(balance)
+        drawdowns.append(drawdown)
+        ruined.append(ruin)
+    return np.array(finals), np.array(drawdowns), np.mean(ruined)
+
+def test_bootstrap_matches_reference_loop():
+    result = monte_carlo(PNL, initial_balance=500, simulations=2000, ruin_fraction=0.5, seed=3)
+    rng = np.random.default_rng(3)
+    samples = PNL[rng.integers(0, len(PNL), size=(2000, len(PNL)))]
+    finals, drawdowns, risk = _reference(samples, 500, 250)
+
+    np.testing.assert_allclose(result['samples']['final_balance'], finals)
+    np.testing.assert_allclose(result['samples']['max_drawdown'], drawdowns)
+    assert result['risk_of_ruin'] == pytest.approx(risk)
+    assert result['final_balance']['p50'] == pytest.approx(np.median(finals))
+
+def test_shuffle_keeps_final_balance():
+    result = monte_carlo(PNL, initial_balance=1000, simulations=500, method='shuffle', seed=1)
+    np.testing.assert_allclose(result['samples']['final_balance'], 1000 + PNL.sum())
+    assert result['max_drawdown']['p5'] >= 0
+    assert result['max_drawdown']['p95'] <= 300 + 95 + 80 + 15
+
+def test_risk_of_ruin_extremes():
+    assert monte_carlo([10.0, 5.0], simulations=100, seed=0)['risk_of_ruin'] == 0.0
+    assert monte_carlo([-6000.0], simulations=100, seed=0)['risk_of_ruin'] == 1.0
+
+def test_invalid_inputs():
+    with pytest.raises(ValueError):
+        monte_carlo([], simulations=10)
+    with pytest.raises(ValueError):
+        monte_carlo(PNL, method='jackknife')
+    with pytest.raises(ValueError):
+        monte_carlo(PNL, simulations=0)
+
+def test_trade_pnl_from_backtester(tmp_path):
+    manager = MagicMock()
+    manager.load = AsyncMock()
+    manager.settings = Settings(rsi_buy=45, rsi_sell=55, take_profit_percent=0.5, stop_loss_percent=0.5)
+    data = synthetic_ohlcv(3000, seed=4)
+
+    backtester = Backtester(data, manager)
+    backtester.run(vectorized=True)
+    pnl = trade_pnl(backtester)
+    assert pnl.sum() == pytest.approx(backtester.metrics['net_profit'])
+
+    streaming = Backtester(data, manager, keep_trades=False, spill_path=tmp_path / 'trades.csv')
+    streaming.run(vectorized=True)
+    np.testing.assert_allclose(trade_pnl(streaming), pnl)
+
+    with pytest.raises(ValueError):
+        trade_pnl(Backtester(data, manager, keep_trades=False))
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from config.settings import Settings
+from core.indicators import IncrementalIndicators
+from core.ohlcv_buffer import OHLCVRingBuffer
+from core.strategy import TradingStrategy
+
+@pytest.fixture
+def sample_ohlcv():
+    return [
+        [1700000000000 + i * 60000, 100.0 + i, 101.0 + i, 99.0 + i, 100.5 + i, 10.0 + i]
+        for i in range(250)
+    ]
+
+def test_append_and_wraparound(sample_ohlcv):
+    buffer = OHLCVRingBuffer(capacity=100)
+    assert buffer.extend(sample_ohlcv) == 250
+    assert len(buffer) == 100
+    view = buffer.view()
+    assert view['timestamp'][0] == sample_ohlcv[150][0]
+    assert view['timestamp'][-1] == sample_ohlcv[-1][0]
+    assert np.all(np.diff(view['timestamp']) == 60000)
+    assert buffer.to_list() == [list(map(float, c)) for c in sample_ohlcv[150:]]
+
+def test_view_is_zero_copy(sample_ohlcv):
+    buffer = OHLCVRingBuffer(capacity=100)
+    buffer.extend(sample_ohlcv)
+    view = buffer.view()
+    assert np.shares_memory(view, buffer._data)
+    assert np.shares_memory(buffer.column('close'), buffer._data)
+
+def test_replaces_open_candle(sample_ohlcv):
+    buffer = OHLCVRingBuffer(capacity=10)
+    buffer.extend(sample_ohlcv[:5])
+    revised = list(sample_ohlcv[4])
+    revised[4] = 999.0
+    assert buffer.append(revised) is False
+    assert len(buffer) == 5
+    assert buffer.column('close')[-1] == 999.0
+
+def test_extend_skips_old_candles(sample_ohlcv):
+    buffer = OHLCVRingBuffer(capacity=100)
+    buffer.extend(sample_ohlcv[:100])
+    assert buffer.extend(sample_ohlcv[50:102]) == 2 # Candles antigos ignorados
+    with pytest.raises(ValueError):
+        buffer.append(sample_ohlcv[0])
+
+def test_feeds_strategy_and_indicators(sample_ohlcv):
+    """Estratégia e motor incremental leem a view do buffer diretamente."""
+    buffer = OHLCVRingBuffer(capacity=100)
+    buffer.extend(sample_ohlcv[:100])
+    indicators = IncrementalIndicators()
+    indicators.sync(buffer.view())
+    strategy = TradingStrategy(buffer.view(), Settings())
+    np.testing.assert_array_equal(indicators.series('rsi'), strategy.rsi.values)
+    assert strategy.close_price == sample_ohlcv[99][4]
+
+def test_to_frame(sample_ohlcv):
+    buffer = OHLCVRingBuffer(capacity=20)
+    buffer.extend(sample_ohlcv[:30])
+    df = buffer.to_frame()
+    assert list(df.columns) == ['open', 'high', 'low', 'close', 'volume']
+    assert len(df) == 20
+    assert df.index[0].value // 10**6 == sample_ohlcv[10][0]
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from config.settings import Settings
+from core.backtester import Backtester
+from core.optimizer import ParameterSweep, parameter_grid
+
+@pytest.fixture
+def sample_ohlcv():
+    rng = np.random.default_rng(11)
+    close = 30000 + np.cumsum(rng.normal(0, 40, 800))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) + rng.random(800) * 30
+    low = np.minimum(open_, close) - rng.random(800) * 30
+    return [[1700000000000 + i * 60000, open_[i], high[i], low[i], close[i], 1.0] for i in range(800)]
+
+def test_parameter_grid():
+    combinations = parameter_grid({'rsi_buy': [30, 40], 'macd_fast': [8, 12, 16]})
+    assert len(combinations) == 6
+    assert {'rsi_buy': 40, 'macd_fast': 16} in combinations
+    with pytest.raises(ValueError):
+        parameter_grid({'leverage': [1, 2]})
+
+def test_sweep_matches_serial_backtests(sample_ohlcv):
+    """Cada linha da tabela deve reproduzir o backtest individual da combinação."""
+    base = Settings(take_profit_percent=0.1, stop_loss_percent=0.1)
+    grid = {'rsi_buy': [40, 50], 'rsi_sell': [50, 60], 'macd_fast': [8, 12]}
+    table = ParameterSweep(sample_ohlcv, base, max_workers=2).run(grid)
+
+    assert len(table) == 8
+    assert list(table.index) == list(range(1, 9))
+    assert table['net_profit'].is_monotonic_decreasing
+
+    for _, row in table.iterrows():
+        params = {field: int(row[field]) for field in grid}
+        settings_manager = MagicMock()
+        settings_manager.load = AsyncMock()
+        settings_manager.settings = base.model_copy(update=params)
+        expected = Backtester(sample_ohlcv, settings_manager).run(vectorized=True)
+        assert row['total_trades'] == expected['total_trades']
+        assert row['net_profit'] == pytest.approx(expected['net_profit'])
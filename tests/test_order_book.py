@@ -0,0 +1,93 @@
+import zlib
+
+import numpy as np
+import pytest
+
+from core.order_book import OrderBook
+
+
+def _checksum(bids, asks):
+    parts = []
+    for level in range(max(len(bids), len(asks))):
+        if level < len(bids):
+            parts += bids[level]
+        if level < len(asks):
+            parts += asks[level]
+    value = zlib.crc32(':'.join(parts).encode())
+    return value - (1 << 32) if value >= 1 << 31 else value
+
+
+SNAPSHOT_BIDS = [['100.0', '1'], ['99.5', '2'], ['99.0', '3']] # Do melhor para o pior, como na Bitget
+SNAPSHOT_ASKS = [['100.5', '1.5'], ['101.0', '2'], ['102.0', '4']]
+
+
+def _book():
+    book = OrderBook('BTC/USDT:USDT')
+    assert book.apply_snapshot({
+        'bids': SNAPSHOT_BIDS, 'asks': SNAPSHOT_ASKS, 'ts': '1700000000000', 'checksum': _checksum(SNAPSHOT_BIDS, SNAPSHOT_ASKS)
+    })
+    return book
+
+
+def test_snapshot_queries():
+    book = _book()
+    assert book.synced and book.timestamp == 1700000000000 and len(book) == 6
+    assert book.best_bid() == (100.0, 1.0) and book.best_ask() == (100.5, 1.5)
+    assert book.mid() == 100.25
+    assert book.depth('asks', 50) == 1.5 # Até 100.75
+    assert book.depth('bids', 100) == 3.0 # Desde 99.25
+    assert book.vwap('buy', 2.5) == pytest.approx((100.5 * 1.5 + 101.0 * 1) / 2.5)
+    assert book.vwap('sell', 3) == pytest.approx((100.0 + 99.5 * 2) / 3)
+    assert book.vwap('buy', 100) is None # Profundidade insuficiente
+    assert book.impact('buy', 1) == pytest.approx(100.5 / 100.25 - 1)
+    assert book.impact('sell', 1) == pytest.approx(1 - 100.0 / 100.25)
+    with pytest.raises(ValueError):
+        book.vwap('long', 1)
+
+
+def test_checksum_matches_known_values():
+    # '100.0:1:100.5:1.5:99.5:2:101.0:2:99.0:3:102.0:4': bid e ask intercalados, com o texto recebido
+    assert _book().checksum() == -1950956543
+    book = OrderBook('BTC/USDT:USDT')
+    assert book.apply_snapshot({'bids': SNAPSHOT_BIDS, 'asks': SNAPSHOT_ASKS[:1], 'checksum': 1615808640}) # Lado mais curto acaba antes
+
+
+def test_incremental_update_with_checksum():
+    book = _book()
+    bids = [['100.2', '0.5'], ['100.0', '1'], ['99.0', '3']] # Novo nível 100.2; 99.5 removido
+    asks = [['100.5', '0.7'], ['101.0', '2'], ['102.0', '4']] # 100.5 alterado
+    assert book.apply_update({
+        'bids': [['100.2', '0.5'], ['99.5', '0']], 'asks': [['100.5', '0.7']], 'checksum': _checksum(bids, asks)
+    })
+    assert book.prices['bids'].tolist() == [99.0, 100.0, 100.2]
+    assert book.sizes['asks'].tolist() == [0.7, 2.0, 4.0]
+    assert book.best_bid() == (100.2, 0.5)
+
+
+def test_checksum_mismatch_requires_new_snapshot():
+    book = _book()
+    assert not book.apply_update({'asks': [['100.6', '1']], 'checksum': 123})
+    assert not book.synced and book.checksum_errors == 1
+    assert not book.apply_update({'asks': [['100.7', '1']]}) # Ignorada até o snapshot
+    assert _book().synced
+
+
+def test_merge_matches_reference_after_random_updates():
+    rng = np.random.default_rng(1)
+    book = _book()
+    reference = {'bids': {float(p): float(s) for p, s in SNAPSHOT_BIDS}, 'asks': {float(p): float(s) for p, s in SNAPSHOT_ASKS}}
+    for _ in range(200):
+        update = {}
+        for side, low in (('bids', 95.0), ('asks', 100.5)):
+            prices = np.unique(np.round(low + rng.integers(0, 10, 4) * 0.5, 1))
+            rows = [[f'{p:.1f}', '0' if rng.random() < 0.3 else f'{rng.integers(1, 9)}'] for p in prices]
+            update[side] = rows
+            for price, size in rows:
+                if float(size):
+                    reference[side][float(price)] = float(size)
+                else:
+                    reference[side].pop(float(price), None)
+        book.apply_update(update)
+    for side in ('bids', 'asks'):
+        assert book.prices[side].tolist() == sorted(reference[side])
+        assert book.sizes[side].tolist() == [reference[side][p] for p in sorted(reference[side])]
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from benchmarks.synthetic import synthetic_ohlcv
+from core.intrabar import IntrabarBacktester
+from core.portfolio import PortfolioBacktester, signal_matrix_by_symbol
+from core.strategy import TradingSignal, TradingStrategy
+
+TP_SL = {'take_profit_percent': 2.0, 'stop_loss_percent': 2.0}
+
+def test_signal_matrix_matches_single_symbol_signals(settings_manager_factory):
+    settings = settings_manager_factory(**TP_SL).settings
+    full = synthetic_ohlcv(3000, seed=1)
+    late = synthetic_ohlcv(3000, seed=2)[500:] # Listado depois
+    gapped = np.delete(synthetic_ohlcv(3000, seed=3), np.s_[1000:1100], axis=0) # Lacuna interna
+    portfolio = PortfolioBacktester({'A': full, 'B': late, 'C': gapped}, settings_manager_factory(**TP_SL))
+    signals = signal_matrix_by_symbol(portfolio.matrices['close'], settings)
+
+    assert signals.shape == (3, 3000)
+    for row, data in enumerate((full, late, gapped)):
+        positions = np.searchsorted(portfolio.timestamps, data[:, 0])
+        expected = TradingStrategy.vectorized_signals(data[:, 4], settings)
+        np.testing.assert_array_equal(signals[row, positions], expected)
+        assert np.count_nonzero(signals[row]) == np.count_nonzero(expected)
+
+def test_single_symbol_matches_intrabar_engine(settings_manager_factory):
+    data = synthetic_ohlcv(4000, seed=5)
+    manager = settings_manager_factory(**TP_SL)
+    portfolio = PortfolioBacktester({'BTC': data}, manager)
+    portfolio.run()
+    intrabar = IntrabarBacktester(data, data, manager) # Sub-candles iguais às barras
+    intrabar.run()
+
+    assert len(portfolio.results) == len(intrabar.results) > 0
+    for ours, theirs in zip(portfolio.results, intrabar.results):
+        assert ours['datetime'] == theirs['datetime']
+        assert ours['exit_datetime'] == theirs['exit_datetime']
+        assert ours['entry_price'] == pytest.approx(theirs['entry_price'])
+        assert ours['exit_price'] == pytest.approx(theirs['exit_price'])
+        assert ours['exit_reason'] == theirs['exit_reason']
+
+def test_shared_capital_and_risk_sizing(settings_manager_factory):
+    data = synthetic_ohlcv(4000, seed=5)
+    manager = settings_manager_factory(**TP_SL, leverage=1, risk_per_trade=0.015)
+    portfolio = PortfolioBacktester({'A': data, 'B': data.copy()}, manager, slippage=0, commission=0)
+    metrics = portfolio.run()
+
+    # Com leverage 1 e stop de 2%, cada posição usa ~75% do saldo como margem: o segundo símbolo nunca entra
+    assert portfolio.skipped_signals > 0
+    assert set(t['symbol'] for t in portfolio.results) == {'A'}
+    first = portfolio.results[0]
+    signal_close = data[data[:, 0] == first['datetime'].value // 10**6][0, 4]
+    assert first['signal'] == TradingSignal.STRONG_BUY
+    assert first['stop_loss_price'] == pytest.approx(signal_close * 0.98) # Stop 2% abaixo do fechamento do candle do sinal
+    assert first['quantity'] == pytest.approx(150 / (first['entry_price'] - first['stop_loss_price'])) # 1,5% de 10000 em risco
+    assert first['quantity'] * first['entry_price'] <= 10000 * 1.0001
+    assert portfolio.results[-1]['balance'] == pytest.approx(10000 + metrics['net_profit'])
+
+def test_max_positions_limit(settings_manager_factory):
+    symbols = {name: synthetic_ohlcv(3000, seed=seed) for seed, name in enumerate(['A', 'B', 'C', 'D'])}
+    unlimited = PortfolioBacktester(symbols, settings_manager_factory(**TP_SL), initial_balance=10000)
+    unlimited.run()
+    limited = PortfolioBacktester(symbols, settings_manager_factory(**TP_SL), max_positions=1)
+    limited.run()
+
+    assert len(limited.results) < len(unlimited.results)
+    exits = [(t['datetime'], t['exit_datetime']) for t in limited.results]
+    for (_, previous_exit), (entry, _) in zip(exits, exits[1:]):
+        assert entry >= previous_exit # Nunca mais de uma posição aberta
+    summary = unlimited.symbol_summary()
+    assert summary['trades'].sum() == len(unlimited.results)
@@ -0,0 +1,46 @@
+import pytest
+
+from core.price_cache import PriceCache
+
+
+def test_update_and_get(clock):
+    cache = PriceCache(max_age=5, clock=clock)
+    assert cache.get('BTC/USDT:USDT') is None
+    cache.update('BTC/USDT:USDT', last='30000.5', bid=30000, ask=30001)
+    cache.update('BTC/USDT:USDT', last=30002) # Campos omitidos mantêm o valor anterior
+    assert cache.get('BTC/USDT:USDT') == 30002.0
+    assert cache.quote('BTC/USDT:USDT') == {'last': 30002.0, 'bid': 30000.0, 'ask': 30001.0}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_stale_entries_are_misses(clock):
+    cache = PriceCache(max_age=5, clock=clock)
+    cache.update('BTC/USDT:USDT', last=1.0)
+    clock.now += 5
+    assert cache.get('BTC/USDT:USDT') == 1.0
+    clock.now += 0.1
+    assert cache.get('BTC/USDT:USDT') is None
+    assert cache.quote('BTC/USDT:USDT') is None
+    assert cache.get('BTC/USDT:USDT', max_age=10) == 1.0 # Limite da chamada
+
+
+def test_per_symbol_max_age(clock):
+    cache = PriceCache(max_age=5, clock=clock)
+    cache.set_max_age('ETH/USDT:USDT', 0.5)
+    cache.update('BTC/USDT:USDT', last=1.0)
+    cache.update('ETH/USDT:USDT', last=2.0)
+    clock.now += 1
+    assert cache.get('BTC/USDT:USDT') == 1.0
+    assert cache.get('ETH/USDT:USDT') is None
+    assert cache.get('ETH/USDT:USDT', field='bid', max_age=10) is None # Campo nunca recebido
+
+
+def test_bid_ask_age_independent_of_trades(clock):
+    cache = PriceCache(max_age=5, clock=clock)
+    cache.update('BTC/USDT:USDT', last=30000, bid=29999, ask=30001) # Ticker
+    clock.now += 10
+    cache.update('BTC/USDT:USDT', last=30010) # Só trades depois disso
+    assert cache.get('BTC/USDT:USDT') == 30010.0
+    assert cache.get('BTC/USDT:USDT', field='bid') is None # Ticker antigo
+    assert cache.quote('BTC/USDT:USDT') == {'last': 30010.0, 'bid': None, 'ask': None}
+    assert cache.age('BTC/USDT:USDT', 'ask') == 10 and cache.age('BTC/USDT:USDT') == 0
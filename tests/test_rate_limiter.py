@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+import ccxt.async_support as ccxt_async
+import pytest
+
+from core.rate_limiter import (
+    PRIORITY_MARKET_DATA, PRIORITY_ORDER, RateLimitScheduler, TokenBucket
+)
+
+
+def test_token_bucket_refill(clock):
+    bucket = TokenBucket(rate=10, clock=clock)
+    assert bucket.capacity == 10 and bucket.wait_time() == 0
+    bucket.consume(10)
+    assert bucket.wait_time() == pytest.approx(0.1)
+    clock.now = 0.25
+    assert bucket.wait_time(2) == 0 and bucket.tokens == pytest.approx(2.5)
+    clock.now = 100
+    bucket.wait_time()
+    assert bucket.tokens == 10 # Limitado à capacidade
+
+
+@pytest.mark.asyncio
+async def test_throttles_to_endpoint_rate():
+    scheduler = RateLimitScheduler(limits={'fetch_ticker': 50, 'default': 50}, global_rate=None)
+    start = time.monotonic()
+    await asyncio.gather(*(scheduler.acquire('fetch_ticker') for _ in range(60)))
+    assert time.monotonic() - start >= 0.15 # 50 de rajada + 10 a 50 req/s
+    assert scheduler.throttled == 10
+
+
+@pytest.mark.asyncio
+async def test_orders_go_before_market_data():
+    scheduler = RateLimitScheduler(limits={'default': 20}, global_rate=20)
+    await asyncio.gather(*(scheduler.acquire('fetch_ohlcv') for _ in range(20))) # Esgota o orçamento global
+    served = []
+
+    async def request(endpoint, priority, name):
+        await scheduler.acquire(endpoint, priority)
+        served.append(name)
+
+    tasks = [asyncio.create_task(request('fetch_ohlcv', PRIORITY_MARKET_DATA, f'candles{i}')) for i in range(3)]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(request('create_order', PRIORITY_ORDER, 'order')))
+    await asyncio.wait_for(asyncio.gather(*tasks), timeout=2)
+    assert served[0] == 'order'
+    assert served[1:] == ['candles0', 'candles1', 'candles2'] # Ordem de chegada na mesma prioridade
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_is_skipped():
+    scheduler = RateLimitScheduler(limits={'default': 10}, global_rate=None)
+    scheduler.bucket('fetch_ticker').tokens = 0
+    cancelled = asyncio.create_task(scheduler.acquire('fetch_ticker'))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await asyncio.wait_for(scheduler.acquire('fetch_ticker'), timeout=1)
+    assert scheduler._waiters == []
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_error_and_headers_adapt_rate():
+    headers = {'Retry-After': '0.5'}
+    scheduler = RateLimitScheduler(limits={'default': 10}, global_rate=None, headers=lambda: headers)
+
+    async def rejected():
+        raise ccxt_async.RateLimitExceeded('429')
+
+    with pytest.raises(ccxt_async.RateLimitExceeded):
+        await scheduler.call('fetch_ticker', rejected)
+    bucket = scheduler.bucket('fetch_ticker')
+    assert bucket.rate == 5 and scheduler.rate_limited == 1
+    assert bucket.wait_time() == pytest.approx(0.5, abs=0.05) # Pausa do Retry-After
+
+    scheduler.observe('fetch_ticker', {'X-RateLimit-Limit': '20', 'X-RateLimit-Remaining': '1'})
+    assert bucket.rate == 2.5
+    for _ in range(50):
+        scheduler.observe('fetch_ticker', {'x-ratelimit-limit': '20', 'x-ratelimit-remaining': '19'})
+    assert bucket.rate == 10 # Recupera até a taxa base
+    scheduler.observe('fetch_ticker', {'Content-Type': 'application/json'}) # Sem cabeçalhos de limite: ignora
+
+
+def test_rate_recovers_over_time_without_headers(clock):
+    scheduler = RateLimitScheduler(global_rate=None, headers=lambda: {}, clock=clock)
+    for _ in range(5):
+        scheduler.penalize('fetch_ticker')
+    bucket = scheduler.bucket('fetch_ticker')
+    assert bucket.rate == 2 # 20 req/s reduzido ao mínimo
+
+    clock.now = bucket.paused_until + 4
+    bucket.wait_time()
+    assert bucket.rate == pytest.approx(6) # 2 + 20 * 0.05 * 4
+    clock.now += 100
+    bucket.wait_time()
+    assert bucket.rate == 20
+
+
+@pytest.mark.asyncio
+async def test_call_returns_result_and_observes_headers():
+    scheduler = RateLimitScheduler(global_rate=None, headers=lambda: {'x-ratelimit-limit': '10', 'x-ratelimit-remaining': '0'})
+
+    async def ticker():
+        return {'last': 1.0}
+
+    assert await scheduler.call('fetch_ticker', ticker) == {'last': 1.0}
+    assert scheduler.bucket('fetch_ticker').rate == 10 # 20 req/s da Bitget, reduzido pela metade
@@ -0,0 +1,124 @@
+import asyncio
+
+import ccxt.async_support as ccxt_async
+import pytest
+
+from core.resilience import (
+    MIN_LATENCY_SAMPLES, CircuitBreaker, CircuitOpenError, DeadlineExceeded, LatencyTracker,
+    ResilientExecutor, deadline, remaining_time
+)
+
+
+def _responds(value='ok', delay=0.0, error=None):
+    async def request():
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return value
+    return request
+
+
+def test_latency_quantile():
+    tracker = LatencyTracker(window=100)
+    for i in range(1, 101):
+        tracker.record(i / 1000)
+    assert tracker.quantile(0.95) == pytest.approx(0.096)
+    assert tracker.quantile(0.5) == pytest.approx(0.051)
+
+
+def test_circuit_breaker_states(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open' and not breaker.allow()
+
+    clock.now = 10
+    assert breaker.allow() # Chamada de teste
+    assert not breaker.allow() # Só uma por vez
+    breaker.record_failure()
+    assert breaker.state == 'open' and not breaker.allow()
+
+    clock.now = 20
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == 'closed' and breaker.allow()
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_on_network_errors_only():
+    executor = ResilientExecutor(failure_threshold=2)
+    with pytest.raises(ccxt_async.InsufficientFunds):
+        await executor.call('create_order', _responds(error=ccxt_async.InsufficientFunds('sem saldo')))
+    with pytest.raises(ccxt_async.RateLimitExceeded):
+        await executor.call('create_order', _responds(error=ccxt_async.RateLimitExceeded('429')))
+    assert executor.breaker('create_order').failures == 0
+
+    for _ in range(2):
+        with pytest.raises(ccxt_async.NetworkError):
+            await executor.call('fetch_ticker', _responds(error=ccxt_async.NetworkError('caiu')))
+    calls = []
+    with pytest.raises(CircuitOpenError):
+        await executor.call('fetch_ticker', lambda: calls.append(1))
+    assert calls == [] # Falha imediata, sem chamar a exchange
+    assert await executor.call('fetch_balance', _responds()) == 'ok' # Outros endpoints seguem
+
+
+@pytest.mark.asyncio
+async def test_deadline_bounds_calls():
+    executor = ResilientExecutor()
+    assert remaining_time() is None
+    with deadline(0.05):
+        with deadline(10): # Aninhado não estende o prazo externo
+            assert remaining_time() <= 0.05
+        with pytest.raises(DeadlineExceeded):
+            await executor.call('fetch_ohlcv', _responds(delay=1))
+        with pytest.raises(DeadlineExceeded):
+            await executor.call('fetch_ohlcv', _responds()) # Prazo já esgotado
+    assert remaining_time() is None
+    assert executor.breaker('fetch_ohlcv').failures == 0 # Prazo do chamador não é falha do endpoint
+    assert executor.breaker('fetch_ohlcv').allow()
+
+
+@pytest.mark.asyncio
+async def test_deadline_never_cancels_sent_write():
+    executor = ResilientExecutor(failure_threshold=1)
+    with deadline(0.02):
+        assert await executor.call('create_order', _responds('ordem', delay=0.1)) == 'ordem' # Termina após o prazo
+        await asyncio.sleep(0.05)
+        with pytest.raises(DeadlineExceeded):
+            await executor.call('create_order', _responds('outra')) # Prazo esgotado antes do envio
+    assert executor.breaker('create_order').state == 'closed'
+
+
+@pytest.mark.asyncio
+async def test_slow_read_is_hedged():
+    executor = ResilientExecutor()
+    for _ in range(MIN_LATENCY_SAMPLES):
+        executor.latency('fetch_ticker').record(0.01)
+    attempts = []
+
+    async def request():
+        attempts.append(1)
+        await asyncio.sleep(1 if len(attempts) == 1 else 0.01) # Primeira requisição travada
+        return len(attempts)
+
+    result = await asyncio.wait_for(executor.call('fetch_ticker', request), timeout=0.5)
+    assert result == 2 and len(attempts) == 2
+    assert (executor.hedges, executor.hedge_wins) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_writes_are_never_hedged():
+    executor = ResilientExecutor()
+    for _ in range(MIN_LATENCY_SAMPLES):
+        executor.latency('create_order').record(0.001)
+    attempts = []
+
+    async def request():
+        attempts.append(1)
+        await asyncio.sleep(0.1)
+        return 'ordem'
+
+    assert await executor.call('create_order', request) == 'ordem'
+    assert len(attempts) == 1 and executor.hedges == 0
@@ -0,0 +1,95 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from benchmarks.synthetic import synthetic_ohlcv
+from config.settings import Settings
+from core.backtester import Backtester
+from core.result_store import ResultStore
+
+@pytest.fixture
+def settings_manager():
+    manager = MagicMock()
+    manager.load = AsyncMock()
+    manager.settings = Settings(rsi_buy=45, rsi_sell=55, take_profit_percent=0.5, stop_loss_percent=0.5)
+    return manager
+
+@pytest.fixture
+def backtester(settings_manager):
+    backtester = Backtester(synthetic_ohlcv(5000, seed=6), settings_manager)
+    backtester.run(vectorized=True)
+    return backtester
+
+def test_export_and_read(tmp_path, backtester):
+    store = backtester.export_results(tmp_path / 'results')
+    assert len(store) == len(backtester.results)
+
+    metrics = store.metrics()
+    for key, value in backtester.metrics.items():
+        assert metrics[key] == pytest.approx(value)
+
+    frame = store.read()
+    assert frame['datetime'].dtype == 'datetime64[ms]'
+    assert frame['signal'].iloc[0] in ('strong_buy', 'strong_sell')
+    np.testing.assert_allclose(frame['pnl'], [t['pnl'] for t in backtester.results])
+
+def test_read_columns_and_time_range(tmp_path, backtester):
+    store = backtester.export_results(tmp_path / 'results')
+    times = pd.Series([t['datetime'] for t in backtester.results])
+    start, end = times.iloc[10], times.iloc[20]
+
+    frame = store.read(columns=['datetime', 'balance'], start=start, end=end)
+    assert list(frame.columns) == ['datetime', 'balance']
+    assert len(frame) == 10
+    assert frame['datetime'].iloc[0] == start
+
+    curve = store.equity_curve()
+    assert curve.iloc[-1] == pytest.approx(backtester.results[-1]['balance'])
+
+def test_append_updates_sidecar_incrementally(tmp_path, backtester):
+    trades = backtester.results
+    half = len(trades) // 2
+    store = ResultStore(tmp_path / 'results')
+    store.append(trades[:half])
+    store.append(pd.DataFrame(trades[half:]))
+
+    assert store.sidecar()['parts'] == 2
+    assert len(store.read()) == len(trades)
+    for key, value in backtester.metrics.items():
+        assert store.metrics()[key] == pytest.approx(value)
+
+    with pytest.raises(ValueError):
+        store.append(trades[:1]) # Fora de ordem
+    with pytest.raises(ValueError):
+        store.append([{'datetime': trades[-1]['datetime'], 'pnl': 1.0}])
+
+def test_export_replaces_and_streams_from_spill(tmp_path, settings_manager):
+    data = synthetic_ohlcv(5000, seed=6)
+    streaming = Backtester(data, settings_manager, keep_trades=False, spill_path=tmp_path / 'trades.csv', spill_chunk_size=50)
+    metrics = streaming.run(vectorized=True)
+    path = tmp_path / 'results'
+    streaming.export_results(path)
+    store = streaming.export_results(path) # Substitui, não duplica
+
+    assert len(store) == metrics['total_trades']
+    assert len(store.read()) == metrics['total_trades']
+    assert store.metrics()['net_profit'] == pytest.approx(metrics['net_profit'])
+
+def test_empty_store(tmp_path):
+    store = ResultStore(tmp_path / 'missing')
+    assert len(store) == 0
+    assert store.metrics() == {}
+    assert store.read(columns=['pnl']).empty
+
+def test_sidecar_is_strict_json_with_infinite_metrics(tmp_path):
+    store = ResultStore(tmp_path / 'results')
+    store.append([{
+        'datetime': pd.Timestamp('2024-01-01'), 'signal': 'strong_buy', 'entry_price': 100.0,
+        'exit_price': 101.0, 'quantity': 1.0, 'pnl': 1.0, 'balance': 10001.0
+    }]) # Sem perdas: profit factor infinito
+
+    def reject(token):
+        raise ValueError(f"Token JSON não padrão: {token}")
+    json.loads(store.sidecar_path.read_text(), parse_constant=reject)
+    assert store.metrics()['profit_factor'] == float('inf')
@@ -1,7 +1,9 @@
 import pandas as pd
 import pytest
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 from config.settings import Settings, SettingsManager
+from core.order_book import OrderBook
+from core.risk_manager import RiskManager
 from core.strategy import TradingStrategy, TradingSignal
 
 @pytest.fixture
@@ -63,3 +65,17 @@ async def test_calculate_stop_loss_price(sample_data, settings):
         assert strategy.calculate_stop_loss_price() == 44600.0
 
 
+
+
+def test_position_size_uses_order_book_vwap():
+    settings_manager = MagicMock()
+    settings_manager.settings = Settings(risk_per_trade=0.01, leverage=1)
+    risk_manager = RiskManager(settings_manager, balance=1000, symbol='BTC/USDT:USDT')
+    book = OrderBook('BTC/USDT:USDT')
+    book.apply_snapshot({'bids': [['99', '10']], 'asks': [['100', '1'], ['110', '10']]})
+
+    quantity, risk_amount = risk_manager.calculate_position_size(100, 95)
+    assert (quantity, risk_amount) == (2.0, 10.0)
+    depth_quantity, _ = risk_manager.calculate_position_size(100, 95, order_book=book)
+    assert depth_quantity == pytest.approx(1.0) # 2 unidades a VWAP (100 + 110) / 2 = 105: risco de 10 por unidade
+    assert risk_manager.calculate_position_size(100, 95, order_book=OrderBook('vazio'))[0] == quantity # Sem profundidade
@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+
+from core.resilience import deadline, remaining_time
+from core.single_flight import SingleFlightCache
+
+
+class CountingRequest:
+    def __init__(self, result='ok', delay=0.01, error=None):
+        self.result = result
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_reads_share_one_request():
+    cache = SingleFlightCache({'fetch_ticker': 0})
+    request = CountingRequest({'last': 1})
+    results = await asyncio.gather(*(cache.get('fetch_ticker', ('BTC/USDT:USDT',), {}, request) for _ in range(5)))
+    assert request.calls == 1
+    assert all(r is results[0] for r in results)
+    assert (cache.misses, cache.coalesced, len(cache)) == (1, 4, 0) # TTL 0: nada guardado
+
+    await cache.get('fetch_ticker', ('BTC/USDT:USDT',), {}, request)
+    assert request.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_ttl_per_method_and_symbol(clock):
+    cache = SingleFlightCache({'fetch_ticker': 1.0, ('fetch_ticker', 'ETH/USDT:USDT'): 5.0}, clock=clock)
+    btc, eth = CountingRequest(1), CountingRequest(2)
+    for _ in range(3):
+        assert await cache.get('fetch_ticker', ('BTC/USDT:USDT',), {}, btc) == 1
+        assert await cache.get('fetch_ticker', ('ETH/USDT:USDT',), {}, eth) == 2
+    assert (btc.calls, eth.calls, cache.hits) == (1, 1, 4)
+
+    clock.now = 2.0 # BTC expirou, ETH não
+    await cache.get('fetch_ticker', ('BTC/USDT:USDT',), {}, btc)
+    await cache.get('fetch_ticker', ('ETH/USDT:USDT',), {}, eth)
+    assert (btc.calls, eth.calls) == (2, 1)
+
+    cache.invalidate('fetch_ticker')
+    await cache.get('fetch_ticker', ('ETH/USDT:USDT',), {}, eth)
+    assert eth.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_different_arguments_are_separate_keys():
+    cache = SingleFlightCache({'fetch_ohlcv': 10})
+    request = CountingRequest()
+    await cache.get('fetch_ohlcv', ('BTC/USDT:USDT', '1m'), {'limit': 100}, request)
+    await cache.get('fetch_ohlcv', ('BTC/USDT:USDT', '1m'), {'limit': 50}, request)
+    await cache.get('fetch_ohlcv', ('BTC/USDT:USDT', '1m'), {'params': {'a': 1}}, request) # Argumento não hasheável
+    assert request.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_but_not_cached():
+    cache = SingleFlightCache({'fetch_balance': 10})
+    request = CountingRequest(error=ValueError('falha'))
+    results = await asyncio.gather(*(cache.get('fetch_balance', (), {}, request) for _ in range(3)), return_exceptions=True)
+    assert request.calls == 1 and all(isinstance(r, ValueError) for r in results)
+
+    request.error = None
+    assert await cache.get('fetch_balance', (), {}, request) == 'ok'
+    assert request.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelling_one_caller_keeps_shared_request():
+    cache = SingleFlightCache({'fetch_ticker': 0})
+    request = CountingRequest(delay=0.05)
+    first = asyncio.create_task(cache.get('fetch_ticker', ('BTC/USDT:USDT',), {}, request))
+    second = asyncio.create_task(cache.get('fetch_ticker', ('BTC/USDT:USDT',), {}, request))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    assert await second == 'ok'
+    assert request.calls == 1
+
+
+def test_eviction_keeps_max_entries(clock):
+    cache = SingleFlightCache({'fetch_ticker': 1}, max_entries=2, clock=clock)
+
+    async def fill():
+        for i in range(4):
+            await cache.get('fetch_ticker', (f'S{i}',), {}, CountingRequest(i, delay=0))
+            clock.now += 0.1
+
+    asyncio.run(fill())
+    assert len(cache) == 2
+
+
+@pytest.mark.asyncio
+async def test_invalidate_discards_in_flight_result():
+    cache = SingleFlightCache({'fetch_balance': 10.0})
+    before = CountingRequest('antes', delay=0.05)
+    pending = asyncio.create_task(cache.get('fetch_balance', (), {}, before))
+    await asyncio.sleep(0)
+    cache.invalidate('fetch_balance') # Ordem criada enquanto a leitura estava em andamento
+    after = CountingRequest('depois')
+    assert await cache.get('fetch_balance', (), {}, after) == 'depois' # Não se junta à leitura antiga
+    assert await pending == 'antes'
+    assert await cache.get('fetch_balance', (), {}, CountingRequest('outra')) == 'depois' # Antigo não foi guardado
+    assert before.calls == after.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_shared_request_does_not_inherit_caller_deadline():
+    cache = SingleFlightCache({'fetch_ticker': 0.0})
+    seen = []
+
+    async def request():
+        seen.append(remaining_time())
+        return 'ok'
+
+    with deadline(10):
+        assert await cache.get('fetch_ticker', ('BTC/USDT:USDT',), {}, request) == 'ok'
+    assert seen == [None]
@@ -1,7 +1,9 @@
 import pytest
+import numpy as np
 import pandas as pd
 from unittest.mock import patch
-from core.strategy import TradingStrategy
+from config.settings import Settings
+from core.strategy import SIGNAL_CODES, TradingStrategy
 
 @pytest.fixture
 def sample_data():
@@ -51,4 +53,17 @@ def test_insufficient_data():
     ]
     strategy = TradingStrategy(empty_data)
     signal = strategy.generate_signal()
-    assert signal == 'hold'
\ No newline at end of file
+    assert signal == 'hold'
+
+
+def test_vectorized_signals_match_per_candle():
+    """vectorized_signals[i] deve ser o sinal gerado com os candles até i."""
+    settings = Settings(rsi_buy=45, rsi_sell=55)
+    rng = np.random.default_rng(7)
+    closes = 30000 + np.cumsum(rng.normal(0, 40, 300))
+    ohlcv = [[1700000000000 + i * 60000, c, c, c, c, 1.0] for i, c in enumerate(closes)]
+
+    signals = TradingStrategy.vectorized_signals(closes, settings)
+    expected = [TradingStrategy(ohlcv[:i + 1], settings).signal for i in range(len(ohlcv))]
+    assert [SIGNAL_CODES[int(code)] for code in signals] == expected
+    assert (signals != 0).any()
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from types import SimpleNamespace
+from benchmarks.synthetic import synthetic_ohlcv
+from config.settings import Settings
+from core.backtester import Backtester
+from core.strategy import TradingStrategy
+from core.walk_forward import WalkForward
+
+BASE = Settings(take_profit_percent=0.5, stop_loss_percent=0.5)
+GRID = {'rsi_buy': [40, 50], 'rsi_sell': [50, 60], 'macd_fast': [8, 12]}
+
+def _window_net_profit(data, settings, start, end):
+    """Backtest de uma janela com sinais calculados sobre a série completa."""
+    signals = TradingStrategy.vectorized_signals(data[:, 4], settings)
+    signals[:30] = 0
+    backtester = Backtester(data[start:end], SimpleNamespace(settings=settings))
+    return float(backtester._vectorized_trades(signals[start:end])['pnl'].sum())
+
+def test_windows_rolling_and_anchored():
+    data = synthetic_ohlcv(1000)
+    rolling = WalkForward(data, BASE, GRID, train_size=400, test_size=200).windows()
+    assert rolling == [(0, 400, 600), (200, 600, 800), (400, 800, 1000)]
+    anchored = WalkForward(data, BASE, GRID, train_size=400, test_size=200, anchored=True).windows()
+    assert [w[0] for w in anchored] == [0, 0, 0]
+    with pytest.raises(ValueError):
+        WalkForward(data, BASE, GRID, train_size=900, test_size=200).run()
+
+def test_walk_forward_matches_brute_force():
+    data = synthetic_ohlcv(3000, seed=9)
+    walk_forward = WalkForward(data, BASE, GRID, train_size=1200, test_size=600, max_workers=2)
+    table = walk_forward.run()
+    assert len(table) == 3
+
+    for (train_start, train_end, test_end), (_, row) in zip(walk_forward.windows(), table.iterrows()):
+        scores = []
+        for params in walk_forward.combinations:
+            settings = BASE.model_copy(update=params)
+            scores.append(_window_net_profit(data, settings, train_start, train_end))
+        best = walk_forward.combinations[int(np.argmax(scores))]
+        assert {field: row[field] for field in GRID} == best
+        assert row['train_net_profit'] == pytest.approx(max(scores))
+        expected_test = _window_net_profit(data, BASE.model_copy(update=best), train_end, test_end)
+        assert row['test_net_profit'] == pytest.approx(expected_test)
+
+    curve = walk_forward.equity_curve
+    assert curve.index.is_monotonic_increasing
+    assert curve.iloc[-1] == pytest.approx(10000 + table['test_net_profit'].sum())
+    assert walk_forward.metrics['net_profit'] == pytest.approx(table['test_net_profit'].sum())
@@ -7,12 +7,12 @@ class PositionManager:
         self.api = api
         self.settings = settings
         self.open_positions: Dict[str, Dict[str, Union[str, float]]] = {} # Type hint
-        self.balance_task = asyncio.create_task(self.api.exchange.fetch_balance()) # Agenda a tarefa para obter o saldo
+        self.balance_task = asyncio.create_task(self.api.fetch_balance()) # Agenda a tarefa para obter o saldo
         self.risk_manager = RiskManager(settings_manager=settings, balance=0, symbol=settings.symbol) # Initialize RiskManager com saldo 0
 
-    def get_balance(self):
+    async def get_balance(self):
         try:
-            balance = asyncio.run(self.api.exchange.fetch_balance())
+            balance = await self.api.fetch_balance() # Passa pelo agendador de requisições do conector
             return balance['total']['USDT']
         except Exception as e:
             logger.error(f"Erro ao obter saldo: {e}")
@@ -65,7 +65,7 @@ class PositionManager:
 
     async def update_risk_management(self):
         """Updates the risk manager with the current balance."""
-        self.risk_manager.balance = self.get_balance()
+        self.risk_manager.balance = await self.get_balance()
 
     def calculate_take_profit(self, side: str, entry_price: float) -> float:
         """Calculates the take-profit price based on the entry price and settings."""
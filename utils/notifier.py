@@ -1,6 +1,7 @@
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ApplicationBuilder, CommandHandler, CallbackQueryHandler
 from config.settings import SettingsManager
+from core.ohlcv_buffer import OHLCVRingBuffer
 from loguru import logger
 import asyncio
 import sys
@@ -41,9 +42,12 @@ class Notifier:
             return "⚠️ Dados insuficientes para gerar gráfico."
 
         # Prepara dados
-        df = pd.DataFrame(self.latest_ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        df.set_index('timestamp', inplace=True)
+        if isinstance(self.latest_ohlcv, OHLCVRingBuffer):
+            df = self.latest_ohlcv.to_frame() # Lê direto das colunas do buffer
+        else:
+            df = pd.DataFrame(self.latest_ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+            df.set_index('timestamp', inplace=True)
 
         # Calcula indicadores
         rsi = self.latest_strategy.rsi
@@ -56,12 +60,12 @@ class Notifier:
         
         # Plot velas
         mpf.plot(df, type='candle', style='yahoo', ax=ax1)
-        ax1.set_title(f"{config('SYMBOL')} - Últimas 100 Velas")
+        ax1.set_title(f"{self.settings.symbol} - Últimas {len(df)} Velas")
         
         # Plot RSI
         ax2.plot(rsi, label='RSI', color='purple')
-        ax2.axhline(self.settings.rsi_buy_threshold, linestyle='--', color='green')
-        ax2.axhline(self.settings.rsi_sell_threshold, linestyle='--', color='red')
+        ax2.axhline(self.settings.rsi_buy, linestyle='--', color='green')
+        ax2.axhline(self.settings.rsi_sell, linestyle='--', color='red')
         ax2.set_title("RSI")
         ax2.legend()
         